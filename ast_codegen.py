@@ -0,0 +1,139 @@
+import ast
+from typing import List, Union
+from ast_nodes import (Program, Device, Command, Attribution, ObservationAction, Observation,
+                       Action, SimpleAction, AlertAction, BroadcastAlertAction)
+
+# ============================================================================
+# Geração de código objeto: constrói a árvore do módulo `ast` do Python a
+# partir da AST do ObsAct e a compila com compile(), sem gerar nem
+# reanalisar código-fonte
+# ============================================================================
+
+# Funções de dispositivos chamadas pelo código gerado (ver functions.py)
+DEVICE_FUNCTIONS = ('ligar', 'desligar', 'alerta', 'alertavar', 'alerta_todos')
+
+# Operadores relacionais do ObsAct e seus nós do módulo ast
+COMPARE_OPERATORS = {
+    '==': ast.Eq,
+    '!=': ast.NotEq,
+    '<=': ast.LtE,
+    '>=': ast.GtE,
+    '<': ast.Lt,
+    '>': ast.Gt,
+}
+
+
+class PythonASTGenerator:
+    """Gera o módulo Python (como árvore ast) equivalente ao do CodeGenerator
+
+    O módulo define apenas a função main; as funções de dispositivos
+    (ligar, desligar, alerta, alertavar, alerta_todos) são resolvidas nos globais em que o
+    código for executado. Os números de linha dos comandos são os do
+    programa ObsAct, de modo que erros de execução apontam para o .obs.
+    """
+
+    def generate(self, program: Program) -> ast.Module:
+        """Gera a árvore do módulo a partir do programa"""
+        body = self.generate_variable_initializations(program.devices)
+        for command in program.commands:
+            body.extend(self.generate_command(command))
+        if not body:
+            body.append(ast.Pass())
+
+        main = ast.FunctionDef(name='main', args=self._no_arguments(), body=body,
+                               decorator_list=[], returns=None, type_comment=None)
+        self._locate(main, 1)
+        module = ast.Module(body=[main], type_ignores=[])
+        return ast.fix_missing_locations(module)
+
+    def compile(self, program: Program, filename: str = '<obsact>'):
+        """Compila o programa para um code object do módulo"""
+        return compile(self.generate(program), filename, 'exec')
+
+    def generate_variable_initializations(self, devices: List[Device]) -> List[ast.stmt]:
+        """Gera `observação = None` para cada observação declarada"""
+        return [self._locate(ast.Assign(targets=[self._store(device.observation)],
+                                        value=ast.Constant(None)),
+                             device.line_number)
+                for device in devices if device.observation]
+
+    def generate_command(self, command: Command) -> List[ast.stmt]:
+        """Gera os comandos Python de um comando ObsAct"""
+        if isinstance(command, Attribution):
+            statements = [ast.Assign(targets=[self._store(command.observation)],
+                                     value=ast.Constant(command.value))]
+        elif isinstance(command, ObservationAction):
+            orelse = self.generate_action(command.else_action) if command.else_action else []
+            statements = [ast.If(test=self.generate_observation_condition(command.condition),
+                                 body=self.generate_action(command.then_action),
+                                 orelse=orelse)]
+        elif isinstance(command, Action):
+            statements = self.generate_action(command)
+        else:
+            raise TypeError(f"Tipo de comando desconhecido: {type(command)}")
+
+        for statement in statements:
+            self._locate(statement, command.line_number)
+        return statements
+
+    def generate_observation_condition(self, obs: Observation) -> ast.expr:
+        """Gera a condição com a precedência do Python (and antes de or)"""
+        groups = [[]]
+        while obs is not None:
+            groups[-1].append(ast.Compare(left=self._load(obs.observation),
+                                          ops=[COMPARE_OPERATORS[obs.operator]()],
+                                          comparators=[ast.Constant(obs.value)]))
+            if obs.next_obs is not None and obs.logical_op == '||':
+                groups.append([])
+            obs = obs.next_obs
+
+        terms = [group[0] if len(group) == 1 else ast.BoolOp(op=ast.And(), values=group)
+                 for group in groups]
+        return terms[0] if len(terms) == 1 else ast.BoolOp(op=ast.Or(), values=terms)
+
+    def generate_action(self, action: Action) -> List[ast.stmt]:
+        """Gera as chamadas de função de uma ação"""
+        if isinstance(action, SimpleAction):
+            statements = [self._call(action.action_type, ast.Constant(action.device))]
+        elif isinstance(action, AlertAction):
+            if action.observation:
+                value = ast.Call(func=self._load('str'), args=[self._load(action.observation)], keywords=[])
+                statements = [self._call('alertavar', ast.Constant(action.device),
+                                         ast.Constant(action.message), value)]
+            else:
+                statements = [self._call('alerta', ast.Constant(action.device), ast.Constant(action.message))]
+        elif isinstance(action, BroadcastAlertAction):
+            devices = ast.List(elts=[ast.Constant(device) for device in action.devices], ctx=ast.Load())
+            statements = [self._call('alerta_todos', devices, ast.Constant(action.message))]
+        else:
+            raise TypeError(f"Tipo de ação desconhecido: {type(action)}")
+
+        for statement in statements:
+            self._locate(statement, action.line_number)
+        return statements or [self._locate(ast.Pass(), action.line_number)]
+
+    @staticmethod
+    def _load(name: str) -> ast.Name:
+        return ast.Name(id=name, ctx=ast.Load())
+
+    @staticmethod
+    def _store(name: str) -> ast.Name:
+        return ast.Name(id=name, ctx=ast.Store())
+
+    def _call(self, function: str, *args: ast.expr) -> ast.Expr:
+        return ast.Expr(value=ast.Call(func=self._load(function), args=list(args), keywords=[]))
+
+    @staticmethod
+    def _no_arguments() -> ast.arguments:
+        return ast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[],
+                             kw_defaults=[], kwarg=None, defaults=[])
+
+    @staticmethod
+    def _locate(node: Union[ast.stmt, ast.expr], line_number: int):
+        """Define a linha do nó e de seus filhos ainda sem posição"""
+        line_number = max(line_number or 1, 1)
+        for child in ast.walk(node):
+            if 'lineno' in child._attributes and not hasattr(child, 'lineno'):
+                child.lineno = child.end_lineno = line_number
+                child.col_offset = child.end_col_offset = 0
+        return node
@@ -1,4 +1,4 @@
-from typing import List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
 
 # Função decoradora do Parser SLY
 def _(rule):
@@ -9,23 +9,74 @@ def _(rule):
     return decorator
 
 
+# Marcador usado no lugar de linhas omitidas por limite de profundidade/linhas
+ELLIPSIS = "..."
+
+
+def limit_lines(lines: Iterable[str], max_lines: Optional[int] = None) -> Iterator[str]:
+    """Repassa no máximo max_lines linhas, seguidas de um marcador se houver mais"""
+    if max_lines is None:
+        yield from lines
+        return
+    count = 0
+    for line in lines:
+        if count == max_lines:
+            yield ELLIPSIS
+            return
+        count += 1
+        yield line
+
+
+def write_pretty(node: 'ASTNode', stream: TextIO, indent: int = 0,
+                 max_depth: Optional[int] = None, max_lines: Optional[int] = None):
+    """Escreve a AST no stream linha a linha (cada linha terminada por "\n")"""
+    for line in limit_lines(node.pretty_lines(indent, max_depth), max_lines):
+        stream.write(line)
+        stream.write("\n")
+
+
+def _child_lines(nodes, indent: int, max_depth: Optional[int]) -> Iterator[str]:
+    """Linhas dos filhos de um nó, respeitando o limite de profundidade"""
+    if max_depth is not None and max_depth < 1:
+        if nodes:
+            yield "  " * indent + ELLIPSIS
+        return
+    child_depth = None if max_depth is None else max_depth - 1
+    for node in nodes:
+        yield from node.pretty_lines(indent, child_depth)
+
+
 class ASTNode:
     """Classe base para todos os nós da AST"""
 
+    # Nós usam __slots__ (sem __dict__ por instância) para reduzir a memória da AST
+    __slots__ = ('line_number',)
+
     def __init__(self, line_number: int = 0):
         self.line_number = line_number
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}"
 
-    def pretty_print(self, indent: int = 0) -> str:
+    def pretty_print(self, indent: int = 0, max_depth: Optional[int] = None,
+                     max_lines: Optional[int] = None) -> str:
         """Imprime a AST de forma organizada com indentação"""
-        return "  " * indent + str(self)
+        return "\n".join(limit_lines(self.pretty_lines(indent, max_depth), max_lines))
+
+    def pretty_lines(self, indent: int = 0, max_depth: Optional[int] = None) -> Iterator[str]:
+        """Gera as linhas de pretty_print uma a uma
+
+        max_depth limita quantos níveis abaixo deste nó são exibidos; níveis
+        omitidos aparecem como "...".
+        """
+        yield "  " * indent + str(self)
 
 
 class Program(ASTNode):
     """Nó raiz representando o programa inteiro"""
 
+    __slots__ = ('devices', 'commands')
+
     def __init__(self, devices: List['Device'], commands: List['Command'], line_number: int = 0):
         super().__init__(line_number)
         self.devices = devices
@@ -34,20 +85,23 @@ class Program(ASTNode):
     def __str__(self) -> str:
         return f"Program(devices={len(self.devices)}, commands={len(self.commands)})"
 
-    def pretty_print(self, indent: int = 0) -> str:
-        result = "  " * indent + "Program:\n"
-        result += "  " * (indent + 1) + "Devices:\n"
-        for device in self.devices:
-            result += device.pretty_print(indent + 2) + "\n"
-        result += "  " * (indent + 1) + "Commands:\n"
-        for command in self.commands:
-            result += command.pretty_print(indent + 2) + "\n"
-        return result.rstrip()
+    def pretty_lines(self, indent: int = 0, max_depth: Optional[int] = None) -> Iterator[str]:
+        yield "  " * indent + "Program:"
+        if max_depth is not None and max_depth < 1:
+            yield "  " * (indent + 1) + ELLIPSIS
+            return
+        section_depth = None if max_depth is None else max_depth - 1
+        yield "  " * (indent + 1) + "Devices:"
+        yield from _child_lines(self.devices, indent + 2, section_depth)
+        yield "  " * (indent + 1) + "Commands:"
+        yield from _child_lines(self.commands, indent + 2, section_depth)
 
 
 class Device(ASTNode):
     """Nó representando uma declaração de dispositivo"""
 
+    __slots__ = ('name', 'observation')
+
     def __init__(self, name: str, observation: Optional[str] = None, line_number: int = 0):
         super().__init__(line_number)
         self.name = name
@@ -58,21 +112,24 @@ class Device(ASTNode):
             return f"Device({self.name}, {self.observation})"
         return f"Device({self.name})"
 
-    def pretty_print(self, indent: int = 0) -> str:
+    def pretty_lines(self, indent: int = 0, max_depth: Optional[int] = None) -> Iterator[str]:
         base = "  " * indent + f"Device: {self.name}"
         if self.observation:
             base += f" (observation: {self.observation})"
-        return base
+        yield base
 
 
 class Command(ASTNode):
     """Classe base para comandos"""
-    pass
+
+    __slots__ = ()
 
 
 class Attribution(Command):
     """Nó representando atribuição"""
 
+    __slots__ = ('observation', 'value')
+
     def __init__(self, observation: str, value: Union[int, bool], line_number: int = 0):
         super().__init__(line_number)
         self.observation = observation
@@ -81,13 +138,15 @@ class Attribution(Command):
     def __str__(self) -> str:
         return f"Attribution({self.observation} = {self.value})"
 
-    def pretty_print(self, indent: int = 0) -> str:
-        return "  " * indent + f"Set: {self.observation} = {self.value}"
+    def pretty_lines(self, indent: int = 0, max_depth: Optional[int] = None) -> Iterator[str]:
+        yield "  " * indent + f"Set: {self.observation} = {self.value}"
 
 
 class ObservationAction(Command):
     """Nó representando condicional"""
 
+    __slots__ = ('condition', 'then_action', 'else_action')
+
     def __init__(self, condition: 'Observation', then_action: 'Action',
                  else_action: Optional['Action'] = None, line_number: int = 0):
         super().__init__(line_number)
@@ -100,17 +159,21 @@ class ObservationAction(Command):
             return f"If({self.condition}) Then({self.then_action}) Else({self.else_action})"
         return f"If({self.condition}) Then({self.then_action})"
 
-    def pretty_print(self, indent: int = 0) -> str:
-        result = "  " * indent + f"If: {self.condition}\n"
-        result += "  " * (indent + 1) + f"Then: {self.then_action}"
+    def pretty_lines(self, indent: int = 0, max_depth: Optional[int] = None) -> Iterator[str]:
+        yield "  " * indent + f"If: {self.condition}"
+        if max_depth is not None and max_depth < 1:
+            yield "  " * (indent + 1) + ELLIPSIS
+            return
+        yield "  " * (indent + 1) + f"Then: {self.then_action}"
         if self.else_action:
-            result += "\n" + "  " * (indent + 1) + f"Else: {self.else_action}"
-        return result
+            yield "  " * (indent + 1) + f"Else: {self.else_action}"
 
 
 class Observation(ASTNode):
     """Nó representando observação"""
 
+    __slots__ = ('observation', 'operator', 'value', 'next_obs', 'logical_op')
+
     def __init__(self, observation: str, operator: str, value: Union[int, bool],
                  next_obs: Optional['Observation'] = None, logical_op: str = "&&", line_number: int = 0):
         super().__init__(line_number)
@@ -129,12 +192,15 @@ class Observation(ASTNode):
 
 class Action(ASTNode):
     """Classe base para ações"""
-    pass
+
+    __slots__ = ()
 
 
 class SimpleAction(Action):
     """Nó representando ação simples"""
 
+    __slots__ = ('action_type', 'device')
+
     def __init__(self, action_type: str, device: str, line_number: int = 0):
         super().__init__(line_number)
         self.action_type = action_type
@@ -147,6 +213,8 @@ class SimpleAction(Action):
 class AlertAction(Action):
     """Nó representando ação de alerta"""
 
+    __slots__ = ('message', 'device', 'observation')
+
     def __init__(self, message: str, device: str, observation: Optional[str] = None, line_number: int = 0):
         super().__init__(line_number)
         self.message = message
@@ -162,6 +230,8 @@ class AlertAction(Action):
 class BroadcastAlertAction(Action):
     """Nó representando alerta broadcast"""
 
+    __slots__ = ('message', 'devices')
+
     def __init__(self, message: str, devices: List[str], line_number: int = 0):
         super().__init__(line_number)
         self.message = message
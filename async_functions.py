@@ -0,0 +1,92 @@
+import asyncio
+import functions
+
+# ============================================================================
+# Versão assíncrona das funções de dispositivos, usada pelo código gerado
+# com CodeGenerator(async_mode=True)
+#
+# As ações são encaminhadas a um driver assíncrono (set_driver); o padrão
+# imprime o mesmo texto de functions.py. Os alvos de um alerta broadcast são
+# atendidos concorrentemente, e o código gerado aguarda juntas (asyncio.gather)
+# as ações de comandos consecutivos sobre dispositivos diferentes; em ambos
+# os casos, o número de ações em andamento é limitado por um semáforo.
+# ============================================================================
+
+# Número máximo padrão de ações de dispositivos em andamento ao mesmo tempo
+DEFAULT_CONCURRENCY = 32
+
+
+class PrintDriver:
+    """Driver padrão: repassa as ações às funções síncronas de functions.py"""
+
+    async def ligar(self, namedevice: str):
+        functions.ligar(namedevice)
+
+    async def desligar(self, namedevice: str):
+        functions.desligar(namedevice)
+
+    async def alerta(self, namedevice: str, msg: str):
+        functions.alerta(namedevice, msg)
+
+    async def alertavar(self, namedevice: str, msg: str, var: str):
+        functions.alertavar(namedevice, msg, var)
+
+
+_driver = PrintDriver()
+_concurrency = DEFAULT_CONCURRENCY
+# Semáforo por event loop (asyncio.run cria um loop novo a cada execução)
+_semaphores = {}
+
+
+def set_driver(driver):
+    """Define o driver assíncrono (objeto com corrotinas ligar, desligar,
+    alerta e alertavar) e retorna o anterior
+    """
+    global _driver
+    previous, _driver = _driver, driver
+    return previous
+
+
+def set_concurrency(limit: int):
+    """Define o número máximo de ações em andamento ao mesmo tempo"""
+    global _concurrency
+    if limit < 1:
+        raise ValueError("O limite de concorrência deve ser positivo")
+    _concurrency = limit
+    _semaphores.clear()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        # Descarta semáforos de loops já encerrados
+        for old in [old for old in _semaphores if old.is_closed()]:
+            del _semaphores[old]
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_concurrency)
+    return semaphore
+
+
+async def ligar(namedevice: str):
+    async with _semaphore():
+        await _driver.ligar(namedevice)
+
+
+async def desligar(namedevice: str):
+    async with _semaphore():
+        await _driver.desligar(namedevice)
+
+
+async def alerta(namedevice: str, msg: str):
+    async with _semaphore():
+        await _driver.alerta(namedevice, msg)
+
+
+async def alertavar(namedevice: str, msg: str, var: str):
+    async with _semaphore():
+        await _driver.alertavar(namedevice, msg, var)
+
+
+async def alerta_todos(namedevices, msg: str):
+    """Alerta broadcast: envia o alerta a todos os dispositivos concorrentemente"""
+    await asyncio.gather(*(alerta(namedevice, msg) for namedevice in namedevices))
@@ -0,0 +1,157 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from compile_cache import CompileCache, DEFAULT_MAX_BYTES
+from main import ObsActCompiler
+
+# ============================================================================
+# Compilação em lote de arquivos .obs usando um pool de processos
+# ============================================================================
+
+# Compilador do processo trabalhador (criado uma vez por processo)
+_worker_compiler = None
+
+
+def _init_worker(use_mmap: bool, cache_dir: Optional[str], cache_max_bytes: int):
+    """Inicializa o compilador (lexer, parser e gerador) do processo trabalhador"""
+    global _worker_compiler
+    cache = CompileCache(cache_dir, cache_max_bytes) if cache_dir else None
+    _worker_compiler = ObsActCompiler(use_mmap=use_mmap, cache=cache)
+
+
+def _compile_job(job: Tuple[str, str]) -> dict:
+    """Compila um arquivo no processo trabalhador e retorna seu resultado"""
+    obs_path, py_path = job
+    cache = _worker_compiler.cache
+    hits = cache.hits if cache is not None else 0
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        success = _worker_compiler.compile_file(obs_path, py_path)
+    return {
+        'source': obs_path,
+        'output': py_path,
+        'success': success,
+        'cached': cache is not None and cache.hits > hits,
+        'seconds': time.perf_counter() - start,
+        'log': log.getvalue(),
+    }
+
+
+def output_path(obs_path: str, root: Optional[str], output_dir: Optional[str]) -> str:
+    """Caminho do .py gerado; com output_dir, preserva a estrutura sob root"""
+    base = obs_path[:-4] if obs_path.endswith('.obs') else obs_path
+    if output_dir is None:
+        return base + '.py'
+    relative = os.path.relpath(base, root) if root else os.path.basename(base)
+    return os.path.join(output_dir, relative + '.py')
+
+
+def collect_jobs(patterns: List[str], output_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Expande diretórios (recursivamente), globs e arquivos em pares (.obs, .py)"""
+    jobs = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '**', '*.obs'), recursive=True)
+            root = pattern
+        else:
+            matches = glob.glob(pattern, recursive=True) or [pattern]
+            root = None
+        for obs_path in matches:
+            if not os.path.isdir(obs_path):
+                jobs.setdefault(obs_path, output_path(obs_path, root, output_dir))
+    return sorted(jobs.items())
+
+
+def compile_batch(jobs: List[Tuple[str, str]], workers: Optional[int] = None,
+                  use_mmap: bool = False, progress=None, cache_dir: Optional[str] = None,
+                  cache_max_bytes: int = DEFAULT_MAX_BYTES) -> dict:
+    """Compila os pares (.obs, .py) em paralelo e retorna resultados e resumo"""
+    workers = workers or os.cpu_count() or 1
+    for _, py_path in jobs:
+        directory = os.path.dirname(py_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+    with Pool(processes=workers, initializer=_init_worker, initargs=(use_mmap, cache_dir, cache_max_bytes)) as pool:
+        chunksize = max(1, len(jobs) // (workers * 8))
+        for result in pool.imap_unordered(_compile_job, jobs, chunksize=chunksize):
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda result: result['source'])
+    succeeded = sum(1 for result in results if result['success'])
+    cached = sum(1 for result in results if result['cached'])
+    summary = {
+        'files': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'cache_hits': cached,
+        'cache_misses': len(results) - cached if cache_dir else 0,
+        'workers': workers,
+        'seconds': elapsed,
+        'files_per_second': len(results) / elapsed if elapsed > 0 else 0.0,
+    }
+    return {'results': results, 'summary': summary}
+
+
+def batch_main(argv: List[str]) -> int:
+    """Interface de linha de comando do modo em lote; retorna o código de saída"""
+    arg_parser = argparse.ArgumentParser(
+        prog='main.py --batch',
+        description='Compila em paralelo arquivos .obs de diretórios ou globs')
+    arg_parser.add_argument('paths', nargs='+', help='arquivos, diretórios ou globs (ex.: "sites/**/*.obs")')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='número de processos (padrão: número de CPUs)')
+    arg_parser.add_argument('-o', '--output-dir', default=None,
+                            help='diretório de saída (padrão: ao lado de cada .obs)')
+    arg_parser.add_argument('--report', default=None,
+                            help='arquivo JSON com o resultado de cada arquivo e o resumo')
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help='analisa os arquivos mapeados em memória')
+    arg_parser.add_argument('--cache-dir', default=None,
+                            help='diretório do cache incremental de compilação')
+    arg_parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES,
+                            help='tamanho máximo do cache em bytes')
+    args = arg_parser.parse_args(argv)
+
+    jobs = collect_jobs(args.paths, args.output_dir)
+    if not jobs:
+        print("Nenhum arquivo .obs encontrado")
+        return 1
+
+    def progress(result):
+        if not result['success']:
+            print(f"FALHOU: {result['source']}")
+            for line in result['log'].splitlines():
+                print(f"  {line}")
+
+    batch = compile_batch(jobs, args.jobs, args.mmap, progress, args.cache_dir, args.cache_size)
+    summary = batch['summary']
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(batch, f, ensure_ascii=False, indent=2)
+
+    print(f"Arquivos: {summary['files']}  sucesso: {summary['succeeded']}  falha: {summary['failed']}")
+    if args.cache_dir:
+        print(f"Cache: {summary['cache_hits']} acertos, {summary['cache_misses']} faltas")
+    print(f"Tempo: {summary['seconds']:.2f}s com {summary['workers']} processos "
+          f"({summary['files_per_second']:.1f} arquivos/s)")
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(batch_main(sys.argv[1:]))
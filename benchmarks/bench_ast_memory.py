@@ -0,0 +1,69 @@
+import os
+import sys
+import tracemalloc
+
+# Adiciona o diretório pai ao path para importar o módulo main
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ast_nodes import ASTNode
+from main import DeviceLanguageProcessor
+from bench_parser import gerar_programa
+
+
+def atributos(cls) -> list:
+    """Nomes de todos os slots declarados na hierarquia da classe"""
+    nomes = []
+    for base in reversed(cls.__mro__):
+        nomes.extend(getattr(base, '__slots__', ()))
+    return nomes
+
+
+def classe_com_dict(cls, cache: dict):
+    """Recria a classe sem __slots__ (layout anterior, com __dict__ por instância)"""
+    if cls is object:
+        return object
+    if cls not in cache:
+        bases = tuple(classe_com_dict(base, cache) for base in cls.__bases__)
+        ignorados = set(getattr(cls, '__slots__', ())) | {'__slots__', '__dict__', '__weakref__'}
+        namespace = {k: v for k, v in vars(cls).items() if k not in ignorados}
+        cache[cls] = type(cls.__name__, bases, namespace)
+    return cache[cls]
+
+
+def copiar(valor, mapa):
+    """Copia a AST instanciando, para cada nó, a classe dada por mapa(tipo)"""
+    if isinstance(valor, list):
+        return [copiar(item, mapa) for item in valor]
+    if not isinstance(valor, ASTNode):
+        return valor
+    cls = mapa(type(valor))
+    novo = cls.__new__(cls)
+    for nome in atributos(type(valor)):
+        setattr(novo, nome, copiar(getattr(valor, nome), mapa))
+    return novo
+
+
+def medir(ast, mapa) -> int:
+    """Bytes alocados (e retidos) para construir uma cópia da AST"""
+    tracemalloc.start()
+    copia = copiar(ast, mapa)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copia
+    return atual
+
+
+if __name__ == "__main__":
+    num_comandos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ast = DeviceLanguageProcessor().parse(gerar_programa(num_comandos))
+
+    cache = {}
+    antes = medir(ast, lambda cls: classe_com_dict(cls, cache))
+    depois = medir(ast, lambda cls: cls)
+
+    print(f"comandos: {num_comandos}")
+    print(f"{'layout':>10} | {'bytes':>12} | {'bytes/comando':>13}")
+    print(f"{'__dict__':>10} | {antes:>12} | {antes / num_comandos:>13.1f}")
+    print(f"{'__slots__':>10} | {depois:>12} | {depois / num_comandos:>13.1f}")
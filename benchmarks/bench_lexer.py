@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+# Adiciona o diretório pai ao path para importar o módulo main
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from dfa_lexer import DFADeviceLexer, MmapDeviceLexer
+from lexer import DeviceLexer
+
+LEXERS = {
+    'sly': DeviceLexer,
+    'dfa': DFADeviceLexer,
+    'mmap': MmapDeviceLexer,
+}
+
+# Meta de desempenho do lexer AFD em relação ao lexer do SLY; enquanto não
+# for atingida, 'dfa' fica fora de main.LEXER_BACKENDS ('mmap' tem como meta
+# a memória, não o tempo)
+META_ACELERACAO = 5.0
+
+
+def gerar_programa(num_dispositivos: int) -> str:
+    """Gera um programa ObsAct dominado por identificadores"""
+    linhas = [f"dispositivo : {{sensor{i}, leitura{i}}}\n" for i in range(num_dispositivos)]
+    nomes = ", ".join(f"sensor{i}" for i in range(num_dispositivos))
+    linhas.append(f'enviar alerta ("Broadcast") para todos : {nomes}.\n')
+    return "".join(linhas)
+
+
+def medir(lexer_class, programa: str, repeticoes: int = 3) -> tuple:
+    """Retorna (número de tokens, melhor tempo em segundos)"""
+    melhor = float("inf")
+    num_tokens = 0
+    for _ in range(repeticoes):
+        lexer = lexer_class()
+        inicio = time.perf_counter()
+        num_tokens = sum(1 for _ in lexer.tokenize(programa))
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return num_tokens, melhor
+
+
+if __name__ == "__main__":
+    num_dispositivos = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    programa = gerar_programa(num_dispositivos)
+
+    print(f"{'lexer':>6} | {'tokens':>8} | {'tempo (s)':>10} | {'us/token':>8} | {'vs sly':>6} | meta")
+    tempo_sly = None
+    for nome, lexer_class in LEXERS.items():
+        num_tokens, tempo = medir(lexer_class, programa)
+        if tempo_sly is None:
+            tempo_sly = tempo
+        aceleracao = tempo_sly / tempo
+        meta = "-" if nome != "dfa" else ("ok" if aceleracao >= META_ACELERACAO else "abaixo")
+        print(f"{nome:>6} | {num_tokens:>8} | {tempo:>10.3f} | {tempo / num_tokens * 1e6:>8.3f} | "
+              f"{aceleracao:>5.2f}x | {meta}")
+    print(f"\nMeta do lexer AFD: {META_ACELERACAO:.0f}x o lexer do SLY")
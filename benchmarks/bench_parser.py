@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+# Adiciona o diretório pai ao path para importar o módulo main
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from main import DeviceLanguageProcessor
+
+HEADER = (
+    "dispositivo : {sensor, temperatura}\n"
+    "dispositivo : {ventilador}\n"
+    "dispositivo : {painel}\n"
+)
+
+COMMANDS = (
+    "set temperatura = 25.\n",
+    "se temperatura > 30 entao ligar ventilador senao desligar ventilador.\n",
+    "enviar alerta (\"Temperatura\", temperatura) painel.\n",
+    "enviar alerta (\"Broadcast\") para todos : ventilador, painel.\n",
+)
+
+
+def gerar_programa(num_comandos: int) -> str:
+    """Gera um programa ObsAct sintético com num_comandos comandos"""
+    linhas = [HEADER]
+    for i in range(num_comandos):
+        linhas.append(COMMANDS[i % len(COMMANDS)])
+    return "".join(linhas)
+
+
+def medir(processor: DeviceLanguageProcessor, num_comandos: int) -> float:
+    """Retorna o tempo (s) de análise sintática de um programa gerado"""
+    programa = gerar_programa(num_comandos)
+    inicio = time.perf_counter()
+    ast = processor.parse(programa)
+    fim = time.perf_counter()
+    assert len(ast.commands) == num_comandos
+    return fim - inicio
+
+
+if __name__ == "__main__":
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000, 1000000]
+    processor = DeviceLanguageProcessor()
+
+    print(f"{'comandos':>10} | {'tempo (s)':>10} | {'us/comando':>10}")
+    for n in tamanhos:
+        tempo = medir(processor, n)
+        print(f"{n:>10} | {tempo:>10.3f} | {tempo / n * 1e6:>10.2f}")
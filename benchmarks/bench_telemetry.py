@@ -0,0 +1,113 @@
+import io
+import os
+import random
+import sys
+import time
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from interpreter import DeviceBackend
+from main import DeviceLanguageProcessor
+from rule_engine import RuleEngine
+from stream_queue import MicroBatchRunner
+from telemetry import TelemetryPipeline
+
+PROGRAMA = os.path.join(parent_dir, 'tests', 'programa9.obs')
+
+# Meta de vazão da ingestão em micro-lotes (leituras por segundo)
+META_LEITURAS = 1_000_000
+
+
+class NullBackend(DeviceBackend):
+    """Backend que descarta as ações, para medir só a ingestão e as regras"""
+
+    def ligar(self, namedevice: str):
+        pass
+
+    def desligar(self, namedevice: str):
+        pass
+
+    def alerta(self, namedevice: str, msg: str):
+        pass
+
+    def alertavar(self, namedevice: str, msg: str, var):
+        pass
+
+
+def gerar_leituras(num_leituras: int, seed: int = 0) -> list:
+    """Leituras (nome, valor) com a mistura de dispositivos e observações do programa 9"""
+    rng = random.Random(seed)
+    leituras = []
+    for _ in range(num_leituras):
+        escolha = rng.random()
+        if escolha < 0.4:
+            leituras.append((rng.choice(['tempSensor', 'temperatura']), rng.randint(10, 40)))
+        elif escolha < 0.8:
+            leituras.append(('umidade', rng.randint(20, 90)))
+        else:
+            leituras.append(('movimento', rng.choice([True, False])))
+    return leituras
+
+
+def como_ndjson(leituras: list) -> str:
+    return "".join(f'{{"device": "{nome}", "value": {str(valor).lower()}}}\n' for nome, valor in leituras)
+
+
+def como_csv(leituras: list) -> str:
+    return "".join(f"{nome},{valor}\n" for nome, valor in leituras)
+
+
+def medir(programa, texto: str, formato: str, per_reading: bool = False, fila: bool = False,
+          repeticoes: int = 3) -> dict:
+    """Melhor de algumas execuções; retorna as estatísticas da pipeline
+
+    Com fila, as leituras passam por um MicroBatchRunner e o tempo inclui
+    esperar o consumidor esvaziar a fila.
+    """
+    melhor = None
+    for _ in range(repeticoes):
+        engine = RuleEngine(programa, NullBackend(), defer_unset=True)
+        engine.start()
+        runner = None
+        if fila:
+            runner = MicroBatchRunner(engine, 65536)
+            runner.start()
+        pipeline = TelemetryPipeline(runner or engine, programa, per_reading=per_reading, pass_through=fila)
+        inicio = time.perf_counter()
+        pipeline.run(io.StringIO(texto), formato)
+        if runner is not None:
+            runner.stop()
+        pipeline.seconds = time.perf_counter() - inicio
+        stats = pipeline.stats()
+        if melhor is None or stats['seconds'] < melhor['seconds']:
+            melhor = stats
+    return melhor
+
+
+if __name__ == "__main__":
+    num_leituras = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with open(PROGRAMA, 'r', encoding='utf-8') as f:
+        programa = DeviceLanguageProcessor().analyze(f.read(), show_tokens=False, show_ast=False)['ast']
+
+    leituras = gerar_leituras(num_leituras)
+    textos = {'ndjson': como_ndjson(leituras), 'csv': como_csv(leituras)}
+    modos = [
+        ('ndjson', 'ndjson', False, False),
+        ('csv', 'csv', False, False),
+        ('ndjson/fila', 'ndjson', False, True),
+        ('csv/fila', 'csv', False, True),
+        ('ndjson/leitura', 'ndjson', True, False),
+        ('csv/leitura', 'csv', True, False),
+    ]
+
+    print(f"{'modo':>15} | {'leituras':>9} | {'tempo (s)':>10} | {'leituras/s':>11} | meta")
+    for nome, formato, per_reading, fila in modos:
+        stats = medir(programa, textos[formato], formato, per_reading, fila)
+        # A meta vale para os micro-lotes; por leitura cada uma reavalia as regras
+        meta = "-" if per_reading else ("ok" if stats['readings_per_second'] >= META_LEITURAS else "abaixo")
+        print(f"{nome:>15} | {stats['readings']:>9} | {stats['seconds']:>10.3f} | "
+              f"{stats['readings_per_second']:>11.0f} | {meta}")
+    print(f"\nMeta da ingestão em micro-lotes: {META_LEITURAS} leituras/s")
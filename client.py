@@ -0,0 +1,87 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import List, Optional
+
+# ============================================================================
+# Cliente leve do servidor de compilação (ver server.py)
+#
+# Aceita os mesmos argumentos de `python main.py` e termina com o mesmo
+# código de saída. Importa apenas a biblioteca padrão, de modo que o custo
+# de inicialização não inclui o SLY nem a construção das tabelas LALR.
+#
+# Protocolo: uma conexão por requisição; o cliente envia um objeto JSON em
+# UTF-8 e fecha o lado de escrita; o servidor responde com outro objeto JSON
+# e fecha a conexão.
+# ============================================================================
+
+# Tamanho dos blocos lidos do socket
+RECV_SIZE = 1 << 16
+
+
+def default_socket_path() -> str:
+    """Caminho do socket: OBSACT_SOCKET ou um arquivo por usuário no diretório temporário"""
+    path = os.environ.get("OBSACT_SOCKET")
+    if path:
+        return path
+    return os.path.join(tempfile.gettempdir(), f"obsact-{os.getuid()}.sock")
+
+
+def send_message(sock: socket.socket, message: dict):
+    """Envia uma mensagem JSON e fecha o lado de escrita da conexão"""
+    sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+    sock.shutdown(socket.SHUT_WR)
+
+
+def receive_message(sock: socket.socket) -> dict:
+    """Lê uma mensagem JSON até o fim da conexão"""
+    chunks = []
+    while True:
+        chunk = sock.recv(RECV_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def request(message: dict, socket_path: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+    """Envia uma requisição ao servidor e retorna a resposta"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        send_message(sock, message)
+        return receive_message(sock)
+
+
+def client_main(argv: List[str]) -> int:
+    """Repassa os argumentos ao servidor e reproduz sua saída e código de saída
+
+    Com --stop, encerra o servidor. Se o servidor não estiver em execução,
+    compila localmente (com o custo de inicialização completo).
+    """
+    socket_path = default_socket_path()
+    if len(argv) > 0 and argv[0] == '--stop':
+        try:
+            request({'command': 'shutdown'}, socket_path)
+        except OSError:
+            print(f"Erro: servidor não encontrado em '{socket_path}'")
+            return 1
+        print("Servidor encerrado")
+        return 0
+
+    try:
+        response = request({'command': 'compile', 'argv': argv, 'cwd': os.getcwd()}, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"Servidor indisponível em '{socket_path}', compilando localmente", file=sys.stderr)
+        from main import run_cli
+        return run_cli(argv)
+
+    sys.stdout.write(response['output'])
+    sys.stdout.flush()
+    return response['exit_code']
+
+
+if __name__ == "__main__":
+    sys.exit(client_main(sys.argv[1:]))
@@ -0,0 +1,314 @@
+from array import array
+from collections.abc import Sequence
+from typing import List, Optional, Union
+from ast_nodes import (Program, Device, Command, Attribution, ObservationAction, Observation,
+                       Action, SimpleAction, AlertAction, BroadcastAlertAction)
+
+# ============================================================================
+# Representação colunar (struct-of-arrays) de programas ObsAct
+#
+# Cada tabela guarda uma coluna por atributo em arrays tipados; nomes de
+# dispositivos, observações e mensagens são internados em uma tabela de
+# strings e referenciados por id. Ausência de valor é representada por -1.
+# ============================================================================
+
+# Tipos de comando
+CMD_SET, CMD_IF, CMD_ACTION = range(3)
+
+# Tipos de ação
+ACT_LIGAR, ACT_DESLIGAR, ACT_ALERTA, ACT_BROADCAST = range(4)
+ACTION_TYPES = ('ligar', 'desligar')
+
+# Operadores relacionais e lógicos
+OPERATORS = ('==', '!=', '<=', '>=', '<', '>')
+OPERATOR_CODES = {op: code for code, op in enumerate(OPERATORS)}
+LOGICAL_OPS = ('&&', '||')
+LOGICAL_CODES = {op: code for code, op in enumerate(LOGICAL_OPS)}
+
+# Tipos de valor: inteiros que não cabem em 64 bits vão para a tabela de constantes
+VALUE_INT, VALUE_BOOL, VALUE_CONST = range(3)
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class StringTable:
+    """Tabela de strings internadas: cada string distinta recebe um id"""
+
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        """Retorna o id da string (-1 para None), inserindo-a se necessário"""
+        if value is None:
+            return -1
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        """Retorna a string de um id (None para -1)"""
+        return self.strings[string_id] if string_id >= 0 else None
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class _NodeView(Sequence):
+    """Sequência que materializa nós da AST sob demanda a partir das colunas"""
+
+    __slots__ = ('_length', '_node')
+
+    def __init__(self, length, node):
+        self._length = length
+        self._node = node
+
+    def __len__(self) -> int:
+        return self._length()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._node(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._node(i)
+
+
+class CommandColumns(_NodeView):
+    """Visão dos comandos de um ColumnarProgram (aceita append de nós)"""
+
+    __slots__ = ('_program',)
+
+    def __init__(self, program: 'ColumnarProgram'):
+        super().__init__(lambda: len(program.cmd_kind), program.command)
+        self._program = program
+
+    def append(self, command: Command):
+        self._program.add_command(command)
+
+
+class ColumnarProgram:
+    """Programa ObsAct armazenado em colunas tipadas
+
+    Expõe devices e commands como sequências de nós (materializados sob
+    demanda), de modo que o CodeGenerator e demais passes que esperam um
+    Program podem consumi-lo diretamente. Passes de análise podem iterar
+    as colunas (arrays) sem criar objetos.
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.constants = []
+
+        # Dispositivos
+        self.device_name = array('l')
+        self.device_observation = array('l')
+        self.device_line = array('l')
+
+        # Comandos: tipo e índice na tabela específica do tipo
+        self.cmd_kind = array('B')
+        self.cmd_ref = array('l')
+        self.cmd_line = array('l')
+
+        # Atribuições (set)
+        self.set_observation = array('l')
+        self.set_value = array('q')
+        self.set_value_kind = array('B')
+
+        # Condicionais: faixa [cond_start, cond_end) de condições e ações
+        self.if_cond_start = array('l')
+        self.if_cond_end = array('l')
+        self.if_then = array('l')
+        self.if_else = array('l')
+
+        # Condições atômicas (observation oplogic valor), encadeadas por cond_logical
+        self.cond_observation = array('l')
+        self.cond_operator = array('B')
+        self.cond_value = array('q')
+        self.cond_value_kind = array('B')
+        self.cond_logical = array('B')
+        self.cond_line = array('l')
+
+        # Ações; em broadcast, act_device é o início em broadcast_devices
+        self.act_kind = array('B')
+        self.act_device = array('l')
+        self.act_message = array('l')
+        self.act_observation = array('l')
+        self.act_count = array('l')
+        self.act_line = array('l')
+        self.broadcast_devices = array('l')
+
+        self.devices = _NodeView(lambda: len(self.device_name), self.device)
+        self.commands = CommandColumns(self)
+
+    @classmethod
+    def from_ast(cls, program: Program) -> 'ColumnarProgram':
+        """Converte um Program (árvore de objetos) para a forma colunar"""
+        columnar = cls()
+        for device in program.devices:
+            columnar.add_device(device)
+        for command in program.commands:
+            columnar.add_command(command)
+        return columnar
+
+    def to_ast(self) -> Program:
+        """Reconstrói a árvore de objetos equivalente"""
+        return Program(list(self.devices), list(self.commands))
+
+    def __str__(self) -> str:
+        return f"Program(devices={len(self.device_name)}, commands={len(self.cmd_kind)})"
+
+    # Mesma impressão de Program, lendo os nós sob demanda
+    pretty_print = Program.pretty_print
+    pretty_lines = Program.pretty_lines
+
+    # ------------------------------------------------------------------
+    # Inserção
+    # ------------------------------------------------------------------
+
+    def add_device(self, device: Device):
+        """Acrescenta uma declaração de dispositivo"""
+        self.device_name.append(self.strings.intern(device.name))
+        self.device_observation.append(self.strings.intern(device.observation))
+        self.device_line.append(device.line_number)
+
+    def add_command(self, command: Command):
+        """Acrescenta um comando (Attribution, ObservationAction ou ação)"""
+        if isinstance(command, Attribution):
+            kind = CMD_SET
+            ref = len(self.set_observation)
+            value, value_kind = self._encode_value(command.value)
+            self.set_observation.append(self.strings.intern(command.observation))
+            self.set_value.append(value)
+            self.set_value_kind.append(value_kind)
+        elif isinstance(command, ObservationAction):
+            kind = CMD_IF
+            ref = len(self.if_cond_start)
+            self.if_cond_start.append(len(self.cond_observation))
+            obs = command.condition
+            while obs is not None:
+                self._add_condition(obs)
+                obs = obs.next_obs
+            self.if_cond_end.append(len(self.cond_observation))
+            self.if_then.append(self._add_action(command.then_action))
+            self.if_else.append(self._add_action(command.else_action) if command.else_action else -1)
+        elif isinstance(command, Action):
+            kind = CMD_ACTION
+            ref = self._add_action(command)
+        else:
+            raise TypeError(f"Tipo de comando desconhecido: {type(command)}")
+
+        self.cmd_kind.append(kind)
+        self.cmd_ref.append(ref)
+        self.cmd_line.append(command.line_number)
+
+    def _add_condition(self, obs: Observation):
+        value, value_kind = self._encode_value(obs.value)
+        self.cond_observation.append(self.strings.intern(obs.observation))
+        self.cond_operator.append(OPERATOR_CODES[obs.operator])
+        self.cond_value.append(value)
+        self.cond_value_kind.append(value_kind)
+        self.cond_logical.append(LOGICAL_CODES[obs.logical_op])
+        self.cond_line.append(obs.line_number)
+
+    def _add_action(self, action: Action) -> int:
+        index = len(self.act_kind)
+        message = observation = -1
+        count = 0
+        if isinstance(action, SimpleAction):
+            kind = ACTION_TYPES.index(action.action_type)
+            device = self.strings.intern(action.device)
+        elif isinstance(action, AlertAction):
+            kind = ACT_ALERTA
+            device = self.strings.intern(action.device)
+            message = self.strings.intern(action.message)
+            observation = self.strings.intern(action.observation)
+        elif isinstance(action, BroadcastAlertAction):
+            kind = ACT_BROADCAST
+            device = len(self.broadcast_devices)
+            count = len(action.devices)
+            message = self.strings.intern(action.message)
+            for name in action.devices:
+                self.broadcast_devices.append(self.strings.intern(name))
+        else:
+            raise TypeError(f"Tipo de ação desconhecido: {type(action)}")
+
+        self.act_kind.append(kind)
+        self.act_device.append(device)
+        self.act_message.append(message)
+        self.act_observation.append(observation)
+        self.act_count.append(count)
+        self.act_line.append(action.line_number)
+        return index
+
+    def _encode_value(self, value: Union[int, bool]) -> tuple:
+        if isinstance(value, bool):
+            return int(value), VALUE_BOOL
+        if _INT64_MIN <= value <= _INT64_MAX:
+            return value, VALUE_INT
+        self.constants.append(value)
+        return len(self.constants) - 1, VALUE_CONST
+
+    # ------------------------------------------------------------------
+    # Materialização de nós
+    # ------------------------------------------------------------------
+
+    def value(self, value: int, value_kind: int) -> Union[int, bool]:
+        """Decodifica um valor armazenado em uma coluna de valores"""
+        if value_kind == VALUE_BOOL:
+            return bool(value)
+        if value_kind == VALUE_CONST:
+            return self.constants[value]
+        return value
+
+    def device(self, i: int) -> Device:
+        """Materializa o i-ésimo dispositivo"""
+        return Device(self.strings.get(self.device_name[i]),
+                      self.strings.get(self.device_observation[i]),
+                      line_number=self.device_line[i])
+
+    def command(self, i: int) -> Command:
+        """Materializa o i-ésimo comando"""
+        kind = self.cmd_kind[i]
+        ref = self.cmd_ref[i]
+        if kind == CMD_SET:
+            return Attribution(self.strings.get(self.set_observation[ref]),
+                               self.value(self.set_value[ref], self.set_value_kind[ref]),
+                               line_number=self.cmd_line[i])
+        if kind == CMD_IF:
+            else_index = self.if_else[ref]
+            return ObservationAction(self.condition(self.if_cond_start[ref], self.if_cond_end[ref]),
+                                     self.action(self.if_then[ref]),
+                                     self.action(else_index) if else_index >= 0 else None,
+                                     line_number=self.cmd_line[i])
+        return self.action(ref)
+
+    def condition(self, start: int, end: int) -> Observation:
+        """Materializa a cadeia de observações [start, end)"""
+        obs = None
+        for j in range(end - 1, start - 1, -1):
+            obs = Observation(self.strings.get(self.cond_observation[j]),
+                              OPERATORS[self.cond_operator[j]],
+                              self.value(self.cond_value[j], self.cond_value_kind[j]),
+                              obs, LOGICAL_OPS[self.cond_logical[j]],
+                              line_number=self.cond_line[j])
+        return obs
+
+    def action(self, i: int) -> Action:
+        """Materializa a i-ésima ação"""
+        kind = self.act_kind[i]
+        line = self.act_line[i]
+        if kind == ACT_LIGAR or kind == ACT_DESLIGAR:
+            return SimpleAction(ACTION_TYPES[kind], self.strings.get(self.act_device[i]), line_number=line)
+        message = self.strings.get(self.act_message[i])
+        if kind == ACT_ALERTA:
+            return AlertAction(message, self.strings.get(self.act_device[i]),
+                               self.strings.get(self.act_observation[i]), line_number=line)
+        start = self.act_device[i]
+        devices = [self.strings.get(d) for d in self.broadcast_devices[start:start + self.act_count[i]]]
+        return BroadcastAlertAction(message, devices, line_number=line)
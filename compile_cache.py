@@ -0,0 +1,152 @@
+import hashlib
+import os
+import shutil
+import sly
+
+# ============================================================================
+# Cache incremental de compilação: .py gerados indexados pelo hash do .obs
+# ============================================================================
+
+# Módulos cujo conteúdo determina a saída do compilador (interpreter.py
+# fornece os operadores usados pelo otimizador para resolver condições)
+COMPILER_MODULES = ('lexer.py', 'dfa_lexer.py', 'parser.py', 'ast_nodes.py', 'columnar.py', 'main.py',
+                    'ast_codegen.py', 'optimizer.py', 'interpreter.py')
+
+# Tamanho máximo padrão do cache (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Após uma limpeza, o cache fica com no máximo esta fração do limite
+EVICTION_TARGET = 0.9
+
+
+def compiler_version() -> str:
+    """Hash do código do compilador (inclui a gramática) e da versão do SLY"""
+    h = hashlib.sha256(f"sly={sly.__version__}\n".encode("utf-8"))
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in COMPILER_MODULES:
+        h.update(name.encode("utf-8"))
+        with open(os.path.join(directory, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class CompileCache:
+    """Cache em disco de arquivos .py gerados, com remoção LRU por tamanho
+
+    A recência de uso de cada entrada é o seu mtime, atualizado a cada
+    acerto, de modo que vários processos podem compartilhar o diretório.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = compiler_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def key(self, source, variant: str = '') -> str:
+        """Chave de um código-fonte (str ou buffer de bytes)
+
+        variant distingue saídas diferentes do mesmo código (ex.: 'async').
+        """
+        if isinstance(source, str):
+            source = source.encode('utf-8')
+        h = hashlib.sha256(f"{self.version}\n{variant}\n".encode('utf-8'))
+        h.update(source)
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.py')
+
+    def fetch(self, key: str, destination: str) -> bool:
+        """Copia a entrada para destination; retorna False se não estiver no cache"""
+        entry = self.path(key)
+        # Cópia para um temporário ao lado do destino: uma falha no meio não
+        # deixa um .py truncado no lugar da saída
+        tmp = f"{destination}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(entry, tmp)
+            os.replace(tmp, destination)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+        # Marca a entrada como usada recentemente
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def store(self, key: str, generated_path: str):
+        """Guarda o arquivo gerado sob a chave, removendo entradas antigas se necessário"""
+        entry = self.path(key)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(generated_path, tmp)
+            # Uma entrada sobrescrita só acrescenta a diferença de tamanho
+            try:
+                previous = os.stat(entry).st_size
+            except FileNotFoundError:
+                previous = 0
+            os.replace(tmp, entry)
+            self.size += os.path.getsize(entry) - previous
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até caber no limite"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.size = total
+
+    def stats(self) -> dict:
+        """Estatísticas de uso do cache nesta instância"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes': self.size,
+        }
+
+    def _entries(self) -> list:
+        """Lista (mtime, tamanho, caminho) das entradas do cache"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.py'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
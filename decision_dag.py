@@ -0,0 +1,118 @@
+from typing import Dict, Sequence
+from ast_nodes import ObservationAction, Observation
+from interpreter import OPERATOR_FUNCTIONS
+
+# ============================================================================
+# Condições de um conjunto de regras compiladas em um DAG de comparações
+# compartilhadas: comparações atômicas idênticas (observação, operador,
+# valor) em regras diferentes viram um único nó, avaliado no máximo uma vez
+# enquanto a observação não mudar
+# ============================================================================
+
+
+class ConditionDAG:
+    """Avalia as condições de várias regras compartilhando comparações
+
+    Cada condição é compilada em grupos de ids de comparação (or de grupos
+    de and, a precedência do código gerado). O resultado de cada comparação
+    fica memorizado até invalidate() ser chamado para a sua observação, e
+    as comparações só são calculadas quando o curto-circuito da condição as
+    alcança — a mesma ordem e os mesmos erros da avaliação sem
+    compartilhamento.
+    """
+
+    def __init__(self, rules: Sequence[ObservationAction]):
+        # Tabela de comparações atômicas: (observação, operador, valor)
+        self.atoms = []
+        self.atom_ids = {}
+        # Observação -> ids das comparações que a leem
+        self.atoms_by_observation = {}
+        # Regra (índice em rules) -> grupos de ids de comparação
+        self.conditions = []
+        self.memo = []
+        for rule in rules:
+            self.add(rule)
+        self.lookups = 0
+        self.evaluations = 0
+
+    def add(self, rule: ObservationAction) -> int:
+        """Acrescenta a condição de uma regra; retorna o índice da regra"""
+        self.conditions.append(self.compile_condition(rule.condition))
+        self.memo.extend([None] * (len(self.atoms) - len(self.memo)))
+        return len(self.conditions) - 1
+
+    def remove(self, rule: int):
+        """Descarta a condição da regra (os índices das demais não mudam)"""
+        self.conditions[rule] = ()
+
+    def compile_condition(self, obs: Observation) -> tuple:
+        """Converte a cadeia em grupos de ids de comparação"""
+        groups = [[]]
+        while obs is not None:
+            groups[-1].append(self.intern(obs))
+            if obs.next_obs is not None and obs.logical_op == '||':
+                groups.append([])
+            obs = obs.next_obs
+        return tuple(tuple(group) for group in groups)
+
+    def intern(self, obs: Observation) -> int:
+        """Id da comparação atômica, criando o nó se for a primeira ocorrência"""
+        # O tipo do valor entra na chave: `x == True` e `x == 1` são nós distintos
+        key = (obs.observation, obs.operator, type(obs.value), obs.value)
+        atom = self.atom_ids.get(key)
+        if atom is None:
+            atom = self.atom_ids[key] = len(self.atoms)
+            self.atoms.append((obs.observation, OPERATOR_FUNCTIONS[obs.operator], obs.value))
+            self.atoms_by_observation.setdefault(obs.observation, []).append(atom)
+        return atom
+
+    def invalidate(self, name: str):
+        """Descarta os resultados das comparações que leem a observação"""
+        memo = self.memo
+        for atom in self.atoms_by_observation.get(name, ()):
+            memo[atom] = None
+
+    def reset(self):
+        """Descarta todos os resultados memorizados"""
+        self.memo = [None] * len(self.atoms)
+
+    def evaluate(self, rule: int, variables: Dict[str, object]) -> bool:
+        """Avalia a condição da regra com curto-circuito, reusando comparações"""
+        memo = self.memo
+        lookups = 0
+        result = False
+        for group in self.conditions[rule]:
+            for atom in group:
+                lookups += 1
+                value = memo[atom]
+                if value is None:
+                    value = memo[atom] = self.compute(atom, variables)
+                if not value:
+                    break
+            else:
+                result = True
+                break
+        self.lookups += lookups
+        return result
+
+    def compute(self, atom: int, variables: Dict[str, object]) -> bool:
+        """Calcula uma comparação atômica"""
+        name, function, value = self.atoms[atom]
+        try:
+            current = variables[name]
+        except KeyError:
+            raise NameError(f"Observação não definida: {name}") from None
+        self.evaluations += 1
+        return bool(function(current, value))
+
+    def stats(self) -> dict:
+        """Tamanho do DAG e quantas consultas foram atendidas sem recalcular"""
+        references = sum(len(group) for condition in self.conditions for group in condition)
+        return {
+            'rules': len(self.conditions),
+            'comparisons': references,
+            'shared_comparisons': len(self.atoms),
+            'lookups': self.lookups,
+            'evaluations': self.evaluations,
+            'reused': self.lookups - self.evaluations,
+        }
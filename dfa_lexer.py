@@ -0,0 +1,467 @@
+import re
+from sly.lex import Token
+from lexer import DeviceLexer, KEYWORDS
+
+# ============================================================================
+# Lexer alternativo baseado em AFD (autômato finito determinístico)
+#
+# Produz exatamente os mesmos tokens (tipo, valor, linha, índices) que o
+# DeviceLexer do SLY, mas sem a expressão regular mestre: cada caractere é
+# mapeado para uma classe e o próximo estado vem de uma tabela pré-calculada.
+# Ainda não atinge a meta de 5x o DeviceLexer (benchmarks/bench_lexer.py) e
+# por isso não é oferecido em main.LEXER_BACKENDS; MmapDeviceLexer o estende.
+# ============================================================================
+
+# Classes de caracteres
+(C_OTHER, C_LETTER, C_T, C_R, C_U, C_E, C_F, C_A, C_L, C_S,
+ C_DIGIT, C_UDIGIT, C_UNDERSCORE, C_QUOTE, C_SLASH, C_NEWLINE,
+ C_PIPE, C_AMP, C_EQ, C_BANG, C_LT, C_GT,
+ C_COLON, C_DOT, C_COMMA, C_LBRACE, C_RBRACE, C_LPAREN, C_RPAREN) = range(29)
+NUM_CLASSES = 29
+
+# Estados do autômato (S_DEAD indica ausência de transição)
+S_DEAD = -1
+(S_START, S_IDENT,
+ S_T, S_TR, S_TRU, S_TRUE,
+ S_F, S_FA, S_FAL, S_FALS, S_FALSE,
+ S_NUM, S_MSG_BODY, S_MSG, S_SLASH, S_COMMENT, S_NEWLINE,
+ S_PIPE, S_OR, S_AMP, S_AND, S_EQ, S_EQEQ, S_BANG, S_NE,
+ S_LT, S_LE, S_GT, S_GE,
+ S_COLON, S_DOT, S_COMMA, S_LBRACE, S_RBRACE, S_LPAREN, S_RPAREN) = range(36)
+NUM_STATES = 36
+
+
+def _build_ascii_classes() -> tuple:
+    """Classe de cada caractere ASCII (índice = código do caractere)"""
+    classes = [C_OTHER] * 128
+    for ch in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        classes[ord(ch)] = C_LETTER
+    for ch, cls in (("t", C_T), ("r", C_R), ("u", C_U), ("e", C_E),
+                    ("f", C_F), ("a", C_A), ("l", C_L), ("s", C_S)):
+        classes[ord(ch)] = cls
+    for ch in "0123456789":
+        classes[ord(ch)] = C_DIGIT
+    for ch, cls in (("_", C_UNDERSCORE), ('"', C_QUOTE), ("/", C_SLASH), ("\n", C_NEWLINE),
+                    ("|", C_PIPE), ("&", C_AMP), ("=", C_EQ), ("!", C_BANG),
+                    ("<", C_LT), (">", C_GT), (":", C_COLON), (".", C_DOT),
+                    (",", C_COMMA), ("{", C_LBRACE), ("}", C_RBRACE),
+                    ("(", C_LPAREN), (")", C_RPAREN)):
+        classes[ord(ch)] = cls
+    return tuple(classes)
+
+
+def _build_transitions() -> tuple:
+    """Tabela de transições: TRANSITIONS[estado][classe] -> próximo estado"""
+    table = [[S_DEAD] * NUM_CLASSES for _ in range(NUM_STATES)]
+    letters = (C_LETTER, C_T, C_R, C_U, C_E, C_F, C_A, C_L, C_S)
+    ident_chars = letters + (C_DIGIT, C_UNDERSCORE)
+
+    # Identificadores: [a-zA-Z][a-zA-Z0-9_]*
+    for cls in letters:
+        table[S_START][cls] = S_IDENT
+    table[S_START][C_T] = S_T
+    table[S_START][C_F] = S_F
+    for state in (S_IDENT, S_T, S_TR, S_TRU, S_F, S_FA, S_FAL, S_FALS):
+        for cls in ident_chars:
+            table[state][cls] = S_IDENT
+
+    # BOOL: "true"/"false" tem prioridade e termina o token mesmo no meio
+    # de um identificador (mesmo comportamento do padrão (true|false) do SLY)
+    table[S_T][C_R] = S_TR
+    table[S_TR][C_U] = S_TRU
+    table[S_TRU][C_E] = S_TRUE
+    table[S_F][C_A] = S_FA
+    table[S_FA][C_L] = S_FAL
+    table[S_FAL][C_S] = S_FALS
+    table[S_FALS][C_E] = S_FALSE
+
+    # NUM: \d+
+    for cls in (C_DIGIT, C_UDIGIT):
+        table[S_START][cls] = S_NUM
+        table[S_NUM][cls] = S_NUM
+
+    # MSG: "[^"]*"
+    table[S_START][C_QUOTE] = S_MSG_BODY
+    for cls in range(NUM_CLASSES):
+        table[S_MSG_BODY][cls] = S_MSG_BODY
+    table[S_MSG_BODY][C_QUOTE] = S_MSG
+
+    # Comentários: //.*
+    table[S_START][C_SLASH] = S_SLASH
+    table[S_SLASH][C_SLASH] = S_COMMENT
+    for cls in range(NUM_CLASSES):
+        table[S_COMMENT][cls] = S_COMMENT
+    table[S_COMMENT][C_NEWLINE] = S_DEAD
+
+    # Quebras de linha: \n+
+    table[S_START][C_NEWLINE] = S_NEWLINE
+    table[S_NEWLINE][C_NEWLINE] = S_NEWLINE
+
+    # Operadores
+    table[S_START][C_PIPE] = S_PIPE
+    table[S_PIPE][C_PIPE] = S_OR
+    table[S_START][C_AMP] = S_AMP
+    table[S_AMP][C_AMP] = S_AND
+    table[S_START][C_EQ] = S_EQ
+    table[S_EQ][C_EQ] = S_EQEQ
+    table[S_START][C_BANG] = S_BANG
+    table[S_BANG][C_EQ] = S_NE
+    table[S_START][C_LT] = S_LT
+    table[S_LT][C_EQ] = S_LE
+    table[S_START][C_GT] = S_GT
+    table[S_GT][C_EQ] = S_GE
+
+    # Símbolos
+    for cls, state in ((C_COLON, S_COLON), (C_DOT, S_DOT), (C_COMMA, S_COMMA),
+                       (C_LBRACE, S_LBRACE), (C_RBRACE, S_RBRACE),
+                       (C_LPAREN, S_LPAREN), (C_RPAREN, S_RPAREN)):
+        table[S_START][cls] = state
+
+    return tuple(tuple(row) for row in table)
+
+
+ASCII_CLASSES = _build_ascii_classes()
+TRANSITIONS = _build_transitions()
+
+# Tipo de token de cada estado de aceitação (None = estado não final).
+# 'IDENT' passa pela tabela de palavras reservadas; 'comment' e 'newline'
+# são ignorados, como no DeviceLexer.
+ACCEPTING = [None] * NUM_STATES
+for _state in (S_IDENT, S_T, S_TR, S_TRU, S_F, S_FA, S_FAL, S_FALS):
+    ACCEPTING[_state] = 'IDENT'
+for _state, _type in ((S_TRUE, 'BOOL'), (S_FALSE, 'BOOL'), (S_NUM, 'NUM'), (S_MSG, 'MSG'),
+                      (S_COMMENT, 'comment'), (S_NEWLINE, 'newline'),
+                      (S_OR, 'OR'), (S_AND, 'AND'), (S_EQ, 'IGUAL'),
+                      (S_EQEQ, 'OPLOGIC'), (S_NE, 'OPLOGIC'), (S_LT, 'OPLOGIC'),
+                      (S_LE, 'OPLOGIC'), (S_GT, 'OPLOGIC'), (S_GE, 'OPLOGIC'),
+                      (S_COLON, 'DOIS_PONTOS'), (S_DOT, 'PONTO'), (S_COMMA, 'VIRGULA'),
+                      (S_LBRACE, 'ABRE_CHAVE'), (S_RBRACE, 'FECHA_CHAVE'),
+                      (S_LPAREN, 'ABRE_PAREN'), (S_RPAREN, 'FECHA_PAREN')):
+    ACCEPTING[_state] = _type
+ACCEPTING = tuple(ACCEPTING)
+
+# Estados com laço sobre si mesmos consomem a sequência inteira de uma vez
+# (mesmo conjunto de caracteres do laço na tabela de transições)
+RUNS = [None] * NUM_STATES
+RUNS[S_IDENT] = re.compile(r'[a-zA-Z0-9_]*').match
+RUNS[S_NUM] = re.compile(r'\d*').match
+RUNS[S_MSG_BODY] = re.compile(r'[^"]*').match
+RUNS[S_COMMENT] = re.compile(r'[^\n]*').match
+RUNS[S_NEWLINE] = re.compile(r'\n*').match
+RUNS = tuple(RUNS)
+
+# Estados que, depois de consumir seu laço, não têm mais transições possíveis
+CLOSED = tuple(
+    all(nxt in (S_DEAD, state) for nxt in TRANSITIONS[state]) and
+    (RUNS[state] is not None or all(nxt == S_DEAD for nxt in TRANSITIONS[state]))
+    for state in range(NUM_STATES)
+)
+
+# Transição a partir do estado inicial indexada diretamente pelo caractere
+# ASCII; os caracteres ignorados levam ao pseudo-estado S_SKIP
+S_SKIP = NUM_STATES
+START_TRANSITIONS = {chr(code): TRANSITIONS[S_START][cls] for code, cls in enumerate(ASCII_CLASSES)}
+for _ch in DeviceLexer.ignore:
+    START_TRANSITIONS[_ch] = S_SKIP
+
+# Tipo de token de cada identificador reservado
+KEYWORD_TYPES = {keyword: keyword.upper() for keyword in KEYWORDS}
+
+
+class DFADeviceLexer:
+    """Lexer dirigido por tabela com a mesma saída do DeviceLexer"""
+
+    tokens = DeviceLexer.tokens
+    ignore = DeviceLexer.ignore
+
+    def __init__(self):
+        self.text = ""
+        self.index = 0
+        self.lineno = 1
+
+    # Mesmo corte da entrada em pedaços do DeviceLexer; só depende de
+    # tokenize() e de self.lineno
+    tokenize_stream = DeviceLexer.tokenize_stream
+
+    def tokenize(self, text: str, lineno: int = 1, index: int = 0):
+        """Gera os tokens de text, no mesmo formato do SLY"""
+        start_transitions = START_TRANSITIONS
+        classes = ASCII_CLASSES
+        transitions = TRANSITIONS
+        accepting = ACCEPTING
+        runs = RUNS
+        closed = CLOSED
+        keyword_types = KEYWORD_TYPES
+        length = len(text)
+
+        self.text = text
+        try:
+            while index < length:
+                ch = text[index]
+                state = start_transitions.get(ch)
+                if state is None:
+                    state = transitions[S_START][C_UDIGIT if ch.isdecimal() else C_OTHER]
+                elif state == S_SKIP:
+                    index += 1
+                    continue
+
+                # Primeira transição: estados fechados (a maioria dos tokens)
+                # terminam aqui, sem entrar no laço do autômato
+                last_type = None
+                if state >= 0:
+                    pos = index + 1
+                    run = runs[state]
+                    if run is not None:
+                        pos = run(text, pos).end()
+                    last_type = accepting[state]
+                    last_end = pos
+
+                    # Percorre o autômato guardando o último estado de aceitação
+                    if not closed[state]:
+                        while pos < length:
+                            ch = text[pos]
+                            code = ord(ch)
+                            if code < 128:
+                                cls = classes[code]
+                            else:
+                                cls = C_UDIGIT if ch.isdecimal() else C_OTHER
+                            state = transitions[state][cls]
+                            if state < 0:
+                                break
+                            pos += 1
+                            run = runs[state]
+                            if run is not None:
+                                pos = run(text, pos).end()
+                            if accepting[state] is not None:
+                                last_type = accepting[state]
+                                last_end = pos
+                            if closed[state]:
+                                break
+
+                if last_type is None:
+                    # Erro léxico: delega ao tratamento de erro (avança um caractere)
+                    self.index = index
+                    self.lineno = lineno
+                    tok = Token()
+                    tok.type = 'ERROR'
+                    tok.value = text[index:]
+                    tok.lineno = lineno
+                    tok.index = index
+                    self.error(tok)
+                    index = self.index
+                    lineno = self.lineno
+                    continue
+
+                value = text[index:last_end]
+                if last_type == 'IDENT':
+                    last_type = keyword_types.get(value, 'OBSERVATION')
+                elif last_type == 'newline':
+                    lineno += last_end - index
+                    index = last_end
+                    continue
+                elif last_type == 'comment':
+                    index = last_end
+                    continue
+                elif last_type == 'NUM':
+                    value = int(value)
+                elif last_type == 'BOOL':
+                    value = value == 'true'
+                elif last_type == 'MSG':
+                    value = value[1:-1]
+
+                tok = Token()
+                tok.type = last_type
+                tok.value = value
+                tok.lineno = lineno
+                tok.index = index
+                tok.end = index = last_end
+                yield tok
+        finally:
+            self.index = index
+            self.lineno = lineno
+
+    def error(self, t):
+        print(f"Erro léxico: caractere ilegal '{t.value[0]}' na linha {self.lineno}")
+        self.index += 1
+
+
+# ============================================================================
+# Variante sobre buffers UTF-8 (bytes, mmap), sem decodificar a entrada
+# ============================================================================
+
+# Os padrões de laço sobre bytes só cobrem ASCII; dígitos Unicode de NUM
+# passam pelo laço do autômato, por isso S_NUM não é fechado aqui
+BYTE_RUNS = [None] * NUM_STATES
+BYTE_RUNS[S_IDENT] = re.compile(rb'[a-zA-Z0-9_]*').match
+BYTE_RUNS[S_NUM] = re.compile(rb'[0-9]*').match
+BYTE_RUNS[S_MSG_BODY] = re.compile(rb'[^"]*').match
+BYTE_RUNS[S_COMMENT] = re.compile(rb'[^\n]*').match
+BYTE_RUNS[S_NEWLINE] = re.compile(rb'\n*').match
+BYTE_RUNS = tuple(BYTE_RUNS)
+BYTE_CLOSED = tuple(closed and state != S_NUM for state, closed in enumerate(CLOSED))
+
+# Transição a partir do estado inicial indexada pelo byte; None indica o
+# início de uma sequência UTF-8 multibyte, que precisa ser decodificada
+BYTE_START_TRANSITIONS = tuple(
+    START_TRANSITIONS[chr(code)] if code < 128 else None for code in range(256)
+)
+
+# Palavras reservadas indexadas pelos bytes do lexema
+BYTE_KEYWORDS = {keyword.encode('ascii'): (keyword.upper(), keyword) for keyword in KEYWORDS}
+MAX_KEYWORD_LENGTH = max(len(keyword) for keyword in KEYWORDS)
+
+
+def utf8_char(buffer, pos: int) -> tuple:
+    """Decodifica o caractere UTF-8 que começa em pos; retorna (caractere, tamanho)"""
+    lead = buffer[pos]
+    width = 1 if lead < 0x80 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    return bytes(buffer[pos:pos + width]).decode('utf-8'), width
+
+
+class LazyToken(Token):
+    """Token que guarda apenas offsets no buffer e decodifica o valor no acesso"""
+
+    __slots__ = ('_buffer', '_value')
+
+    @property
+    def value(self):
+        if self._buffer is not None:
+            if self.type == 'MSG':
+                raw = self._buffer[self.index + 1:self.end - 1]
+            else:
+                raw = self._buffer[self.index:self.end]
+            self._value = bytes(raw).decode('utf-8')
+            self._buffer = None
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._buffer = None
+
+
+class MmapDeviceLexer(DFADeviceLexer):
+    """Lexer AFD sobre um buffer UTF-8 (ex.: arquivo mapeado com mmap)
+
+    Os índices dos tokens são offsets em bytes no buffer. Valores de MSG,
+    OBSERVATION e NAMEDEVICE só são decodificados quando acessados.
+    """
+
+    def tokenize_stream(self, chunks, lineno: int = 1):
+        raise Exception("O lexer 'mmap' trabalha sobre um buffer completo e não tokeniza "
+                        "pedaços de texto; use o lexer 'sly'")
+
+    def tokenize(self, text, lineno: int = 1, index: int = 0):
+        """Gera os tokens de um buffer (str é codificada em UTF-8 antes)"""
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+
+        start_transitions = BYTE_START_TRANSITIONS
+        classes = ASCII_CLASSES
+        transitions = TRANSITIONS
+        accepting = ACCEPTING
+        runs = BYTE_RUNS
+        closed = BYTE_CLOSED
+        byte_keywords = BYTE_KEYWORDS
+        max_keyword_length = MAX_KEYWORD_LENGTH
+        length = len(text)
+
+        self.text = text
+        try:
+            while index < length:
+                state = start_transitions[text[index]]
+                width = 1
+                if state is None:
+                    ch, width = utf8_char(text, index)
+                    state = transitions[S_START][C_UDIGIT if ch.isdecimal() else C_OTHER]
+                elif state == S_SKIP:
+                    index += 1
+                    continue
+
+                last_type = None
+                if state >= 0:
+                    pos = index + width
+                    run = runs[state]
+                    if run is not None:
+                        pos = run(text, pos).end()
+                    last_type = accepting[state]
+                    last_end = pos
+
+                    # Percorre o autômato guardando o último estado de aceitação
+                    if not closed[state]:
+                        while pos < length:
+                            code = text[pos]
+                            if code < 128:
+                                cls = classes[code]
+                                width = 1
+                            else:
+                                ch, width = utf8_char(text, pos)
+                                cls = C_UDIGIT if ch.isdecimal() else C_OTHER
+                            state = transitions[state][cls]
+                            if state < 0:
+                                break
+                            pos += width
+                            run = runs[state]
+                            if run is not None:
+                                pos = run(text, pos).end()
+                            if accepting[state] is not None:
+                                last_type = accepting[state]
+                                last_end = pos
+                            if closed[state]:
+                                break
+
+                if last_type is None:
+                    # Erro léxico: delega ao tratamento de erro (avança um caractere)
+                    self.index = index
+                    self.lineno = lineno
+                    tok = Token()
+                    tok.type = 'ERROR'
+                    tok.value = utf8_char(text, index)[0]
+                    tok.lineno = lineno
+                    tok.index = index
+                    self.error(tok)
+                    index = self.index
+                    lineno = self.lineno
+                    continue
+
+                if last_type == 'newline':
+                    lineno += last_end - index
+                    index = last_end
+                    continue
+                elif last_type == 'comment':
+                    index = last_end
+                    continue
+
+                keyword = None
+                if last_type == 'IDENT' and last_end - index <= max_keyword_length:
+                    keyword = byte_keywords.get(bytes(text[index:last_end]))
+
+                if keyword is not None:
+                    tok = Token()
+                    tok.type, tok.value = keyword
+                elif last_type == 'IDENT' or last_type == 'MSG':
+                    tok = LazyToken()
+                    tok.type = 'OBSERVATION' if last_type == 'IDENT' else 'MSG'
+                    tok._buffer = text
+                else:
+                    raw = bytes(text[index:last_end])
+                    tok = Token()
+                    tok.type = last_type
+                    if last_type == 'NUM':
+                        tok.value = int(raw) if raw.isdigit() else int(raw.decode('utf-8'))
+                    elif last_type == 'BOOL':
+                        tok.value = raw == b'true'
+                    else:
+                        tok.value = raw.decode('ascii')
+
+                tok.lineno = lineno
+                tok.index = index
+                tok.end = index = last_end
+                yield tok
+        finally:
+            self.index = index
+            self.lineno = lineno
+
+    def error(self, t):
+        print(f"Erro léxico: caractere ilegal '{t.value[0]}' na linha {self.lineno}")
+        self.index += len(t.value[0].encode('utf-8'))
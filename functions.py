@@ -1,14 +1,182 @@
+import atexit
+import sys
+import threading
+import time
+from typing import Optional
+
 def ligar ( namedevice ):
+ if _dispatcher is not None:
+  return _dispatcher.ligar(namedevice)
  print ( namedevice +" ligado !")
 
 def desligar ( namedevice ):
+ if _dispatcher is not None:
+  return _dispatcher.desligar(namedevice)
  print ( namedevice +" desligado !")
 
 def alerta ( namedevice , msg ):
+    if _dispatcher is not None:
+        return _dispatcher.alerta(namedevice, msg)
     print ( namedevice +" recebeu o alerta :\ n ")
     print ( msg )
     
 def alertavar ( namedevice , msg , var ):
+     if _dispatcher is not None:
+         return _dispatcher.alertavar(namedevice, msg, var)
      print ( namedevice +" recebeu o alerta :\ n ")
      print ( msg + " "+ var )
- 
\ No newline at end of file
+
+def alerta_todos ( namedevices , msg ):
+    """Alerta broadcast: equivale a alerta(d, msg) para cada dispositivo"""
+    if _dispatcher is not None:
+        return _dispatcher.alerta_todos(namedevices, msg)
+    for namedevice in namedevices:
+        alerta(namedevice, msg)
+
+
+# ============================================================================
+# Despacho de ações em lote
+#
+# Com um ActionDispatcher ativo (set_dispatcher), as funções acima apenas
+# enfileiram a ação; os lotes são entregues a um sink quando atingem
+# batch_size ações ou quando a ação mais antiga do lote completa
+# flush_interval segundos (por um timer, mesmo que nenhuma outra ação
+# chegue; com flush_interval=None só batch_size e flush() esvaziam o lote).
+# Um broadcast ocupa uma única entrada do lote.
+# ============================================================================
+
+# Tipos de entrada de um lote: (tipo, dispositivo(s), argumentos...)
+LIGAR, DESLIGAR, ALERTA, ALERTAVAR, ALERTA_TODOS = 'ligar', 'desligar', 'alerta', 'alertavar', 'alerta_todos'
+
+# Despachante usado pelas funções do módulo (None: impressão imediata)
+_dispatcher = None
+
+
+def format_action(action: tuple) -> str:
+    """Texto impresso pelas funções síncronas para uma entrada de lote"""
+    kind = action[0]
+    if kind == LIGAR:
+        return action[1] + " ligado !\n"
+    if kind == DESLIGAR:
+        return action[1] + " desligado !\n"
+    if kind == ALERTA:
+        return action[1] + " recebeu o alerta :\\ n \n" + action[2] + "\n"
+    if kind == ALERTAVAR:
+        return action[1] + " recebeu o alerta :\\ n \n" + action[2] + " " + action[3] + "\n"
+    if kind == ALERTA_TODOS:
+        return "".join(format_action((ALERTA, namedevice, action[2])) for namedevice in action[1])
+    raise Exception(f"Tipo de ação desconhecido: {kind}")
+
+
+class StreamSink:
+    """Sink que escreve o texto de um lote inteiro com uma única escrita"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def __call__(self, batch: list):
+        stream = self.stream or sys.stdout
+        stream.write("".join(format_action(action) for action in batch))
+        stream.flush()
+
+
+class ActionDispatcher:
+    """Acumula ações de dispositivos e as entrega em lotes a um sink
+
+    O sink é qualquer chamável que recebe a lista de entradas do lote
+    (tuplas como ('ligar', dispositivo) ou ('alerta_todos', dispositivos,
+    mensagem)); o padrão é StreamSink, que produz a mesma saída das funções
+    síncronas.
+    """
+
+    def __init__(self, sink=None, batch_size: int = 1024, flush_interval: Optional[float] = 0.1):
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser positivo")
+        # Um intervalo zero esvaziaria o lote a cada ação, desligando o agrupamento
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError("flush_interval deve ser positivo (ou None para não ter limite de tempo)")
+        self.sink = sink or StreamSink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.batch = []
+        self.batch_started = 0.0
+        self.dispatched = 0
+        self.flushes = 0
+        # O timer esvazia o lote em outra thread; o lock protege o lote e a
+        # ordem das escritas no sink
+        self.lock = threading.RLock()
+        self.timer = None
+
+    def ligar(self, namedevice: str):
+        self.submit((LIGAR, namedevice))
+
+    def desligar(self, namedevice: str):
+        self.submit((DESLIGAR, namedevice))
+
+    def alerta(self, namedevice: str, msg: str):
+        self.submit((ALERTA, namedevice, msg))
+
+    def alertavar(self, namedevice: str, msg: str, var: str):
+        self.submit((ALERTAVAR, namedevice, msg, var))
+
+    def alerta_todos(self, namedevices, msg: str):
+        self.submit((ALERTA_TODOS, tuple(namedevices), msg))
+
+    def submit(self, action: tuple):
+        """Enfileira uma entrada, esvaziando o lote se ele estiver cheio ou antigo"""
+        with self.lock:
+            batch = self.batch
+            if not batch:
+                self.batch_started = time.monotonic()
+                if self.flush_interval is not None:
+                    self._schedule()
+            batch.append(action)
+            if len(batch) >= self.batch_size or (self.flush_interval is not None and
+                                                  time.monotonic() - self.batch_started >= self.flush_interval):
+                self.flush()
+
+    def _schedule(self):
+        """Agenda a entrega do lote que está começando"""
+        timer = threading.Timer(self.flush_interval, self.flush)
+        timer.daemon = True
+        self.timer = timer
+        timer.start()
+
+    def flush(self):
+        """Entrega ao sink as ações pendentes"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.batch:
+                return
+            batch, self.batch = self.batch, []
+            self.sink(batch)
+            self.dispatched += len(batch)
+            self.flushes += 1
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def set_dispatcher(dispatcher):
+    """Ativa um ActionDispatcher para as funções do módulo (None volta à impressão
+    imediata); o anterior é esvaziado e retornado
+    """
+    global _dispatcher
+    previous, _dispatcher = _dispatcher, dispatcher
+    if previous is not None:
+        previous.flush()
+    return previous
+
+
+@atexit.register
+def _flush_at_exit():
+    if _dispatcher is not None:
+        _dispatcher.flush()
@@ -0,0 +1,199 @@
+import operator
+import sys
+from typing import Dict, List, Optional, Union
+from ast_nodes import (Program, Command, Attribution, ObservationAction, Observation,
+                       Action, SimpleAction, AlertAction, BroadcastAlertAction)
+
+# ============================================================================
+# Interpretador de programas ObsAct: executa a AST diretamente, sem gerar
+# nem importar código Python
+# ============================================================================
+
+# Operadores relacionais do ObsAct e suas funções Python
+OPERATOR_FUNCTIONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '>': operator.gt,
+}
+
+
+class DeviceBackend:
+    """Destino das ações executadas pelo interpretador
+
+    A implementação padrão usa as funções de functions.py, como o código
+    gerado. Subclasses podem redefinir os quatro métodos para controlar
+    dispositivos reais, registrar eventos etc. Um functions.ActionDispatcher
+    também pode ser usado diretamente como backend, despachando as ações
+    em lotes.
+    """
+
+    def ligar(self, namedevice: str):
+        import functions
+        functions.ligar(namedevice)
+
+    def desligar(self, namedevice: str):
+        import functions
+        functions.desligar(namedevice)
+
+    def alerta(self, namedevice: str, msg: str):
+        import functions
+        functions.alerta(namedevice, msg)
+
+    def alertavar(self, namedevice: str, msg: str, var: str):
+        import functions
+        functions.alertavar(namedevice, msg, var)
+
+    def alerta_todos(self, namedevices: List[str], msg: str):
+        """Alerta broadcast; por padrão, um alerta por dispositivo"""
+        for namedevice in namedevices:
+            self.alerta(namedevice, msg)
+
+
+class RecordingBackend(DeviceBackend):
+    """Backend que apenas registra as ações como tuplas (função, argumentos...)"""
+
+    def __init__(self):
+        self.events = []
+
+    def ligar(self, namedevice: str):
+        self.events.append(('ligar', namedevice))
+
+    def desligar(self, namedevice: str):
+        self.events.append(('desligar', namedevice))
+
+    def alerta(self, namedevice: str, msg: str):
+        self.events.append(('alerta', namedevice, msg))
+
+    def alertavar(self, namedevice: str, msg: str, var: str):
+        self.events.append(('alertavar', namedevice, msg, var))
+
+
+class Interpreter:
+    """Executa um Program (ou ColumnarProgram) contra um DeviceBackend
+
+    A semântica é a do código gerado pelo CodeGenerator: as observações
+    declaradas começam com None, condições encadeadas seguem a precedência
+    do Python (and antes de or, com curto-circuito) e alertas com variável
+    enviam str(valor).
+    """
+
+    def __init__(self, backend: Optional[DeviceBackend] = None):
+        self.backend = backend or DeviceBackend()
+        self.variables = {}
+
+    def run(self, program: Program, observations: Optional[Dict[str, Union[int, bool]]] = None) -> dict:
+        """Executa o programa e retorna o valor final das observações
+
+        observations permite fornecer valores iniciais (por exemplo, leituras
+        de sensores) no lugar de None.
+        """
+        self.variables = {}
+        for device in program.devices:
+            if device.observation:
+                self.variables[device.observation] = None
+        if observations:
+            self.variables.update(observations)
+
+        for command in program.commands:
+            self.execute(command)
+        return self.variables
+
+    def execute(self, command: Command):
+        """Executa um comando"""
+        if isinstance(command, Attribution):
+            self.variables[command.observation] = command.value
+        elif isinstance(command, ObservationAction):
+            if self.evaluate(command.condition):
+                self.perform(command.then_action)
+            elif command.else_action:
+                self.perform(command.else_action)
+        elif isinstance(command, Action):
+            self.perform(command)
+        else:
+            raise TypeError(f"Tipo de comando desconhecido: {type(command)}")
+
+    def evaluate(self, obs: Observation) -> bool:
+        """Avalia uma cadeia de observações
+
+        A cadeia é percorrida como uma disjunção de grupos de conjunções:
+        cada "||" fecha o grupo atual. Um grupo falso pula as comparações
+        restantes até o próximo "||"; um grupo verdadeiro encerra a avaliação.
+        """
+        while obs is not None:
+            # Avalia o grupo de comparações ligadas por "&&"
+            if self.compare(obs):
+                while obs.next_obs is not None and obs.logical_op == '&&':
+                    obs = obs.next_obs
+                    if not self.compare(obs):
+                        break
+                else:
+                    return True
+
+            # Grupo falso: avança até o próximo "||"
+            while obs is not None and obs.logical_op != '||':
+                obs = obs.next_obs
+            if obs is not None:
+                obs = obs.next_obs
+        return False
+
+    def compare(self, obs: Observation) -> bool:
+        """Avalia uma comparação atômica"""
+        try:
+            current = self.variables[obs.observation]
+        except KeyError:
+            raise NameError(f"Observação não definida: {obs.observation}") from None
+        return OPERATOR_FUNCTIONS[obs.operator](current, obs.value)
+
+    def perform(self, action: Action):
+        """Executa uma ação no backend"""
+        if isinstance(action, SimpleAction):
+            if action.action_type == 'ligar':
+                self.backend.ligar(action.device)
+            else:
+                self.backend.desligar(action.device)
+        elif isinstance(action, AlertAction):
+            if action.observation:
+                try:
+                    value = self.variables[action.observation]
+                except KeyError:
+                    raise NameError(f"Observação não definida: {action.observation}") from None
+                self.backend.alertavar(action.device, action.message, str(value))
+            else:
+                self.backend.alerta(action.device, action.message)
+        elif isinstance(action, BroadcastAlertAction):
+            self.backend.alerta_todos(action.devices, action.message)
+        else:
+            raise TypeError(f"Tipo de ação desconhecido: {type(action)}")
+
+
+def interpret_main(argv: List[str]) -> int:
+    """Executa um arquivo .obs diretamente; retorna o código de saída"""
+    from main import DeviceLanguageProcessor
+
+    if len(argv) < 1:
+        print("Uso: python interpreter.py arquivo.obs")
+        return 1
+
+    try:
+        with open(argv[0], 'r', encoding='utf-8') as f:
+            obs_code = f.read()
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{argv[0]}' não encontrado")
+        return 1
+
+    result = DeviceLanguageProcessor().analyze(obs_code, show_tokens=False, show_ast=False)
+    if not result['success']:
+        print("Execução falhou devido a erros de sintaxe:")
+        for error in result['errors']:
+            print(f"  {error}")
+        return 1
+
+    Interpreter().run(result['ast'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(interpret_main(sys.argv[1:]))
@@ -0,0 +1,139 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Optional, Set, Tuple
+from ast_nodes import ObservationAction
+
+# ============================================================================
+# Índice de limiares: regras cuja condição é uma única comparação de uma
+# observação com um número (ex.: `se temperatura > 30 entao ...`) ficam em
+# listas ordenadas por limiar, uma por observação e operador. As regras
+# satisfeitas por um valor formam um intervalo encontrado por busca binária.
+# ============================================================================
+
+# Limites das chaves (limiar, regra) usadas nas buscas
+_BEFORE = -1
+_AFTER = float('inf')
+
+
+def threshold_of(rule: ObservationAction) -> Optional[Tuple[str, str, object]]:
+    """(observação, operador, limiar) se a regra for indexável, senão None"""
+    obs = rule.condition
+    if obs is None or obs.next_obs is not None:
+        return None
+    if isinstance(obs.value, bool) or not isinstance(obs.value, (int, float)):
+        return None
+    return obs.observation, obs.operator, obs.value
+
+
+def is_numeric(value) -> bool:
+    """Valores que podem ser comparados com os limiares pelo índice"""
+    return isinstance(value, (int, float))
+
+
+class ThresholdIndex:
+    """Índice de regras de limiar por observação
+
+    Para cada observação e operador relacional guarda uma lista ordenada de
+    (limiar, id da regra); para == e != usa um dicionário limiar -> ids. As
+    regras podem ser adicionadas e removidas individualmente, sem
+    reconstruir o índice.
+    """
+
+    def __init__(self):
+        # observação -> operador -> lista ordenada de (limiar, regra)
+        self.sorted = {}
+        # observação -> limiar -> regras com == (e com !=)
+        self.equal = {}
+        self.not_equal = {}
+        # observação -> todas as regras com != (satisfeitas exceto no limiar)
+        self.not_equal_rules = {}
+        # regra -> (observação, operador, limiar)
+        self.rules = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __contains__(self, rule_id: int) -> bool:
+        return rule_id in self.rules
+
+    def add(self, rule_id: int, observation: str, operator: str, threshold):
+        """Indexa a regra `observation operator threshold`"""
+        if rule_id in self.rules:
+            raise Exception(f"Regra {rule_id} já está no índice")
+        self.rules[rule_id] = (observation, operator, threshold)
+        if operator == '==':
+            self.equal.setdefault(observation, {}).setdefault(threshold, set()).add(rule_id)
+        elif operator == '!=':
+            self.not_equal.setdefault(observation, {}).setdefault(threshold, set()).add(rule_id)
+            self.not_equal_rules.setdefault(observation, set()).add(rule_id)
+        else:
+            insort(self.sorted.setdefault(observation, {}).setdefault(operator, []), (threshold, rule_id))
+
+    def remove(self, rule_id: int):
+        """Remove a regra do índice"""
+        observation, operator, threshold = self.rules.pop(rule_id)
+        if operator == '==':
+            self.equal[observation][threshold].discard(rule_id)
+        elif operator == '!=':
+            self.not_equal[observation][threshold].discard(rule_id)
+            self.not_equal_rules[observation].discard(rule_id)
+        else:
+            entries = self.sorted[observation][operator]
+            del entries[bisect_left(entries, (threshold, rule_id))]
+
+    def satisfied(self, observation: str, value) -> Set[int]:
+        """Regras da observação satisfeitas pelo valor"""
+        result = set()
+        for operator, entries in self.sorted.get(observation, {}).items():
+            start, end = self._satisfied_range(operator, entries, value)
+            result.update(rule_id for _, rule_id in entries[start:end])
+        result.update(self.equal.get(observation, {}).get(value, ()))
+        not_equal = self.not_equal_rules.get(observation)
+        if not_equal:
+            result.update(not_equal - self.not_equal[observation].get(value, set()))
+        return result
+
+    def changed(self, observation: str, old, new) -> Tuple[Set[int], Set[int]]:
+        """(regras que passaram a ser satisfeitas, regras que deixaram de ser)
+        quando a observação muda de old para new
+
+        Se old não for numérico (ex.: None, primeira leitura), todas as
+        regras satisfeitas por new são consideradas novas.
+        """
+        if not is_numeric(old):
+            return self.satisfied(observation, new), set()
+
+        became, ceased = set(), set()
+        for operator, entries in self.sorted.get(observation, {}).items():
+            old_start, old_end = self._satisfied_range(operator, entries, old)
+            new_start, new_end = self._satisfied_range(operator, entries, new)
+            # Os intervalos satisfeitos são prefixos (> e >=) ou sufixos (< e <=)
+            # da lista; a diferença entre eles é um único trecho contíguo
+            if operator in ('>', '>='):
+                low, high = sorted((old_end, new_end))
+                target = became if new_end > old_end else ceased
+            else:
+                low, high = sorted((old_start, new_start))
+                target = became if new_start < old_start else ceased
+            target.update(rule_id for _, rule_id in entries[low:high])
+
+        if old != new:
+            equal = self.equal.get(observation, {})
+            became.update(equal.get(new, ()))
+            ceased.update(equal.get(old, ()))
+            not_equal = self.not_equal.get(observation, {})
+            became.update(not_equal.get(old, ()))
+            ceased.update(not_equal.get(new, ()))
+        return became, ceased
+
+    @staticmethod
+    def _satisfied_range(operator: str, entries: List[tuple], value) -> Tuple[int, int]:
+        """Intervalo [início, fim) de entries satisfeito pelo valor"""
+        if operator == '>':      # limiar < valor: prefixo
+            return 0, bisect_left(entries, (value, _BEFORE))
+        if operator == '>=':     # limiar <= valor: prefixo
+            return 0, bisect_right(entries, (value, _AFTER))
+        if operator == '<':      # limiar > valor: sufixo
+            return bisect_right(entries, (value, _AFTER)), len(entries)
+        if operator == '<=':     # limiar >= valor: sufixo
+            return bisect_left(entries, (value, _BEFORE)), len(entries)
+        raise Exception(f"Operador não indexável: {operator}")
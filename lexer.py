@@ -1,4 +1,21 @@
+import re
+from typing import Optional
 from sly import Lexer
+
+# Tabela única (imutável) de palavras reservadas, compartilhada pelos lexers
+KEYWORDS = frozenset({
+    'dispositivo', 'set', 'se', 'entao', 'senao', 'enviar',
+    'alerta', 'para', 'todos', 'ligar', 'desligar', 'true', 'false'
+})
+
+# Delimitadores relevantes para achar um ponto seguro de corte na entrada
+_STREAM_DELIMITERS = re.compile(r'"|//|\n')
+
+# Tamanho máximo de uma mensagem em tokenize_stream: uma aspa sem fechamento
+# não pode reter o resto do stream em memória
+STREAM_MAX_MESSAGE = 1 << 20
+
+
 class DeviceLexer(Lexer):
     ignore = " \t\r"
     literals = { }
@@ -63,11 +80,7 @@ class DeviceLexer(Lexer):
     OBSERVATION = r'[a-zA-Z][a-zA-Z0-9_]*'
 
     def OBSERVATION(self, t):
-        keywords = {
-            'dispositivo', 'set', 'se', 'entao', 'senao', 'enviar',
-            'alerta', 'para', 'todos', 'ligar', 'desligar', 'true', 'false'
-        }
-        if t.value in keywords:
+        if t.value in KEYWORDS:
             t.type = t.value.upper()
         return t
 
@@ -75,11 +88,7 @@ class DeviceLexer(Lexer):
     NAMEDEVICE = r'[a-zA-Z]+'
 
     def NAMEDEVICE(self, t):
-        keywords = {
-            'dispositivo', 'set', 'se', 'entao', 'senao', 'enviar',
-            'alerta', 'para', 'todos', 'ligar', 'desligar', 'true', 'false'
-        }
-        if t.value in keywords:
+        if t.value in KEYWORDS:
             t.type = t.value.upper()
         return t
 
@@ -91,6 +100,92 @@ class DeviceLexer(Lexer):
     def ignore_newline(self, t):
         self.lineno += len(t.value)
 
+    def tokenize_stream(self, chunks, lineno: int = 1, max_message: Optional[int] = None):
+        """Tokeniza uma sequência de pedaços de texto (ex.: pipe ou socket)
+
+        Os tokens são gerados à medida que os pedaços chegam. A entrada só é
+        cortada logo após uma quebra de linha fora de mensagens e comentários,
+        de modo que tokens e comentários divididos entre pedaços são
+        reconstituídos. Índices e linhas são relativos à entrada completa.
+        Cada pedaço é examinado uma única vez; uma mensagem aberta com mais
+        de max_message (padrão: STREAM_MAX_MESSAGE) caracteres é um erro.
+        """
+        # O padrão não pode vir na assinatura: no corpo da classe o SLY
+        # transforma nomes em maiúsculas em nomes de token
+        if max_message is None:
+            max_message = STREAM_MAX_MESSAGE
+        pending = []        # Pedaços desde o último corte, ainda não analisados
+        pending_size = 0
+        base = 0            # Offset de pending[0] na entrada completa
+        in_msg = False      # Aspas abertas ainda sem fechamento
+        msg_start = 0       # Offset da aspa aberta na entrada completa
+        in_comment = False
+        slash = False       # O pedaço anterior terminou com '/' fora de mensagens
+
+        for chunk in chunks:
+            scan = 0
+            cut = 0
+            if slash and chunk.startswith('/'):
+                in_comment = True
+                scan = 1
+            slash = False
+
+            while scan < len(chunk):
+                if in_msg:
+                    end = chunk.find('"', scan)
+                    if end < 0:
+                        break
+                    in_msg = False
+                    scan = end + 1
+                elif in_comment:
+                    end = chunk.find('\n', scan)
+                    if end < 0:
+                        break
+                    in_comment = False
+                    scan = end
+                else:
+                    m = _STREAM_DELIMITERS.search(chunk, scan)
+                    if m is None:
+                        # Uma '/' final pode ser o início de um comentário
+                        slash = chunk.endswith('/')
+                        break
+                    delimiter = m.group()
+                    scan = m.end()
+                    if delimiter == '\n':
+                        cut = scan
+                    elif delimiter == '"':
+                        in_msg = True
+                        msg_start = base + pending_size + m.start()
+                    else:
+                        in_comment = True
+
+            if cut:
+                pending.append(chunk[:cut])
+                text = "".join(pending)
+                for tok in self.tokenize(text, lineno):
+                    tok.index += base
+                    tok.end += base
+                    yield tok
+                lineno = self.lineno
+                base += len(text)
+                pending = [chunk[cut:]]
+                pending_size = len(chunk) - cut
+            else:
+                pending.append(chunk)
+                pending_size += len(chunk)
+
+            if in_msg and base + pending_size - msg_start > max_message:
+                text = "".join(pending)
+                line = lineno + text.count('\n', 0, msg_start - base)
+                raise Exception(f"Mensagem sem aspas de fechamento na linha {line} "
+                                f"(mais de {max_message} caracteres)")
+
+        # Fim da entrada: o que restou é analisado de uma vez
+        for tok in self.tokenize("".join(pending), lineno):
+            tok.index += base
+            tok.end += base
+            yield tok
+
     def error(self, t):
         print(f"Erro léxico: caractere ilegal '{t.value[0]}' na linha {self.lineno}")
         self.index += 1
@@ -1,30 +1,62 @@
+import hashlib
+import io
+import mmap
+import os
+import sys
+from collections import OrderedDict
 from typing import List, Optional, Union
 from ast_nodes import *
+from ast_codegen import DEVICE_FUNCTIONS, PythonASTGenerator
+from columnar import ColumnarProgram
+from compile_cache import CompileCache
+from optimizer import optimize
 from lexer import DeviceLexer
+from dfa_lexer import MmapDeviceLexer
 from parser import DeviceParser
 
 # Gerador de Código
 class CodeGenerator:
     """Gera código Python a partir da AST do ObsAct"""
 
-    def __init__(self):
-        self.output_lines = []
+    def __init__(self, async_mode: bool = False):
+        # Com async_mode, gera `async def main()` que aguarda (await) as ações
+        # das funções assíncronas de async_functions.py
+        self.async_mode = async_mode
+        self.output = None
         self.indent_level = 0
         self.devices = set()
         self.variables = set()
-
-    def generate(self, ast: Program) -> str:
-        """Gera código Python a partir da AST"""
-        self.output_lines = []
+        self._indents = [""]
+        self._first_line = True
+        # No modo assíncrono, as ações de um grupo concorrente são guardadas
+        # em _acoes em vez de aguardadas uma a uma
+        self.gathering = False
+
+    def generate(self, ast: Union[Program, ColumnarProgram], output: Optional[io.TextIOBase] = None) -> Optional[str]:
+        """Gera código Python a partir da AST (árvore de objetos ou colunar)
+
+        Sem output, retorna o código como string. Com output (stream de
+        texto gravável), as linhas são escritas diretamente nele e nada é
+        retornado.
+        """
+        to_string = output is None
+        self.output = io.StringIO() if to_string else output
         self.indent_level = 0
         self.devices = set()
         self.variables = set()
+        self._first_line = True
+        self.gathering = False
 
         self.add_line("# Código Python gerado a partir do programa ObsAct")
         self.add_line("# Gerado usando parser baseado em SLY e gerador de código")
         self.add_line("")
         self.add_line("# Importa funções de controle de dispositivos")
-        self.add_line("from functions import ligar, desligar, alerta, alertavar")
+        module = "async_functions" if self.async_mode else "functions"
+        if self.async_mode:
+            self.add_line("import asyncio")
+        self.add_line(f"from {module} import ligar, desligar, alerta, alertavar")
+        if self.uses_broadcast(ast):
+            self.generate_broadcast_import(module)
         self.add_line("")
 
         # Coleta informações dos dispositivos
@@ -35,30 +67,47 @@ class CodeGenerator:
 
         # Gera lógica principal do programa
         self.add_line("# Lógica principal do programa")
-        self.add_line("def main():")
+        self.add_line("async def main():" if self.async_mode else "def main():")
         self.indent_level += 1
 
         # Inicializa variáveis das observações dos dispositivos
         self.generate_variable_initializations(ast.devices)
 
         # Gera comandos
-        for command in ast.commands:
-            self.generate_command(command)
+        if self.async_mode:
+            self.generate_async_commands(ast.commands)
+        else:
+            for command in ast.commands:
+                self.generate_command(command)
 
         self.indent_level -= 1
         self.add_line("")
         self.add_line("if __name__ == '__main__':")
-        self.add_line("    main()")
+        self.add_line("    asyncio.run(main())" if self.async_mode else "    main()")
 
-        return "\n".join(self.output_lines)
+        output, self.output = self.output, None
+        if to_string:
+            return output.getvalue()
+        return None
 
     def add_line(self, line: str = ""):
-        """Adiciona uma linha com indentação adequada"""
-        if line.strip():
-            self.output_lines.append("    " * self.indent_level + line)
+        """Escreve uma linha com indentação adequada"""
+        # Linhas são separadas por "\n", sem quebra após a última
+        if self._first_line:
+            self._first_line = False
         else:
-            self.output_lines.append("")
+            self.output.write("\n")
+
+        if line and not line.isspace():
+            self.output.write(self.indent(self.indent_level))
+            self.output.write(line)
 
+    def indent(self, level: int) -> str:
+        """Prefixo de indentação do nível (calculado uma vez por nível)"""
+        indents = self._indents
+        while len(indents) <= level:
+            indents.append(indents[-1] + "    ")
+        return indents[level]
 
 
     def generate_variable_initializations(self, devices: List[Device]):
@@ -72,6 +121,93 @@ class CodeGenerator:
         if any(device.observation for device in devices):
             self.add_line("")
 
+    def generate_async_commands(self, commands: List[Command]):
+        """Gera os comandos no modo assíncrono, executando concorrentemente
+        as ações de comandos consecutivos sobre dispositivos diferentes
+
+        As corrotinas das ações de um grupo são criadas na ordem do
+        programa (com os argumentos já avaliados), guardadas em _acoes e
+        aguardadas juntas por asyncio.gather. Grupos com uma única ação
+        são gerados como antes, com await direto.
+        """
+        for group in self.concurrent_groups(commands):
+            if sum(not isinstance(command, Attribution) for command in group) < 2:
+                for command in group:
+                    self.generate_command(command)
+                continue
+            # Sets no início do grupo vêm antes da lista de ações
+            start = 0
+            while isinstance(group[start], Attribution):
+                self.generate_command(group[start])
+                start += 1
+            self.add_line("# Ações em dispositivos diferentes, executadas concorrentemente")
+            self.add_line("_acoes = []")
+            self.add_line("")
+            self.gathering = True
+            for command in group[start:]:
+                self.generate_command(command)
+            self.gathering = False
+            self.add_line("await asyncio.gather(*_acoes)")
+            self.add_line("")
+
+    @classmethod
+    def concurrent_groups(cls, commands: List[Command]) -> List[List[Command]]:
+        """Divide os comandos em grupos que podem ser executados concorrentemente
+
+        Um grupo termina antes de um comando que age sobre um dispositivo
+        já usado no grupo (as ações de cada dispositivo mantêm a ordem) e
+        antes de uma condição que pode levantar erro por comparar uma
+        observação ainda sem valor, para que as ações anteriores sejam
+        executadas antes do erro, como no código síncrono.
+        """
+        groups = []
+        group = []
+        devices = set()
+        assigned = set()
+        for command in commands:
+            if isinstance(command, Attribution):
+                # Os sets são incondicionais: a partir daqui a observação tem valor
+                assigned.add(command.observation)
+                group.append(command)
+                continue
+            targets = cls.action_devices(command)
+            if group and (targets & devices or cls.may_raise(command, assigned)):
+                groups.append(group)
+                group = []
+                devices = set()
+            group.append(command)
+            devices |= targets
+        if group:
+            groups.append(group)
+        return groups
+
+    @staticmethod
+    def action_devices(command: Command) -> set:
+        """Dispositivos sobre os quais o comando pode agir"""
+        if isinstance(command, ObservationAction):
+            actions = (command.then_action, command.else_action)
+        else:
+            actions = (command,)
+        devices = set()
+        for action in actions:
+            if isinstance(action, BroadcastAlertAction):
+                devices.update(action.devices)
+            elif action is not None:
+                devices.add(action.device)
+        return devices
+
+    @staticmethod
+    def may_raise(command: Command, assigned: set) -> bool:
+        """A condição compara com <, <=, > ou >= uma observação sem set anterior?"""
+        if not isinstance(command, ObservationAction):
+            return False
+        obs = command.condition
+        while obs is not None:
+            if obs.observation not in assigned and obs.operator not in ('==', '!='):
+                return True
+            obs = obs.next_obs
+        return False
+
     def generate_command(self, command: Command):
         """Gera código para um comando"""
         if isinstance(command, Attribution):
@@ -145,37 +281,97 @@ class CodeGenerator:
         """Gera código para ações simples (ligar/desligar)"""
         original_comment = f"# {action.action_type} {action.device}"
         self.add_line(original_comment)
-        self.add_line(f'{action.action_type}("{action.device}")')
+        self.add_line(self.call(f'{action.action_type}("{action.device}")'))
 
     def generate_alert_action(self, action: AlertAction):
         """Gera código para ações de alerta"""
         if action.observation:
             original_comment = f'# enviar alerta ("{action.message}", {action.observation}) {action.device}'
             self.add_line(original_comment)
-            self.add_line(f'alertavar("{action.device}", "{action.message}", str({action.observation}))')
+            self.add_line(self.call(f'alertavar("{action.device}", "{action.message}", str({action.observation}))'))
         else:
             original_comment = f'# enviar alerta ("{action.message}") {action.device}'
             self.add_line(original_comment)
-            self.add_line(f'alerta("{action.device}", "{action.message}")')
+            self.add_line(self.call(f'alerta("{action.device}", "{action.message}")'))
 
     def generate_broadcast_alert_action(self, action: BroadcastAlertAction):
         """Gera código para ações de alerta broadcast"""
         original_comment = f'# enviar alerta ("{action.message}") para todos : {", ".join(action.devices)}'
         self.add_line(original_comment)
         self.add_line("# Alerta broadcast para múltiplos dispositivos")
-        for device in action.devices:
-            self.add_line(f'alerta("{device}", "{action.message}")')
+        # Uma única chamada: com um ActionDispatcher ativo o broadcast ocupa uma
+        # entrada do lote, e no modo assíncrono os alvos são alertados concorrentemente
+        devices = ", ".join(f'"{device}"' for device in action.devices)
+        self.add_line(self.call(f'alerta_todos([{devices}], "{action.message}")'))
+
+    def generate_broadcast_import(self, module: str):
+        """Importa alerta_todos, com um alerta por dispositivo se o módulo não o tiver"""
+        self.add_line("try:")
+        self.add_line(f"    from {module} import alerta_todos")
+        self.add_line("except ImportError:")
+        self.indent_level += 1
+        self.add_line("# Módulo de funções sem alerta_todos: um alerta por dispositivo")
+        if self.async_mode:
+            self.add_line("async def alerta_todos(namedevices, msg):")
+            self.add_line("    await asyncio.gather(*(alerta(namedevice, msg) for namedevice in namedevices))")
+        else:
+            self.add_line("def alerta_todos(namedevices, msg):")
+            self.add_line("    for namedevice in namedevices:")
+            self.add_line("        alerta(namedevice, msg)")
+        self.indent_level -= 1
+
+    @staticmethod
+    def uses_broadcast(ast: Program) -> bool:
+        """O programa tem alguma ação de alerta broadcast?"""
+        for command in ast.commands:
+            if isinstance(command, ObservationAction):
+                actions = (command.then_action, command.else_action)
+            else:
+                actions = (command,)
+            if any(isinstance(action, BroadcastAlertAction) for action in actions):
+                return True
+        return False
+
+    def call(self, expression: str) -> str:
+        """Chamada de função de dispositivo (aguardada no modo assíncrono, ou
+        guardada em _acoes dentro de um grupo concorrente)"""
+        if not self.async_mode:
+            return expression
+        if self.gathering:
+            return f"_acoes.append({expression})"
+        return f"await {expression}"
+
+
+# Tamanho do buffer de escrita dos arquivos .py gerados
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# Número máximo de code objects mantidos em memória por ObsActCompiler
+CODE_CACHE_SIZE = 256
 
 
 class ObsActCompiler:
     """Classe principal do compilador que gerencia conversão de .obs para .py"""
 
-    def __init__(self):
-        self.processor = DeviceLanguageProcessor()
+    def __init__(self, use_mmap: bool = False, cache: Optional[CompileCache] = None):
+        # Com use_mmap, o arquivo .obs é analisado diretamente sobre o buffer
+        # mapeado em memória, sem ser copiado para uma str
+        self.use_mmap = use_mmap
+        # Cache opcional de resultados indexado pelo hash do conteúdo do .obs
+        self.cache = cache
+        self.processor = DeviceLanguageProcessor(lexer_backend='mmap' if use_mmap else 'sly')
         self.code_generator = CodeGenerator()
-
-    def compile_file(self, obs_file_path: str, py_file_path: str = None) -> bool:
-        """Compila arquivo .obs para arquivo .py"""
+        self.async_code_generator = CodeGenerator(async_mode=True)
+        self.ast_generator = PythonASTGenerator()
+        # Code objects já compilados, indexados por (arquivo, hash do código-fonte), em ordem LRU
+        self.code_cache = OrderedDict()
+
+    def compile_file(self, obs_file_path: str, py_file_path: str = None, async_mode: bool = False,
+                     optimize_ast: bool = False) -> bool:
+        """Compila arquivo .obs para arquivo .py
+
+        Com async_mode, gera código assíncrono; com optimize_ast, aplica a
+        propagação de constantes e remoção de código morto antes da geração.
+        """
         try:
             # Determina caminho do arquivo de saída
             if py_file_path is None:
@@ -185,13 +381,30 @@ class ObsActCompiler:
                     py_file_path = obs_file_path + '.py'
 
             # Lê arquivo de entrada
-            with open(obs_file_path, 'r', encoding='utf-8') as f:
-                obs_code = f.read()
+            if self.use_mmap:
+                with open(obs_file_path, 'rb') as f:
+                    obs_code = map_file(f)
+            else:
+                with open(obs_file_path, 'r', encoding='utf-8') as f:
+                    obs_code = f.read()
 
             print(f"Lendo programa ObsAct de: {obs_file_path}")
 
-            # Analisa o código ObsAct
-            result = self.processor.analyze(obs_code, show_tokens=False, show_ast=False)
+            try:
+                # Reaproveita a saída de uma compilação anterior do mesmo conteúdo
+                cache_key = None
+                if self.cache is not None:
+                    variant = ('async' if async_mode else '') + ('+optimize' if optimize_ast else '')
+                    cache_key = self.cache.key(obs_code, variant)
+                    if self.cache.fetch(cache_key, py_file_path):
+                        print(f"Código Python obtido do cache: {py_file_path}")
+                        return True
+
+                # Analisa o código ObsAct
+                result = self.processor.analyze(obs_code, show_tokens=False, show_ast=False)
+            finally:
+                if isinstance(obs_code, mmap.mmap):
+                    obs_code.close()
 
             if not result['success']:
                 print("Compilação falhou devido a erros de sintaxe:")
@@ -199,12 +412,30 @@ class ObsActCompiler:
                     print(f"  {error}")
                 return False
 
-            # Gera código Python
-            python_code = self.code_generator.generate(result['ast'])
-
-            # Escreve arquivo de saída
-            with open(py_file_path, 'w', encoding='utf-8') as f:
-                f.write(python_code)
+            program = result['ast']
+            if optimize_ast:
+                program, report = optimize(program)
+                for line in report.lines():
+                    print(f"  {line}")
+                print(f"Otimização: {report.summary()}")
+
+            # Gera código Python escrevendo diretamente em um arquivo temporário
+            # ao lado da saída, que só substitui o .py quando a geração termina
+            tmp_path = f"{py_file_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+                    generator = self.async_code_generator if async_mode else self.code_generator
+                    generator.generate(program, f)
+                os.replace(tmp_path, py_file_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            if cache_key is not None:
+                self.cache.store(cache_key, py_file_path)
 
             print(f"Código Python gerado com sucesso: {py_file_path}")
             return True
@@ -225,16 +456,86 @@ class ObsActCompiler:
 
         return self.code_generator.generate(result['ast'])
 
+    def compile_code(self, obs_code: str, filename: str = '<obsact>'):
+        """Compila string de código ObsAct para um code object Python
+
+        O code object é construído diretamente da AST (sem gerar texto) e
+        guardado em memória pelo hash do código-fonte, de modo que recompilar
+        o mesmo programa apenas o recupera do cache.
+        """
+        key = (filename, hashlib.sha256(obs_code.encode('utf-8')).digest())
+        code = self.code_cache.get(key)
+        if code is not None:
+            self.code_cache.move_to_end(key)
+            return code
+
+        result = self.processor.analyze(obs_code, show_tokens=False, show_ast=False)
+
+        if not result['success']:
+            raise Exception(f"Compilação falhou: {result['errors']}")
+
+        code = self.ast_generator.compile(result['ast'], filename)
+        self.code_cache[key] = code
+        if len(self.code_cache) > CODE_CACHE_SIZE:
+            self.code_cache.popitem(last=False)
+        return code
+
+    def compile_function(self, obs_code: str, backend=None, filename: str = '<obsact>'):
+        """Compila string de código ObsAct e retorna a função main pronta para chamar
+
+        As ações são enviadas ao backend (objeto com os métodos ligar,
+        desligar, alerta, alertavar e, opcionalmente, alerta_todos, ex.:
+        interpreter.DeviceBackend); sem backend, são usadas as funções de
+        functions.py.
+        """
+        if backend is None:
+            import functions as backend
+
+        namespace = {'__name__': 'obsact'}
+        for name in DEVICE_FUNCTIONS:
+            namespace[name] = getattr(backend, name, None)
+        if namespace['alerta_todos'] is None:
+            alerta = backend.alerta
+
+            def alerta_todos(namedevices, msg):
+                for namedevice in namedevices:
+                    alerta(namedevice, msg)
+            namespace['alerta_todos'] = alerta_todos
+        exec(self.compile_code(obs_code, filename), namespace)
+        return namespace['main']
+
 
 # ============================================================================
 # Interface Unificada para Parser SLY
 # ============================================================================
 
+# Implementações de lexer disponíveis (mesmos tokens, valores e linhas)
+# 'mmap' recebe buffers UTF-8 (bytes/mmap) e gera índices em bytes; existe
+# para analisar arquivos mapeados sem copiá-los para uma str. O lexer AFD
+# (dfa_lexer.DFADeviceLexer) só entra aqui quando atingir a meta de 5x o
+# 'sly' em benchmarks/bench_lexer.py
+LEXER_BACKENDS = {
+    'sly': DeviceLexer,
+    'mmap': MmapDeviceLexer,
+}
+
+
+def map_file(f):
+    """Mapeia um arquivo aberto em modo binário somente para leitura"""
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Arquivos vazios não podem ser mapeados
+        return b''
+
+
 class DeviceLanguageProcessor:
     """Interface unificada para análise léxica e sintática usando SLY"""
 
-    def __init__(self, debug_mode: bool = False):
-        self.lexer = DeviceLexer()
+    def __init__(self, debug_mode: bool = False, lexer_backend: str = 'sly'):
+        if lexer_backend not in LEXER_BACKENDS:
+            raise ValueError(f"Lexer desconhecido: '{lexer_backend}' (opções: {', '.join(LEXER_BACKENDS)})")
+        self.lexer = LEXER_BACKENDS[lexer_backend]()
         self.parser = DeviceParser()
         self.debug_mode = debug_mode
 
@@ -242,14 +543,51 @@ class DeviceLanguageProcessor:
         """Tokeniza texto de entrada e retorna lista de tokens"""
         return list(self.lexer.tokenize(input_text))
 
-    def parse(self, input_text: str) -> Program:
-        """Analisa texto de entrada e retorna AST"""
+    def tokenize_stream(self, chunks):
+        """Tokeniza uma sequência de pedaços de texto, gerando tokens à medida que chegam"""
+        return self.lexer.tokenize_stream(chunks)
+
+    def parse(self, input_text: str, token_sink: Optional[list] = None) -> Program:
+        """Analisa texto de entrada e retorna AST
+
+        Se token_sink for informado, os tokens lidos pelo parser são
+        acumulados nele na mesma passada (sem reprocessar a entrada).
+        """
+        return self._parse_tokens(self.lexer.tokenize(input_text), token_sink)
+
+    def parse_stream(self, chunks, token_sink: Optional[list] = None) -> Program:
+        """Analisa uma sequência de pedaços de texto (ex.: lidos de um pipe) e retorna AST"""
+        return self._parse_tokens(self.lexer.tokenize_stream(chunks), token_sink)
+
+    def parse_columnar(self, input_text: str) -> ColumnarProgram:
+        """Analisa texto de entrada e retorna o programa em forma colunar
+
+        Cada comando é convertido para as colunas assim que é reduzido, então
+        a árvore de objetos completa nunca existe em memória.
+        """
+        program = ColumnarProgram()
+        self.parser.command_list = lambda: program.commands
+        self.parser.discard_positions()
+        try:
+            result = self.parse(input_text)
+        finally:
+            self.parser.command_list = list
+            self.parser.discard_positions(False)
+
+        for device in result.devices:
+            program.add_device(device)
+        return program
+
+    def _parse_tokens(self, tokens, token_sink: Optional[list] = None) -> Program:
+        """Executa o parser sobre um fluxo de tokens"""
+        if token_sink is not None:
+            tokens = self._tee_tokens(tokens, token_sink)
+
         try:
             # Reseta estado de erro do parser
             self.parser.error_occurred = False
             self.parser.error_message = ""
 
-            tokens = self.lexer.tokenize(input_text)
             result = self.parser.parse(tokens)
 
             # Verifica se a análise falhou
@@ -260,9 +598,26 @@ class DeviceLanguageProcessor:
             return result
         except Exception as e:
             raise Exception(f"Análise falhou: {str(e)}")
-
-    def analyze(self, input_text: str, show_tokens: bool = False, show_ast: bool = True) -> dict:
-        """Análise completa: tokenização e análise sintática"""
+        finally:
+            # Consome tokens que o parser não chegou a ler (ex.: após erro)
+            if token_sink is not None:
+                for _ in tokens:
+                    pass
+
+    @staticmethod
+    def _tee_tokens(tokens, sink: list):
+        """Repassa os tokens ao parser guardando uma cópia em sink"""
+        for token in tokens:
+            sink.append(token)
+            yield token
+
+    def analyze(self, input_text: str, show_tokens: bool = False, show_ast: bool = True,
+                keep_tokens: bool = False) -> dict:
+        """Análise completa: tokenização e análise sintática em uma única passada
+
+        A lista de tokens só é retida em result['tokens'] quando show_tokens
+        ou keep_tokens é verdadeiro.
+        """
         result = {
             'success': False,
             'tokens': [],
@@ -270,23 +625,24 @@ class DeviceLanguageProcessor:
             'errors': []
         }
 
-        try:
-            # Tokenização
-            result['tokens'] = self.tokenize(input_text)
+        token_sink = result['tokens'] if (show_tokens or keep_tokens) else None
 
-            if show_tokens:
-                print("=== TOKENS ===")
-                for token in result['tokens']:
-                    print(f"{token.type:12} | {repr(token.value):20} | Linha: {token.lineno}")
-                print()
+        try:
+            # Tokenização e análise sintática
+            try:
+                result['ast'] = self.parse(input_text, token_sink)
+            finally:
+                if show_tokens:
+                    print("=== TOKENS ===")
+                    for token in result['tokens']:
+                        print(f"{token.type:12} | {repr(token.value):20} | Linha: {token.lineno}")
+                    print()
 
-            # Análise sintática
-            result['ast'] = self.parse(input_text)
             result['success'] = True
 
             if show_ast and result['ast']:
                 print("=== AST ===")
-                print(result['ast'].pretty_print())
+                write_pretty(result['ast'], sys.stdout)
                 print()
 
         except Exception as e:
@@ -298,32 +654,51 @@ class DeviceLanguageProcessor:
 
         return result
 
-def main():
-    """Função principal com interface de linha de comando"""
-    import sys
-    import os
+def run_cli(argv: List[str], compiler: Optional[ObsActCompiler] = None) -> int:
+    """Executa a interface de linha de comando com os argumentos dados; retorna o código de saída"""
+    if len(argv) > 0 and argv[0] == '--batch':
+        # Modo em lote - compila diretórios/globs em paralelo
+        from batch import batch_main
+        return batch_main(argv[1:])
 
-    if len(sys.argv) > 1:
+    # --async gera código assíncrono (async def main, funções de async_functions.py)
+    async_mode = '--async' in argv
+    # --optimize propaga constantes e remove ramos mortos antes da geração
+    optimize_ast = '--optimize' in argv
+    argv = [arg for arg in argv if arg not in ('--async', '--optimize')]
+
+    if len(argv) > 0:
         # Modo linha de comando - compila arquivo .obs
-        obs_file = sys.argv[1]
+        obs_file = argv[0]
 
         if not os.path.exists(obs_file):
             print(f"Erro: Arquivo '{obs_file}' não encontrado")
-            sys.exit(1)
+            return 1
 
         # Arquivo de saída opcional
-        py_file = sys.argv[2] if len(sys.argv) > 2 else None
+        py_file = argv[1] if len(argv) > 1 else None
 
-        compiler = ObsActCompiler()
-        success = compiler.compile_file(obs_file, py_file)
+        compiler = compiler or ObsActCompiler()
+        success = compiler.compile_file(obs_file, py_file, async_mode, optimize_ast)
 
         if success:
             print("Compilação concluída com sucesso!")
-            sys.exit(0)
+            return 0
         else:
             print("Compilação falhou!")
-            sys.exit(1)
+            return 1
+
+    return 0
+
+
+def main():
+    """Função principal com interface de linha de comando"""
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        # Modo servidor - mantém o compilador carregado e atende requisições
+        from server import serve_main
+        sys.exit(serve_main(sys.argv[2:]))
 
+    sys.exit(run_cli(sys.argv[1:]))
 
 
 
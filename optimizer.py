@@ -0,0 +1,224 @@
+from typing import Iterable, List, Optional
+from ast_nodes import (Program, Command, Attribution, ObservationAction, Observation,
+                       Action, AlertAction)
+from interpreter import OPERATOR_FUNCTIONS
+
+# ============================================================================
+# Otimização da AST antes da geração de código: propagação de constantes
+# dos comandos set, avaliação das condições decidíveis em tempo de
+# compilação, remoção de ramos mortos e de atribuições nunca lidas
+# ============================================================================
+
+# Estado de uma observação cujo valor não é conhecido em tempo de compilação
+UNKNOWN = object()
+
+
+class OptimizationReport:
+    """O que a otimização alterou, com a linha do programa de cada alteração"""
+
+    def __init__(self):
+        self.entries = []
+        self.folded_conditions = 0
+        self.removed_branches = 0
+        self.removed_attributions = 0
+        self.simplified_conditions = 0
+
+    def add(self, line_number: int, message: str):
+        self.entries.append((line_number, message))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lines(self) -> List[str]:
+        return [f"Linha {line}: {message}" for line, message in sorted(self.entries, key=lambda entry: entry[0])]
+
+    def summary(self) -> str:
+        return (f"{self.folded_conditions} condições resolvidas, "
+                f"{self.simplified_conditions} simplificadas, "
+                f"{self.removed_branches} ramos removidos, "
+                f"{self.removed_attributions} atribuições removidas")
+
+
+class Optimizer:
+    """Otimiza um Program preservando a semântica do main() gerado
+
+    As observações declaradas começam com None e só mudam por comandos set
+    (sempre com constantes), então o valor de cada observação é conhecido
+    em cada ponto do programa. Observações listadas em inputs são tratadas
+    como entradas externas (valor desconhecido até o primeiro set).
+
+    Comparações que levantariam erro em tempo de execução (observação não
+    declarada, None comparado com número) não são avaliadas: a regra é
+    mantida para que o erro continue ocorrendo.
+    """
+
+    def __init__(self, inputs: Iterable[str] = ()):
+        self.inputs = set(inputs)
+        self.report = OptimizationReport()
+
+    def optimize(self, program: Program) -> Program:
+        """Retorna um novo Program otimizado (o original não é alterado)"""
+        self.report = OptimizationReport()
+
+        values = {}
+        for device in program.devices:
+            if device.observation:
+                values[device.observation] = UNKNOWN if device.observation in self.inputs else None
+        for name in self.inputs:
+            values[name] = UNKNOWN
+
+        commands = []
+        for command in program.commands:
+            if isinstance(command, Attribution):
+                values[command.observation] = command.value
+                commands.append(command)
+            elif isinstance(command, ObservationAction):
+                commands.extend(self.fold_observation_action(command, values))
+            else:
+                commands.append(command)
+
+        commands = self.remove_dead_attributions(commands)
+        return Program(list(program.devices), commands, line_number=program.line_number)
+
+    def fold_observation_action(self, command: ObservationAction, values: dict) -> List[Command]:
+        """Resolve ou simplifica a condição e remove o ramo que nunca executa"""
+        condition = self.fold_condition(command.condition, values)
+        line = command.line_number
+
+        if condition is True:
+            self.report.folded_conditions += 1
+            if command.else_action:
+                self.report.removed_branches += 1
+                self.report.add(line, f"condição '{command.condition}' sempre verdadeira; ramo senao removido")
+            else:
+                self.report.add(line, f"condição '{command.condition}' sempre verdadeira")
+            return [command.then_action]
+
+        if condition is False:
+            self.report.folded_conditions += 1
+            self.report.removed_branches += 1
+            self.report.add(line, f"condição '{command.condition}' sempre falsa; ramo entao removido")
+            return [command.else_action] if command.else_action else []
+
+        if condition is not command.condition:
+            self.report.simplified_conditions += 1
+            self.report.add(line, f"condição '{command.condition}' simplificada para '{condition}'")
+            return [ObservationAction(condition, command.then_action, command.else_action, line_number=line)]
+        return [command]
+
+    def fold_condition(self, obs: Observation, values: dict):
+        """Avalia a cadeia com os valores conhecidos
+
+        Retorna True ou False se a condição for decidida, a própria cadeia
+        se nada puder ser removido, ou uma nova cadeia só com as comparações
+        restantes. A cadeia é vista como or de grupos de and (precedência do
+        Python); só são descartadas comparações conhecidas cuja remoção não
+        altera o resultado nem quais comparações desconhecidas são avaliadas.
+        """
+        groups = [[]]
+        while obs is not None:
+            groups[-1].append(obs)
+            if obs.next_obs is not None and obs.logical_op == '||':
+                groups.append([])
+            obs = obs.next_obs
+
+        remaining = []
+        changed = False
+        for number, group in enumerate(groups):
+            kept = []
+            decided = True      # todas as comparações do grupo até aqui são verdadeiras
+            for position, comparison in enumerate(group):
+                result = self.evaluate_comparison(comparison, values)
+                if result is None:
+                    kept.append(comparison)
+                    decided = False
+                elif result is True:
+                    # Comparação verdadeira em um and não altera o grupo
+                    changed = True
+                elif kept:
+                    # Falsa após comparações desconhecidas: o grupo é sempre falso,
+                    # mas estas continuam sendo avaliadas; as seguintes nunca são
+                    kept.append(comparison)
+                    changed = changed or position < len(group) - 1
+                    break
+                else:
+                    # Grupo falso sem avaliar nada desconhecido: descartado
+                    decided = None
+                    changed = True
+                    break
+
+            if decided is None:
+                continue
+            if decided:
+                # Grupo sempre verdadeiro: os grupos seguintes nunca são avaliados
+                if not remaining:
+                    return True
+                remaining.append(group[:1])
+                changed = changed or number < len(groups) - 1
+                break
+            remaining.append(kept)
+
+        if not remaining:
+            return False
+        if not changed:
+            return groups[0][0]
+        return self.build_condition(remaining)
+
+    @staticmethod
+    def evaluate_comparison(obs: Observation, values: dict) -> Optional[bool]:
+        """Resultado da comparação, ou None se não for decidível sem erro"""
+        value = values.get(obs.observation, UNKNOWN)
+        if value is UNKNOWN:
+            return None
+        try:
+            return bool(OPERATOR_FUNCTIONS[obs.operator](value, obs.value))
+        except TypeError:
+            return None
+
+    @staticmethod
+    def build_condition(groups: List[List[Observation]]) -> Observation:
+        """Monta uma nova cadeia a partir dos grupos (and dentro, or entre grupos)"""
+        flat = [(comparison, index < len(group) - 1)
+                for group in groups for index, comparison in enumerate(group)]
+        obs = None
+        for comparison, in_group in reversed(flat):
+            obs = Observation(comparison.observation, comparison.operator, comparison.value,
+                              obs, '&&' if in_group or obs is None else '||',
+                              line_number=comparison.line_number)
+        return obs
+
+    def remove_dead_attributions(self, commands: List[Command]) -> List[Command]:
+        """Remove comandos set cujo valor nunca é lido depois (varredura reversa)"""
+        live = set()
+        kept = []
+        for command in reversed(commands):
+            if isinstance(command, Attribution):
+                if command.observation not in live:
+                    self.report.removed_attributions += 1
+                    self.report.add(command.line_number, f"atribuição 'set {command.observation} = {command.value}' nunca lida; removida")
+                    continue
+                live.discard(command.observation)
+            elif isinstance(command, ObservationAction):
+                obs = command.condition
+                while obs is not None:
+                    live.add(obs.observation)
+                    obs = obs.next_obs
+                self._add_reads(command.then_action, live)
+                if command.else_action:
+                    self._add_reads(command.else_action, live)
+            elif isinstance(command, Action):
+                self._add_reads(command, live)
+            kept.append(command)
+        kept.reverse()
+        return kept
+
+    @staticmethod
+    def _add_reads(action: Action, live: set):
+        if isinstance(action, AlertAction) and action.observation:
+            live.add(action.observation)
+
+
+def optimize(program: Program, inputs: Iterable[str] = ()) -> tuple:
+    """Otimiza o programa; retorna (Program otimizado, OptimizationReport)"""
+    optimizer = Optimizer(inputs)
+    return optimizer.optimize(program), optimizer.report
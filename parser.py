@@ -1,4 +1,9 @@
+import hashlib
+import os
+import pickle
+import sly
 from sly import Lexer, Parser
+from sly.yacc import YaccError
 from typing import List, Optional, Union
 from lexer import DeviceLexer
 from ast_nodes import Program, Device, Command, Attribution, ObservationAction, SimpleAction, AlertAction, BroadcastAlertAction, Observation
@@ -12,16 +17,137 @@ def _(rule):
     return decorator
 
 
+# Cache das tabelas LALR
+# Versão do formato do arquivo de cache; incrementar ao mudar sua estrutura
+TABLE_CACHE_VERSION = 1
+
+
+class CachedLRTable:
+    """Tabelas LALR mínimas usadas pelo SLY em tempo de análise"""
+
+    def __init__(self, lr_action: dict, lr_goto: dict, defaulted_states: dict):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+
+
+def grammar_signature(grammar, tokens) -> str:
+    """Calcula o hash das regras da gramática e do conjunto de tokens"""
+    h = hashlib.sha256()
+    h.update(f"sly={sly.__version__};cache={TABLE_CACHE_VERSION}\n".encode("utf-8"))
+    for token in sorted(tokens):
+        h.update(f"token {token}\n".encode("utf-8"))
+    for production in grammar.Productions:
+        h.update(f"rule {production}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_tables(tabfile: str, signature: str) -> Optional[CachedLRTable]:
+    """Carrega as tabelas do cache se o hash da gramática coincidir"""
+    try:
+        with open(tabfile, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("signature") != signature:
+        return None
+
+    return CachedLRTable(data["action"], data["goto"], data["defaulted_states"])
+
+
+def save_tables(tabfile: str, signature: str, lrtable) -> None:
+    """Grava as tabelas LALR no cache (falhas de escrita são ignoradas)"""
+    data = {
+        "signature": signature,
+        "action": lrtable.lr_action,
+        "goto": lrtable.lr_goto,
+        "defaulted_states": lrtable.defaulted_states,
+    }
+    tmpfile = f"{tabfile}.{os.getpid()}.tmp"
+    try:
+        with open(tmpfile, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Substituição atômica: processos concorrentes nunca leem arquivo parcial
+        os.replace(tmpfile, tabfile)
+    except OSError:
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+
+
+class DiscardPositions(dict):
+    """Dicionário que descarta escritas (posições não usadas pelo compilador)"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
 class DeviceParser(Parser):
     """Parser baseado em SLY para a gramática de dispositivos"""
 
-    debugfile = "parser.out"
+    # Arquivo de depuração do SLY; OBSACT_PARSER_DEBUGFILE="" desativa a escrita
+    debugfile = os.environ.get("OBSACT_PARSER_DEBUGFILE", "parser.out") or None
+    # Cache das tabelas LALR; OBSACT_PARSER_TABFILE="" desativa o cache
+    tabfile = os.environ.get(
+        "OBSACT_PARSER_TABFILE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "parser.tab"),
+    ) or None
     tokens = DeviceLexer.tokens
 
+    @classmethod
+    def _build(cls, definitions):
+        """Constrói a gramática e carrega as tabelas LALR do cache quando possível
+
+        Reproduz Parser._build do SLY, mas só executa a construção do
+        autômato LALR (a parte cara) quando o hash da gramática muda.
+        """
+        rules = cls._Parser__collect_rules(definitions)
+
+        if not cls._Parser__validate_specification():
+            raise YaccError('Invalid parser specification')
+
+        cls._Parser__build_grammar(rules)
+
+        signature = grammar_signature(cls._grammar, cls.tokens)
+        if cls.tabfile:
+            cached = load_tables(cls.tabfile, signature)
+            if cached is not None:
+                cls._lrtable = cached
+                return
+
+        if not cls._Parser__build_lrtables():
+            raise YaccError('Can\'t build parsing tables')
+
+        if cls.tabfile:
+            save_tables(cls.tabfile, signature, cls._lrtable)
+
+        # parser.out só é gerado quando as tabelas são reconstruídas
+        if cls.debugfile:
+            with open(cls.debugfile, 'w') as f:
+                f.write(str(cls._grammar))
+                f.write('\n')
+                f.write(str(cls._lrtable))
+            cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, cls.debugfile)
+
     def __init__(self):
         super().__init__()
         self.error_occurred = False
         self.error_message = ""
+        # Fábrica da lista de comandos (a análise colunar usa outra sequência)
+        self.command_list = list
+
+    def discard_positions(self, enabled: bool = True):
+        """Liga ou desliga o registro de posições dos valores reduzidos
+
+        O SLY guarda a posição de cada valor reduzido e nunca libera esses
+        dicionários. A análise colunar não usa line_position()/index_position()
+        e desliga o registro; ao religar, as posições recomeçam vazias.
+        """
+        factory = DiscardPositions if enabled else dict
+        self._line_positions = factory()
+        self._index_positions = factory()
 
     def error(self, p):
         self.error_occurred = True
@@ -37,10 +163,12 @@ class DeviceParser(Parser):
     def program(self, p):
         return Program(p.devices, p.commands)
 
-    # DEVICES → DEVICE DEVICES | DEVICE
-    @_('device devices')
+    # DEVICES → DEVICES DEVICE | DEVICE
+    # Recursão à esquerda: a lista cresce por append e a pilha não acumula
+    @_('devices device')
     def devices(self, p):
-        return [p.device] + p.devices
+        p.devices.append(p.device)
+        return p.devices
 
     @_('device')
     def devices(self, p):
@@ -74,14 +202,17 @@ class DeviceParser(Parser):
     def device_name(self, p):
         return p.OBSERVATION
 
-    # CMDS → CMD. CMDS | CMD.
-    @_('command PONTO commands')
+    # CMDS → CMDS CMD. | CMD.
+    @_('commands command PONTO')
     def commands(self, p):
-        return [p.command] + p.commands
+        p.commands.append(p.command)
+        return p.commands
 
     @_('command PONTO')
     def commands(self, p):
-        return [p.command]
+        commands = self.command_list()
+        commands.append(p.command)
+        return commands
 
     # CMD → ATTRIB | OBSACT | ACT
     @_('attribution')
@@ -165,10 +296,11 @@ class DeviceParser(Parser):
     def action_type(self, p):
         return p.DESLIGAR
 
-    # DEVICE_LIST → namedevice, DEVICE_LIST | namedevice
-    @_('device_name VIRGULA device_list')
+    # DEVICE_LIST → DEVICE_LIST, namedevice | namedevice
+    @_('device_list VIRGULA device_name')
     def device_list(self, p):
-        return [p.device_name] + p.device_list
+        p.device_list.append(p.device_name)
+        return p.device_list
 
     @_('device_name')
     def device_list(self, p):
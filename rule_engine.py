@@ -0,0 +1,336 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Union
+from ast_nodes import Program, Attribution, ObservationAction, Observation
+from decision_dag import ConditionDAG
+from interpreter import DeviceBackend, Interpreter, OPERATOR_FUNCTIONS
+from interval_index import ThresholdIndex, is_numeric, threshold_of
+
+# ============================================================================
+# Motor de regras reativo: mantém um programa ObsAct carregado e, a cada
+# atualização de observação, reavalia apenas as regras (se ... entao) que a
+# leem
+# ============================================================================
+
+
+class RuleEngine:
+    """Executa as regras de um programa de forma incremental
+
+    start() executa o programa uma vez, de cima para baixo, como o main()
+    gerado (atribuições, regras e ações soltas). Depois disso, update() e
+    update_many() alteram observações e reavaliam somente as regras cuja
+    condição depende delas, na ordem em que aparecem no programa. O custo
+    de uma atualização é proporcional ao número de regras afetadas.
+
+    Comparações idênticas em regras diferentes são compartilhadas por um
+    ConditionDAG: cada uma é calculada no máximo uma vez enquanto sua
+    observação não muda. Regras de limiar (uma única comparação de uma
+    observação com um número) ficam também em um ThresholdIndex, que
+    encontra por busca binária as satisfeitas por um novo valor.
+
+    Com edge_triggered, o motor guarda o último resultado de cada regra e só
+    executa ações quando ele muda (entao ao passar a verdadeira, senao ao
+    passar a falsa). hysteresis associa observações a uma margem: uma
+    comparação >, >=, < ou <= de uma regra verdadeira só deixa de valer
+    quando o valor ultrapassa o limiar por mais que a margem.
+
+    As comparações seguem a semântica do código gerado: comparar uma
+    observação ainda sem valor (None) com um número levanta TypeError. Com
+    defer_unset, regras que leem observações sem valor não são avaliadas
+    até que todas recebam um valor (útil quando os valores chegam de
+    sensores, ver telemetry.py).
+    """
+
+    def __init__(self, program: Program, backend: Optional[DeviceBackend] = None,
+                 edge_triggered: bool = False, hysteresis: Optional[Dict[str, Union[int, float]]] = None,
+                 defer_unset: bool = False):
+        self.program = program
+        self.interpreter = Interpreter(backend)
+        self.edge_triggered = edge_triggered
+        self.defer_unset = defer_unset
+        self.hysteresis = dict(hysteresis or {})
+        if self.hysteresis and not edge_triggered:
+            raise ValueError("hysteresis requer edge_triggered")
+        self.rules = []
+        # Observações lidas pela condição de cada regra
+        self.rule_names = []
+        # Índice de dependências: observação -> índices (crescentes) das regras que a leem
+        self.dependencies = {}
+        # Observações escritas pelo programa (declaradas em dispositivos ou em set)
+        self.observations = set()
+        self.thresholds = ThresholdIndex()
+        self.dag = ConditionDAG(())
+
+        # Estado do modo por transição
+        self.outcomes = []               # último resultado de cada regra (None: ainda não avaliada)
+        self.relaxed = []                # a regra lê alguma observação com histerese?
+        self.compound = {}               # observação -> regras (crescentes) que não são de limiar
+        self.unknown_thresholds = {}     # observação -> regras de limiar ainda não avaliadas
+        # Observações cujos resultados guardados podem não corresponder ao valor
+        # atual (ex.: set executado depois das regras em start()); a próxima
+        # atualização delas reavalia todas as regras dependentes
+        self.stale = set()
+        self.transitions = 0
+        self.suppressed = 0
+
+        for device in program.devices:
+            if device.observation:
+                self.observations.add(device.observation)
+        for command in program.commands:
+            if isinstance(command, ObservationAction):
+                self._index_rule(command)
+            elif isinstance(command, Attribution):
+                self.observations.add(command.observation)
+
+    @property
+    def variables(self) -> dict:
+        """Valores atuais das observações"""
+        return self.interpreter.variables
+
+    def _index_rule(self, rule: ObservationAction) -> int:
+        index = len(self.rules)
+        self.rules.append(rule)
+        self.outcomes.append(None)
+        names = self._condition_names(rule)
+        self.rule_names.append(tuple(names))
+        for name in names:
+            self.dependencies.setdefault(name, []).append(index)
+        self.relaxed.append(any(name in self.hysteresis for name in names))
+        self.dag.add(rule)
+        threshold = threshold_of(rule)
+        if threshold is not None:
+            self.thresholds.add(index, *threshold)
+            self.unknown_thresholds.setdefault(threshold[0], set()).add(index)
+        else:
+            for name in names:
+                self.compound.setdefault(name, []).append(index)
+        return index
+
+    @staticmethod
+    def _condition_names(rule: ObservationAction) -> set:
+        names = set()
+        obs = rule.condition
+        while obs is not None:
+            names.add(obs.observation)
+            obs = obs.next_obs
+        return names
+
+    def add_rule(self, rule: ObservationAction) -> int:
+        """Acrescenta uma regra ao motor em execução e retorna seu índice
+
+        A regra passa a ser reavaliada por update(), update_many() e cycle();
+        os índices são atualizados incrementalmente.
+        """
+        return self._index_rule(rule)
+
+    def remove_rule(self, index: int):
+        """Remove a regra de índice index (os demais índices não mudam)"""
+        rule = self.rules[index]
+        if rule is None:
+            raise Exception(f"Regra {index} já foi removida")
+        threshold = index in self.thresholds
+        for name in self._condition_names(rule):
+            dependents = self.dependencies[name]
+            del dependents[bisect_left(dependents, index)]
+            if not threshold:
+                compound = self.compound[name]
+                del compound[bisect_left(compound, index)]
+        if threshold:
+            self.unknown_thresholds[self.thresholds.rules[index][0]].discard(index)
+            self.thresholds.remove(index)
+        self.dag.remove(index)
+        self.rules[index] = None
+        self.outcomes[index] = None
+
+    def start(self, observations: Optional[Dict[str, Union[int, bool]]] = None) -> dict:
+        """Executa o programa completo uma vez e retorna o valor das observações
+
+        observations fornece valores iniciais no lugar de None. No modo por
+        transição, cada regra executa a ação do seu primeiro resultado.
+        """
+        variables = self.interpreter.variables = {}
+        for device in self.program.devices:
+            if device.observation:
+                variables[device.observation] = None
+        if observations:
+            variables.update(observations)
+        self.dag.reset()
+        self.stale = set(self.dependencies)
+
+        # As regras do programa são as primeiras do índice, na mesma ordem
+        index = 0
+        for command in self.program.commands:
+            if isinstance(command, ObservationAction):
+                if self.rules[index] is not None:
+                    self._evaluate(index)
+                index += 1
+            elif isinstance(command, Attribution):
+                variables[command.observation] = command.value
+                self.dag.invalidate(command.observation)
+            else:
+                self.interpreter.execute(command)
+        return variables
+
+    def update(self, name: str, value: Union[int, bool]) -> int:
+        """Altera uma observação e reavalia as regras dependentes
+
+        Retorna o número de regras reavaliadas (zero se o valor não mudou).
+        """
+        variables = self.interpreter.variables
+        old = variables.get(name)
+        if name in variables and _same_value(old, value):
+            return 0
+        variables[name] = value
+        self.dag.invalidate(name)
+
+        rules = self.dependencies.get(name, ())
+        if not rules:
+            return 0
+        thresholds = self.thresholds
+        if thresholds and is_numeric(value):
+            if (self.edge_triggered and name not in self.hysteresis and is_numeric(old)
+                    and name not in self.stale):
+                return self._update_transitions(name, old, value)
+
+            # Regras de limiar: satisfeitas encontradas por busca binária
+            satisfied = thresholds.satisfied(name, value)
+            for index in rules:
+                if index in thresholds and not self.relaxed[index]:
+                    self._fire(index, index in satisfied)
+                else:
+                    self._evaluate(index)
+        else:
+            for index in rules:
+                self._evaluate(index)
+        self.stale.discard(name)
+        return len(rules)
+
+    def _update_transitions(self, name: str, old, value) -> int:
+        """Atualização no modo por transição
+
+        Visita só as regras de limiar que mudaram de resultado (o trecho do
+        índice entre old e value), as ainda não avaliadas e as regras
+        compostas que leem a observação.
+        """
+        became, ceased = self.thresholds.changed(name, old, value)
+        visit = became | ceased
+        visit.update(self.unknown_thresholds.get(name, ()))
+        visit.update(self.compound.get(name, ()))
+        for index in sorted(visit):
+            if index in became:
+                self._fire(index, True)
+            elif index in ceased:
+                self._fire(index, False)
+            else:
+                self._evaluate(index)
+        return len(visit)
+
+    def update_many(self, values: Dict[str, Union[int, bool]]) -> int:
+        """Altera várias observações e reavalia cada regra afetada uma única vez
+
+        As regras são reavaliadas após todas as alterações, na ordem do
+        programa. Retorna o número de regras reavaliadas.
+        """
+        variables = self.interpreter.variables
+        affected = set()
+        for name, value in values.items():
+            if name in variables and _same_value(variables[name], value):
+                continue
+            variables[name] = value
+            self.dag.invalidate(name)
+            self.stale.discard(name)
+            affected.update(self.dependencies.get(name, ()))
+
+        for index in sorted(affected):
+            self._evaluate(index)
+        return len(affected)
+
+    def cycle(self) -> int:
+        """Reavalia todas as regras, na ordem do programa, com os valores atuais
+
+        Cada comparação distinta é calculada no máximo uma vez por ciclo.
+        Retorna o número de regras avaliadas.
+        """
+        count = 0
+        for index, rule in enumerate(self.rules):
+            if rule is not None:
+                self._evaluate(index)
+                count += 1
+        self.stale.clear()
+        return count
+
+    def dependents(self, name: str) -> List[ObservationAction]:
+        """Regras cuja condição lê a observação"""
+        return [self.rules[index] for index in self.dependencies.get(name, ())]
+
+    def satisfied_thresholds(self, name: str) -> List[ObservationAction]:
+        """Regras de limiar da observação satisfeitas pelo seu valor atual"""
+        value = self.interpreter.variables.get(name)
+        if not is_numeric(value):
+            return []
+        return [self.rules[index] for index in sorted(self.thresholds.satisfied(name, value))]
+
+    def _evaluate(self, index: int):
+        if self.defer_unset:
+            variables = self.interpreter.variables
+            for name in self.rule_names[index]:
+                if variables.get(name) is None:
+                    return
+        if self.relaxed[index] and self.outcomes[index]:
+            condition = self._evaluate_relaxed(self.rules[index].condition)
+        else:
+            condition = self.dag.evaluate(index, self.interpreter.variables)
+        self._fire(index, condition)
+
+    def _evaluate_relaxed(self, obs: Observation) -> bool:
+        """Avalia a condição de uma regra verdadeira aplicando a histerese
+
+        Os limiares de >, >=, < e <= sobre observações com margem são
+        deslocados a favor da comparação continuar verdadeira.
+        """
+        variables = self.interpreter.variables
+        hysteresis = self.hysteresis
+        while obs is not None:
+            # Grupo de comparações ligadas por "&&", com curto-circuito
+            result = True
+            while True:
+                if result:
+                    try:
+                        current = variables[obs.observation]
+                    except KeyError:
+                        raise NameError(f"Observação não definida: {obs.observation}") from None
+                    threshold = obs.value
+                    margin = hysteresis.get(obs.observation)
+                    if margin:
+                        if obs.operator in ('>', '>='):
+                            threshold = threshold - margin
+                        elif obs.operator in ('<', '<='):
+                            threshold = threshold + margin
+                    result = OPERATOR_FUNCTIONS[obs.operator](current, threshold)
+                if obs.next_obs is None or obs.logical_op == '||':
+                    break
+                obs = obs.next_obs
+            if result:
+                return True
+            obs = obs.next_obs
+        return False
+
+    def _fire(self, index: int, condition: bool):
+        rule = self.rules[index]
+        if self.edge_triggered:
+            previous = self.outcomes[index]
+            if previous is None and index in self.thresholds:
+                self.unknown_thresholds[self.thresholds.rules[index][0]].discard(index)
+            self.outcomes[index] = condition
+            if previous == condition:
+                self.suppressed += 1
+                return
+            self.transitions += 1
+        if condition:
+            self.interpreter.perform(rule.then_action)
+        elif rule.else_action:
+            self.interpreter.perform(rule.else_action)
+
+
+def _same_value(current, value) -> bool:
+    """Compara valores distinguindo bool de int (True não é igual a 1 aqui)"""
+    return type(current) is type(value) and current == value
@@ -0,0 +1,135 @@
+import argparse
+import contextlib
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+from typing import List
+
+from client import default_socket_path, receive_message, send_message
+from main import ObsActCompiler, run_cli
+
+# ============================================================================
+# Servidor de compilação: mantém lexer, parser (tabelas LALR) e gerador de
+# código carregados e atende requisições de compilação por um socket Unix
+# ============================================================================
+
+
+class CompileRequestHandler(socketserver.BaseRequestHandler):
+    """Atende uma requisição do cliente (client.py)"""
+
+    def handle(self):
+        try:
+            message = receive_message(self.request)
+        except ValueError:
+            message = None
+        if not valid_request(message):
+            send_message(self.request, {'output': "Erro: requisição inválida\n", 'exit_code': 1})
+            return
+
+        if message.get('command') == 'shutdown':
+            self.server.running = False
+            send_message(self.request, {'output': "", 'exit_code': 0})
+            return
+
+        send_message(self.request, self.server.compile(message.get('argv', []), message.get('cwd')))
+
+
+def valid_request(message) -> bool:
+    """Verifica se a mensagem é um objeto JSON com argv (lista de str) e cwd (str) válidos"""
+    if not isinstance(message, dict):
+        return False
+    argv = message.get('argv', [])
+    cwd = message.get('cwd')
+    return (isinstance(argv, list) and all(isinstance(arg, str) for arg in argv)
+            and (cwd is None or isinstance(cwd, str)))
+
+
+class CompileServer(socketserver.UnixStreamServer):
+    """Servidor que reaproveita o mesmo ObsActCompiler entre requisições
+
+    As requisições são atendidas uma de cada vez: o compilador não é
+    compartilhável entre threads e a saída é capturada redirecionando
+    sys.stdout, como no modo em lote.
+    """
+
+    def __init__(self, socket_path: str, use_mmap: bool = False):
+        self.compiler = ObsActCompiler(use_mmap=use_mmap)
+        self.running = True
+        super().__init__(socket_path, CompileRequestHandler)
+
+    def compile(self, argv: List[str], cwd: str = None) -> dict:
+        """Executa a linha de comando no diretório do cliente e captura a saída"""
+        log = io.StringIO()
+        previous = os.getcwd()
+        try:
+            if cwd:
+                os.chdir(cwd)
+            with contextlib.redirect_stdout(log):
+                exit_code = run_cli(argv, self.compiler)
+        except Exception as e:
+            log.write(f"Erro no servidor de compilação: {str(e)}\n")
+            exit_code = 1
+        finally:
+            os.chdir(previous)
+        return {'output': log.getvalue(), 'exit_code': exit_code}
+
+    def serve_until_shutdown(self):
+        """Atende requisições até receber o comando de encerramento"""
+        while self.running:
+            self.handle_request()
+
+
+def remove_stale_socket(socket_path: str):
+    """Remove o arquivo do socket se nenhum servidor estiver escutando nele"""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+            return
+    raise Exception(f"Já existe um servidor em execução em '{socket_path}'")
+
+
+def serve_main(argv: List[str]) -> int:
+    """Interface de linha de comando do servidor; retorna o código de saída"""
+    arg_parser = argparse.ArgumentParser(
+        prog='main.py --serve',
+        description='Mantém o compilador ObsAct carregado e atende requisições por um socket Unix')
+    arg_parser.add_argument('--socket', default=None,
+                            help='caminho do socket (padrão: OBSACT_SOCKET ou obsact-<uid>.sock no diretório temporário)')
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help='analisa os arquivos mapeados em memória')
+    args = arg_parser.parse_args(argv)
+
+    socket_path = args.socket or default_socket_path()
+    try:
+        remove_stale_socket(socket_path)
+    except Exception as e:
+        print(f"Erro: {str(e)}")
+        return 1
+
+    # SIGTERM encerra o servidor normalmente, removendo o socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    server = CompileServer(socket_path, use_mmap=args.mmap)
+    print(f"Servidor de compilação ObsAct escutando em: {socket_path}")
+    sys.stdout.flush()
+    try:
+        server.serve_until_shutdown()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+    print("Servidor encerrado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve_main(sys.argv[1:]))
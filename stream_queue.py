@@ -0,0 +1,315 @@
+import threading
+import time
+from collections import deque
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, Union
+
+# ============================================================================
+# Fila limitada entre a ingestão de leituras e a avaliação das regras: a
+# ingestão enfileira leituras (observação, valor) e uma thread consumidora
+# as retira em micro-lotes por janela de tempo, reduz as leituras de cada
+# observação à mais recente e chama RuleEngine.update_many uma vez por lote
+# ============================================================================
+
+# Políticas para leituras que chegam com a fila cheia
+BLOCK = 'block'                 # o produtor espera haver espaço
+DROP_NEWEST = 'drop-newest'     # a leitura que chega é descartada
+DROP_OLDEST = 'drop-oldest'     # as leituras mais antigas da fila são descartadas
+POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+_NAME = itemgetter(0)
+_VALUE = itemgetter(1)
+
+
+class StreamMetrics:
+    """Contadores da fila e do consumidor
+
+    depth é a profundidade atual da fila; lag é o tempo entre a chegada da
+    leitura mais antiga de um micro-lote e a sua aplicação ao motor.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.accepted = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.max_depth = 0
+        self.batches = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.evaluations = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def record_batch(self, readings: int, observations: int, evaluations: int, lag: float):
+        self.batches += 1
+        self.applied += readings
+        self.coalesced += readings - observations
+        self.evaluations += evaluations
+        self.last_lag = lag
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def snapshot(self, depth: int = 0) -> dict:
+        return {
+            'depth': depth,
+            'max_depth': self.max_depth,
+            'received': self.received,
+            'accepted': self.accepted,
+            'dropped': self.dropped,
+            'blocked': self.blocked,
+            'batches': self.batches,
+            'applied': self.applied,
+            'coalesced': self.coalesced,
+            'evaluations': self.evaluations,
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+            'mean_lag': self.total_lag / self.batches if self.batches else 0.0,
+        }
+
+
+class ReadingQueue:
+    """Fila limitada e segura entre threads de leituras (observação, valor)
+
+    Cada leitura guarda o instante de chegada (time.monotonic) para o
+    cálculo do atraso. Com a fila cheia, policy decide entre bloquear o
+    produtor, descartar a leitura nova ou descartar as mais antigas.
+    """
+
+    def __init__(self, max_size: int, policy: str = BLOCK):
+        if max_size < 1:
+            raise ValueError("max_size deve ser positivo")
+        if policy not in POLICIES:
+            raise ValueError(f"Política de descarte desconhecida: {policy}")
+        self.max_size = max_size
+        self.policy = policy
+        self.items = deque(maxlen=max_size)
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.closed = False
+        self.metrics = StreamMetrics()
+        # Quantidade que completa um micro-lote (acorda o consumidor antes da janela)
+        self.wake_size = max_size
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def put(self, name: str, value: Union[int, bool], timeout: Optional[float] = None) -> bool:
+        """Enfileira uma leitura; retorna False se ela foi descartada"""
+        return self.put_many([(name, value)], timeout) == 1
+
+    def put_many(self, readings: List[Tuple[str, object]], timeout: Optional[float] = None) -> int:
+        """Enfileira leituras (nome, valor) e retorna quantas foram aceitas
+
+        Com BLOCK, timeout limita a espera por espaço (None: sem limite); as
+        leituras que não couberem até lá são descartadas. Com DROP_OLDEST as
+        mais antigas da fila saem para dar lugar às novas; se vierem mais
+        de max_size leituras, só as últimas max_size são aceitas.
+        """
+        now = time.monotonic()
+        items = self.items
+        metrics = self.metrics
+        with self.lock:
+            if self.closed:
+                raise Exception("Fila de leituras fechada")
+            was_empty = not items
+            count = len(readings)
+            metrics.received += count
+
+            if self.policy == DROP_OLDEST:
+                # deque(maxlen) descarta as mais antigas ao estender
+                accepted = min(count, self.max_size)
+                evicted = max(0, len(items) + accepted - self.max_size)
+                items.extend((name, value, now) for name, value in readings[count - accepted:])
+                dropped = evicted + count - accepted
+            elif self.policy == DROP_NEWEST:
+                accepted = min(count, self.max_size - len(items))
+                items.extend((name, value, now) for name, value in readings[:accepted])
+                dropped = count - accepted
+            else:
+                accepted = self._put_blocking(readings, now, timeout)
+                dropped = count - accepted
+
+            metrics.accepted += accepted
+            metrics.dropped += dropped
+            if len(items) > metrics.max_depth:
+                metrics.max_depth = len(items)
+            if accepted and (was_empty or len(items) >= self.wake_size):
+                self.not_empty.notify()
+        return accepted
+
+    def _put_blocking(self, readings: List[Tuple[str, object]], now: float, timeout: Optional[float]) -> int:
+        items = self.items
+        deadline = None if timeout is None else now + timeout
+        position = 0
+        while position < len(readings):
+            space = self.max_size - len(items)
+            if space <= 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.metrics.blocked += 1
+                # Acorda o consumidor, que pode estar esperando a janela terminar
+                self.not_empty.notify()
+                self.not_full.wait(remaining)
+                if self.closed:
+                    raise Exception("Fila de leituras fechada")
+                continue
+            chunk = readings[position:position + space]
+            items.extend((name, value, now) for name, value in chunk)
+            position += len(chunk)
+        return position
+
+    def take(self, window: float, max_batch: int) -> List[Tuple[str, object, float]]:
+        """Retira um micro-lote de leituras (nome, valor, chegada)
+
+        Espera a primeira leitura e, a partir da chegada dela, até window
+        segundos ou até haver max_batch leituras. Retorna uma lista vazia
+        quando a fila foi fechada e esvaziada.
+        """
+        items = self.items
+        with self.lock:
+            self.wake_size = max_batch
+            while not items and not self.closed:
+                self.not_empty.wait()
+            if not items:
+                return []
+            if window > 0:
+                deadline = items[0][2] + window
+                while len(items) < max_batch and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.not_empty.wait(remaining)
+
+            if len(items) <= max_batch:
+                batch = list(items)
+                items.clear()
+            else:
+                batch = [items.popleft() for _ in range(max_batch)]
+            self.not_full.notify_all()
+            return batch
+
+    def clear(self) -> int:
+        """Descarta as leituras pendentes; retorna quantas eram"""
+        with self.lock:
+            count = len(self.items)
+            self.items.clear()
+            self.metrics.dropped += count
+            self.not_full.notify_all()
+            return count
+
+    def close(self):
+        """Não aceita mais leituras; o consumidor esvazia o que restou"""
+        with self.lock:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+
+class MicroBatchRunner:
+    """Executa um RuleEngine atrás de uma fila limitada
+
+    update() e update_many() têm a mesma forma das do RuleEngine, mas só
+    enfileiram as leituras (put_many() enfileira uma lista de leituras,
+    inclusive várias da mesma observação); uma thread consumidora aplica cada micro-lote
+    com um único update_many, de modo que uma rajada de leituras da mesma
+    observação gera uma reavaliação por janela, e não uma por leitura. O
+    motor só é acessado pela thread consumidora depois de start().
+
+    Um erro do motor encerra o consumidor e fecha a fila; o erro é
+    levantado de novo na próxima chamada de update(), update_many() ou
+    stop(), inclusive em um produtor que estava bloqueado esperando espaço.
+    """
+
+    def __init__(self, engine, max_size: int = 65536, window: float = 0.01,
+                 max_batch: Optional[int] = None, policy: str = BLOCK,
+                 put_timeout: Optional[float] = None):
+        if window < 0:
+            raise ValueError("window não pode ser negativa")
+        self.engine = engine
+        self.queue = ReadingQueue(max_size, policy)
+        self.window = window
+        self.max_batch = max_batch or max_size
+        self.put_timeout = put_timeout
+        self.error = None
+        self.thread = None
+
+    @property
+    def metrics(self) -> StreamMetrics:
+        return self.queue.metrics
+
+    def start(self):
+        """Inicia a thread consumidora"""
+        if self.thread is not None:
+            raise Exception("MicroBatchRunner já foi iniciado")
+        self.thread = threading.Thread(target=self._consume, name='obsact-micro-batch', daemon=True)
+        self.thread.start()
+
+    def update(self, name: str, value: Union[int, bool]) -> bool:
+        """Enfileira uma leitura; retorna False se ela foi descartada"""
+        return self.update_many({name: value}) == 1
+
+    def update_many(self, values: Dict[str, Union[int, bool]]) -> int:
+        """Enfileira várias leituras; retorna quantas foram aceitas"""
+        return self.put_many(list(values.items()))
+
+    def put_many(self, readings: List[Tuple[str, object]]) -> int:
+        """Enfileira leituras (observação, valor) na ordem de chegada, sem
+        reduzi-las antes da fila; retorna quantas foram aceitas"""
+        self._check_error()
+        try:
+            return self.queue.put_many(readings, self.put_timeout)
+        except Exception:
+            # A fila fechada por um erro do motor: o erro do motor é o relevante
+            self._check_error()
+            raise
+
+    def stop(self, drain: bool = True) -> dict:
+        """Fecha a fila e espera o consumidor; retorna as métricas
+
+        Com drain=False, as leituras ainda na fila são descartadas.
+        """
+        if not drain:
+            self.queue.clear()
+        self.queue.close()
+        if self.thread is not None:
+            self.thread.join()
+        self._check_error()
+        return self.stats()
+
+    def stats(self) -> dict:
+        return self.queue.metrics.snapshot(len(self.queue))
+
+    def _consume(self):
+        queue = self.queue
+        engine = self.engine
+        metrics = queue.metrics
+        try:
+            while True:
+                batch = queue.take(self.window, self.max_batch)
+                if not batch:
+                    return
+                # A leitura mais recente de cada observação vence
+                latest = dict(zip(map(_NAME, batch), map(_VALUE, batch)))
+                evaluations = engine.update_many(latest)
+                lag = time.monotonic() - batch[0][2]
+                metrics.record_batch(len(batch), len(latest), evaluations, lag)
+        except Exception as e:
+            self.error = e
+            queue.close()
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop(drain=exc_type is None)
+        return False
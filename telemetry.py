@@ -0,0 +1,415 @@
+import argparse
+import codecs
+import csv
+import json
+import sys
+import time
+from itertools import repeat
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, TextIO, Tuple
+
+from ast_nodes import Program
+from rule_engine import RuleEngine
+from stream_queue import BLOCK, POLICIES, MicroBatchRunner
+
+# ============================================================================
+# Ingestão de telemetria: leituras de sensores em NDJSON ou CSV, vindas de
+# um arquivo ou pipe, aplicadas às observações de um programa ObsAct em
+# execução no RuleEngine
+#
+# Formatos aceitos (nome = dispositivo ou observação):
+#   NDJSON: {"device": "tempSensor", "value": 28}
+#           {"observation": "temperatura", "value": 28}
+#           {"temperatura": 28, "umidade": 70}
+#   CSV:    nome,valor   (outras colunas podem ser escolhidas por índice)
+# ============================================================================
+
+# Número padrão (máximo) de linhas por micro-lote
+DEFAULT_BATCH_SIZE = 1024
+
+# Bytes pedidos ao stream por leitura; cada leitura devolve só o que já está
+# disponível (read1), então um pipe não espera o lote encher
+READ_SIZE = 1 << 16
+
+# Tipos aceitos para nomes e valores de leituras
+NAME_TYPES = {str}
+VALUE_TYPES = {int, float, bool, type(None)}
+
+_VALUE_KEY = itemgetter('value')
+
+# Valores booleanos aceitos no CSV
+CSV_BOOLEANS = {'True': True, 'False': False, 'true': True, 'false': False}
+
+
+def parse_csv_value(text: str):
+    """Converte um campo do CSV em int, float ou bool"""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    boolean = CSV_BOOLEANS.get(text.strip())
+    if boolean is not None:
+        return boolean
+    return float(text)
+
+
+class TelemetryPipeline:
+    """Lê leituras em micro-lotes e as aplica a um RuleEngine (ou a um
+    MicroBatchRunner, que enfileira as leituras para outra thread)
+
+    Um micro-lote tem as linhas já disponíveis no stream (até batch_size),
+    então leituras vindas de um pipe são aplicadas assim que chegam. Em
+    cada micro-lote, várias leituras da mesma observação são reduzidas à
+    última, e as regras afetadas são reavaliadas uma única vez
+    (RuleEngine.update_many). Com per_reading, cada leitura é aplicada e
+    avaliada individualmente (RuleEngine.update). Com pass_through, as
+    leituras (observação, valor) seguem individualmente para
+    MicroBatchRunner.put_many, e a fila, com as suas métricas e política
+    de descarte, vê cada leitura; a redução fica a cargo do consumidor.
+    on_batch, se dado, é chamado depois de cada micro-lote (ex.:
+    ActionDispatcher.flush).
+    """
+
+    def __init__(self, engine: RuleEngine, program: Program, batch_size: int = DEFAULT_BATCH_SIZE,
+                 per_reading: bool = False, on_batch: Optional[Callable[[], None]] = None,
+                 pass_through: bool = False):
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser positivo")
+        if per_reading and pass_through:
+            raise ValueError("per_reading e pass_through não podem ser usados juntos")
+        self.engine = engine
+        self.batch_size = batch_size
+        self.per_reading = per_reading
+        self.pass_through = pass_through
+        self.on_batch = on_batch
+
+        # Nome de dispositivo ou de observação -> observação
+        self.names = {}
+        for device in program.devices:
+            if device.observation:
+                self.names[device.observation] = device.observation
+                self.names[device.name] = device.observation
+
+        self.readings = 0
+        self.batches = 0
+        self.unknown = 0
+        self.malformed = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def run(self, stream: TextIO, format: str = 'ndjson', name_column: int = 0,
+            value_column: int = 1, header: bool = False) -> dict:
+        """Consome o stream até o fim e retorna as estatísticas"""
+        if format == 'ndjson':
+            batches = self.ndjson_batches(stream)
+        elif format == 'csv':
+            batches = self.csv_batches(stream, name_column, value_column, header)
+        else:
+            raise ValueError(f"Formato de telemetria desconhecido: {format}")
+
+        start = time.perf_counter()
+        for names, values in batches:
+            self.apply(names, values)
+            if self.on_batch is not None:
+                self.on_batch()
+        self.seconds += time.perf_counter() - start
+        return self.stats()
+
+    def apply(self, names: List[str], values: List[object]):
+        """Aplica um micro-lote de leituras, dado em colunas paralelas de
+        nomes e valores
+
+        As leituras já devem estar validadas, como as produzidas por
+        ndjson_batches() e csv_batches(). Os nomes são traduzidos por map()
+        e, por lote, dict() guarda a última leitura de cada observação, sem
+        um laço em Python por leitura; os nomes desconhecidos só são
+        contados quando o lote tem algum.
+        """
+        get = self.names.get
+        unknown = 0
+        if self.pass_through:
+            observations = list(map(get, names))
+            readings = list(zip(observations, values))
+            unknown = observations.count(None)
+            if unknown:
+                readings = [reading for reading in readings if reading[0] is not None]
+            if readings:
+                self.engine.put_many(readings)
+        elif self.per_reading:
+            observations = list(map(get, names))
+            unknown = observations.count(None)
+            update = self.engine.update
+            for observation, value in zip(observations, values):
+                if observation is not None:
+                    update(observation, value)
+        else:
+            latest = dict(zip(map(get, names), values))
+            if None in latest:
+                del latest[None]
+                unknown = list(map(get, names)).count(None)
+            if latest:
+                self.engine.update_many(latest)
+        self.readings += len(names)
+        self.unknown += unknown
+        self.batches += 1
+
+    @staticmethod
+    def _well_typed(names: List[object], values: List[object]) -> bool:
+        """Verifica os tipos do lote; os valores são verificados só entre os
+        distintos (leituras se repetem muito), e um valor não hashable, como
+        lista ou objeto JSON, já é inválido"""
+        try:
+            return set(map(type, names)) <= NAME_TYPES and set(map(type, set(values))) <= VALUE_TYPES
+        except TypeError:
+            return False
+
+    def _valid_readings(self, names: List[object], values: List[object]) -> Tuple[List[str], List[object]]:
+        """Descarta, como inválidas, leituras com nome que não é texto ou
+        valor que não é número, booleano ou nulo"""
+        valid_names, valid_values = [], []
+        for name, value in zip(names, values):
+            if type(name) not in NAME_TYPES:
+                self._malformed(f"{name!r}: {value!r}", "nome não é texto")
+            elif type(value) not in VALUE_TYPES:
+                self._malformed(f"{name}: {value!r}", "valor não é número, booleano ou nulo")
+            else:
+                valid_names.append(name)
+                valid_values.append(value)
+        return valid_names, valid_values
+
+    def ndjson_batches(self, stream: TextIO) -> Iterator[Tuple[List[str], List[object]]]:
+        """Micro-lotes (nomes, valores) de um stream NDJSON"""
+        for lines in self._line_batches(stream):
+            try:
+                # Um único json.loads por micro-lote; cada linha deve produzir
+                # exatamente um registro (`1,2` em uma linha produziria dois)
+                records = json.loads("[" + ",".join(lines) + "]")
+                if len(records) != len(lines):
+                    raise ValueError("linha com mais de um valor JSON")
+            except ValueError:
+                records = []
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError as e:
+                        self._malformed(line, str(e))
+            names, values = self._records(records)
+            if not self._well_typed(names, values):
+                names, values = self._valid_readings(names, values)
+            yield names, values
+
+    def _records(self, records: list) -> Tuple[List[str], List[object]]:
+        # Caminho rápido: lote homogêneo de {"observation"|"device": ..., "value": ...}
+        for key in ('observation', 'device'):
+            try:
+                return list(map(itemgetter(key), records)), list(map(_VALUE_KEY, records))
+            except (KeyError, TypeError):
+                pass
+
+        names, values = [], []
+        for record in records:
+            if not isinstance(record, dict):
+                self._malformed(record, "leitura não é um objeto JSON")
+                continue
+            if 'observation' in record or 'device' in record:
+                if 'value' not in record:
+                    self._malformed(record, "leitura sem 'value'")
+                    continue
+                names.append(record['observation'] if 'observation' in record else record['device'])
+                values.append(record['value'])
+            else:
+                names.extend(record.keys())
+                values.extend(record.values())
+        return names, values
+
+    def csv_batches(self, stream: TextIO, name_column: int = 0, value_column: int = 1,
+                    header: bool = False) -> Iterator[Tuple[List[str], List[object]]]:
+        """Micro-lotes (nomes, valores) de um stream CSV"""
+        first = True
+        for lines in self._line_batches(stream):
+            if first:
+                first = False
+                if header:
+                    lines = lines[1:]
+            batch = self._split_csv(lines, name_column, value_column)
+            if batch is None:
+                batch = self._parse_csv(lines, name_column, value_column)
+            yield batch
+
+    @staticmethod
+    def _split_csv(lines: List[str], name_column: int, value_column: int) -> Optional[Tuple[List[str], List[object]]]:
+        """Caminho rápido para lotes sem aspas: um único split do lote e
+        conversão só dos valores distintos (leituras de sensores se repetem
+        muito); None se o lote precisar do csv.reader
+
+        Com todas as linhas com o mesmo número de campos, as colunas são
+        fatias com passo desse número na lista de campos do lote.
+        """
+        if not lines:
+            return [], []
+        commas = lines[0].count(',')
+        width = commas + 1
+        if width <= max(name_column, value_column) or set(map(str.count, lines, repeat(','))) != {commas}:
+            return None
+        text = ",".join(lines)
+        if '"' in text:
+            return None
+        fields = text.split(',')
+        column = fields[value_column::width]
+        try:
+            parsed = {value: parse_csv_value(value) for value in dict.fromkeys(column)}
+        except ValueError:
+            return None
+        return fields[name_column::width], list(map(parsed.__getitem__, column))
+
+    def _parse_csv(self, lines: List[str], name_column: int, value_column: int) -> Tuple[List[str], List[object]]:
+        names, values = [], []
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            try:
+                value = parse_csv_value(row[value_column])
+                names.append(row[name_column])
+            except (IndexError, ValueError) as e:
+                self._malformed(",".join(row), str(e))
+                continue
+            values.append(value)
+        return names, values
+
+    def _line_batches(self, stream: TextIO) -> Iterator[List[str]]:
+        """Lotes com as linhas completas já disponíveis no stream
+
+        Lê o buffer binário com read1(), que não espera mais dados do que os
+        já disponíveis; streams sem buffer (ex.: io.StringIO) são lidos com
+        read().
+        """
+        buffer = getattr(stream, 'buffer', None)
+        if buffer is not None and hasattr(buffer, 'read1'):
+            decoder = codecs.getincrementaldecoder(stream.encoding or 'utf-8')()
+            read = lambda: decoder.decode(buffer.read1(READ_SIZE))
+        else:
+            read = lambda: stream.read(READ_SIZE)
+
+        batch_size = self.batch_size
+        pending = ""
+        while True:
+            text = read()
+            if not text:
+                if pending:
+                    yield [pending]
+                return
+            text = pending + text
+            end = text.rfind("\n") + 1
+            pending = text[end:]
+            if not end:
+                continue
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+                end = text.rfind("\n") + 1
+            lines = text[:end].split("\n")
+            lines.pop()
+            for start in range(0, len(lines), batch_size):
+                yield lines[start:start + batch_size]
+
+    def _malformed(self, line, message: str):
+        self.malformed += 1
+        # Guarda só as primeiras mensagens para não acumular memória
+        if len(self.errors) < 10:
+            self.errors.append(f"Leitura inválida ({message}): {str(line).strip()}")
+
+    def stats(self) -> dict:
+        return {
+            'readings': self.readings,
+            'batches': self.batches,
+            'unknown': self.unknown,
+            'malformed': self.malformed,
+            'seconds': self.seconds,
+            'readings_per_second': self.readings / self.seconds if self.seconds > 0 else 0.0,
+        }
+
+
+def telemetry_main(argv: List[str]) -> int:
+    """Executa um programa .obs alimentado por telemetria; retorna o código de saída"""
+    from functions import ActionDispatcher
+    from main import DeviceLanguageProcessor
+
+    arg_parser = argparse.ArgumentParser(
+        prog='telemetry.py',
+        description='Executa um programa ObsAct alimentado por leituras NDJSON ou CSV')
+    arg_parser.add_argument('program', help='programa .obs')
+    arg_parser.add_argument('input', nargs='?', default='-', help='arquivo de leituras (padrão: entrada padrão)')
+    arg_parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+    arg_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='linhas por micro-lote')
+    arg_parser.add_argument('--per-reading', action='store_true',
+                            help='avalia as regras a cada leitura, e não por micro-lote')
+    arg_parser.add_argument('--edge', action='store_true',
+                            help='executa ações só nas transições das condições')
+    arg_parser.add_argument('--header', action='store_true', help='CSV com linha de cabeçalho')
+    arg_parser.add_argument('--queue-size', type=int, default=0,
+                            help='avalia as regras em outra thread, atrás de uma fila limitada a N leituras')
+    arg_parser.add_argument('--window', type=float, default=0.01,
+                            help='janela (s) de cada micro-lote retirado da fila')
+    arg_parser.add_argument('--max-batch', type=int, default=None, help='leituras por micro-lote da fila')
+    arg_parser.add_argument('--drop-policy', choices=POLICIES, default=BLOCK,
+                            help='o que fazer com leituras que chegam com a fila cheia')
+    arg_parser.add_argument('--name-column', type=int, default=0)
+    arg_parser.add_argument('--value-column', type=int, default=1)
+    args = arg_parser.parse_args(argv)
+    if args.per_reading and args.queue_size > 0:
+        arg_parser.error("--per-reading não se aplica com --queue-size (a fila recebe cada leitura)")
+
+    try:
+        with open(args.program, 'r', encoding='utf-8') as f:
+            obs_code = f.read()
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.program}' não encontrado")
+        return 1
+
+    result = DeviceLanguageProcessor().analyze(obs_code, show_tokens=False, show_ast=False)
+    if not result['success']:
+        print("Execução falhou devido a erros de sintaxe:")
+        for error in result['errors']:
+            print(f"  {error}")
+        return 1
+
+    program = result['ast']
+    with ActionDispatcher() as dispatcher:
+        engine = RuleEngine(program, dispatcher, edge_triggered=args.edge, defer_unset=True)
+        engine.start()
+        dispatcher.flush()
+        runner = None
+        if args.queue_size > 0:
+            runner = MicroBatchRunner(engine, args.queue_size, args.window, args.max_batch, args.drop_policy)
+            runner.start()
+        # Com a fila, cada leitura é enfileirada individualmente
+        pipeline = TelemetryPipeline(runner or engine, program, args.batch_size, args.per_reading,
+                                     on_batch=dispatcher.flush, pass_through=runner is not None)
+        try:
+            if args.input == '-':
+                stats = pipeline.run(sys.stdin, args.format, args.name_column, args.value_column, args.header)
+            else:
+                with open(args.input, 'r', encoding='utf-8') as stream:
+                    stats = pipeline.run(stream, args.format, args.name_column, args.value_column, args.header)
+        finally:
+            # Espera o consumidor; levanta o erro do motor, se houve um
+            if runner is not None:
+                queue_stats = runner.stop()
+
+    for error in pipeline.errors:
+        print(error, file=sys.stderr)
+    print(f"Leituras: {stats['readings']}  lotes: {stats['batches']}  desconhecidas: {stats['unknown']}  "
+          f"inválidas: {stats['malformed']}  ({stats['readings_per_second']:.0f} leituras/s)", file=sys.stderr)
+    if runner is not None:
+        print(f"Fila: aceitas: {queue_stats['accepted']}  descartadas: {queue_stats['dropped']}  "
+              f"bloqueios: {queue_stats['blocked']}  profundidade máxima: {queue_stats['max_depth']}  "
+              f"micro-lotes: {queue_stats['batches']}  coalescidas: {queue_stats['coalesced']}  "
+              f"atraso médio: {queue_stats['mean_lag'] * 1000:.1f} ms  máximo: {queue_stats['max_lag'] * 1000:.1f} ms",
+              file=sys.stderr)
+    return 0 if stats['malformed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(telemetry_main(sys.argv[1:]))
@@ -11,4 +11,8 @@ def alerta ( namedevice , msg ):
 def alertavar ( namedevice , msg , var ):
      print ( namedevice +" recebeu o alerta :\ n ")
      print ( msg + " "+ var )
- 
\ No newline at end of file
+ 
+
+def alerta_todos ( namedevices , msg ):
+    for namedevice in namedevices:
+        alerta(namedevice, msg)
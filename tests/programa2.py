@@ -3,6 +3,13 @@
 
 # Importa funções de controle de dispositivos
 from functions import ligar, desligar, alerta, alertavar
+try:
+    from functions import alerta_todos
+except ImportError:
+    # Módulo de funções sem alerta_todos: um alerta por dispositivo
+    def alerta_todos(namedevices, msg):
+        for namedevice in namedevices:
+            alerta(namedevice, msg)
 
 # Lógica principal do programa
 def main():
@@ -16,8 +23,7 @@ def main():
     if temperatura > 30:
         # enviar alerta (" Temperatura em ") para todos : monitor, celular
         # Alerta broadcast para múltiplos dispositivos
-        alerta("monitor", " Temperatura em ")
-        alerta("celular", " Temperatura em ")
+        alerta_todos(["monitor", "celular"], " Temperatura em ")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import async_functions
+from interpreter import Interpreter, RecordingBackend
+from main import CodeGenerator, DeviceLanguageProcessor
+
+DEVICES = """dispositivo : {sensor, t}
+dispositivo : {higrometro, u}
+dispositivo : {a}
+dispositivo : {b}
+dispositivo : {c}
+"""
+
+
+def parse(source):
+    result = DeviceLanguageProcessor().analyze(DEVICES + source, show_tokens=False, show_ast=False)
+    if not result['success']:
+        raise Exception(result['errors'])
+    return result['ast']
+
+
+class SlowDriver:
+    """Driver que registra o início e o fim de cada ação, com uma espera entre eles"""
+
+    def __init__(self):
+        self.events = []
+        self.log = []
+
+    async def _act(self, event):
+        self.log.append(('inicio',) + event)
+        await asyncio.sleep(0.001)
+        self.log.append(('fim',) + event)
+        self.events.append(event)
+
+    async def ligar(self, namedevice):
+        await self._act(('ligar', namedevice))
+
+    async def desligar(self, namedevice):
+        await self._act(('desligar', namedevice))
+
+    async def alerta(self, namedevice, msg):
+        await self._act(('alerta', namedevice, msg))
+
+    async def alertavar(self, namedevice, msg, var):
+        await self._act(('alertavar', namedevice, msg, var))
+
+
+def random_action(rng):
+    kind = rng.random()
+    device = rng.choice(['a', 'b', 'c'])
+    if kind < 0.15:
+        return f'enviar alerta ("todos") para todos : {", ".join(rng.sample(["a", "b", "c"], 2))}'
+    if kind < 0.3:
+        return f'enviar alerta ("valor", {rng.choice(["t", "u"])}) {device}'
+    return f"{rng.choice(['ligar', 'desligar'])} {device}"
+
+
+def random_program(rng, commands=10):
+    lines = []
+    for _ in range(commands):
+        kind = rng.random()
+        if kind < 0.2:
+            lines.append(f"set {rng.choice(['t', 'u'])} = {rng.randint(0, 10)}.")
+        elif kind < 0.5:
+            lines.append(random_action(rng) + ".")
+        else:
+            condition = f"{rng.choice(['t', 'u'])} {rng.choice(['>', '<', '==', '!='])} {rng.randint(0, 10)}"
+            action = f"se {condition} entao {random_action(rng)}"
+            if rng.random() < 0.5:
+                action += f" senao {random_action(rng)}"
+            lines.append(action + ".")
+    return parse("\n".join(lines))
+
+
+def by_device(events):
+    devices = {}
+    for event in events:
+        devices.setdefault(event[1], []).append(event)
+    return devices
+
+
+class AsyncCodegenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = SlowDriver()
+        self.previous = async_functions.set_driver(self.driver)
+
+    def tearDown(self):
+        async_functions.set_driver(self.previous)
+
+    def run_async(self, program):
+        namespace = {'__name__': 'obsact_async'}
+        exec(CodeGenerator(async_mode=True).generate(program), namespace)
+        asyncio.run(namespace['main']())
+
+    def test_different_devices_run_concurrently(self):
+        self.run_async(parse("ligar a.\nligar b.\ndesligar a.\n"))
+        log = self.driver.log
+        # ligar a e ligar b começam antes de qualquer um terminar; desligar a
+        # só começa depois de ligar a terminar
+        self.assertEqual(log[:2], [('inicio', 'ligar', 'a'), ('inicio', 'ligar', 'b')])
+        self.assertLess(log.index(('fim', 'ligar', 'a')), log.index(('inicio', 'desligar', 'a')))
+
+    def test_unset_observation_runs_previous_actions(self):
+        with self.assertRaises(TypeError):
+            self.run_async(parse("ligar a.\nligar b.\nse t > 1 entao ligar c.\n"))
+        self.assertEqual(sorted(self.driver.events), [('ligar', 'a'), ('ligar', 'b')])
+
+    def test_matches_interpreter_per_device(self):
+        rng = random.Random(10)
+        for _ in range(60):
+            program = random_program(rng)
+            expected = RecordingBackend()
+            try:
+                Interpreter(expected).run(program)
+                failed = None
+            except TypeError as e:
+                failed = e
+            self.driver.events = []
+            if failed is not None:
+                with self.assertRaises(TypeError):
+                    self.run_async(program)
+            else:
+                self.run_async(program)
+            # A ordem entre dispositivos pode mudar; a de cada dispositivo, não
+            self.assertEqual(by_device(self.driver.events), by_device(expected.events))
+
+
+if __name__ == "__main__":
+    unittest.main()
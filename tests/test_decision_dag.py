@@ -0,0 +1,132 @@
+import itertools
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ast_nodes import ObservationAction
+from decision_dag import ConditionDAG
+from interpreter import Interpreter, RecordingBackend
+from main import DeviceLanguageProcessor
+
+DEVICES = """dispositivo : {sensor, t}
+dispositivo : {higrometro, u}
+dispositivo : {presenca, m}
+dispositivo : {a}
+"""
+
+
+def parse_rules(source):
+    result = DeviceLanguageProcessor().analyze(DEVICES + source, show_tokens=False, show_ast=False)
+    if not result['success']:
+        raise Exception(result['errors'])
+    return [command for command in result['ast'].commands if isinstance(command, ObservationAction)]
+
+
+def random_condition(rng):
+    comparisons = []
+    for _ in range(rng.choice([1, 2, 3, 4])):
+        name = rng.choice(['t', 'u', 'm'])
+        if name == 'm':
+            comparisons.append(f"m {rng.choice(['==', '!='])} {rng.choice(['true', 'false'])}")
+        else:
+            # Poucos limiares, para que as regras compartilhem comparações
+            comparisons.append(f"{name} {rng.choice(['>', '<=', '=='])} {rng.randint(0, 4)}")
+    condition = comparisons[0]
+    for comparison in comparisons[1:]:
+        condition += f" {rng.choice(['&&', '||'])} {comparison}"
+    return condition
+
+
+class ConditionDAGTest(unittest.TestCase):
+
+    def test_shared_comparisons(self):
+        rules = parse_rules("se t > 3 entao ligar a.\n"
+                            "se t > 3 && u < 2 entao ligar a.\n"
+                            "se u < 2 || t > 3 entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        self.assertEqual(dag.conditions, [((0,),), ((0, 1),), ((1,), (0,))])
+        stats = dag.stats()
+        self.assertEqual((stats['rules'], stats['comparisons'], stats['shared_comparisons']), (3, 5, 2))
+
+    def test_value_type_is_part_of_the_key(self):
+        rules = parse_rules("se t == 1 entao ligar a.\nse t == true entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        self.assertEqual(len(dag.atoms), 2)
+
+    def test_memo_reuses_results(self):
+        rules = parse_rules("se t > 3 entao ligar a.\nse t > 3 && u < 2 entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        variables = {'t': 5, 'u': 1}
+        self.assertTrue(dag.evaluate(0, variables))
+        self.assertTrue(dag.evaluate(1, variables))
+        stats = dag.stats()
+        self.assertEqual((stats['lookups'], stats['evaluations'], stats['reused']), (3, 2, 1))
+
+    def test_invalidate(self):
+        rules = parse_rules("se t > 3 && u < 2 entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        variables = {'t': 5, 'u': 1}
+        self.assertTrue(dag.evaluate(0, variables))
+        variables['t'] = 0
+        # Sem invalidate() o resultado memorizado continua valendo
+        self.assertTrue(dag.evaluate(0, variables))
+        dag.invalidate('t')
+        self.assertFalse(dag.evaluate(0, variables))
+        # Só a comparação de t foi recalculada
+        self.assertEqual(dag.memo, [False, True])
+        dag.reset()
+        self.assertEqual(dag.memo, [None, None])
+
+    def test_short_circuit_skips_undefined(self):
+        rules = parse_rules("se t > 3 && u < 2 entao ligar a.\nse u < 2 entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        self.assertFalse(dag.evaluate(0, {'t': 0}))
+        with self.assertRaises(NameError):
+            dag.evaluate(1, {'t': 0})
+
+    def test_add_and_remove(self):
+        rules = parse_rules("se t > 3 entao ligar a.\nse u < 2 entao ligar a.\nse u < 2 && m == true entao ligar a.\n")
+        dag = ConditionDAG(rules[:1])
+        self.assertEqual(dag.add(rules[1]), 1)
+        self.assertEqual(dag.add(rules[2]), 2)
+        self.assertEqual(len(dag.memo), len(dag.atoms))
+        dag.remove(1)
+        variables = {'t': 5, 'u': 1, 'm': True}
+        self.assertEqual([dag.evaluate(rule, variables) for rule in range(3)], [True, False, True])
+
+    def test_matches_interpreter(self):
+        rng = random.Random(5)
+        for _ in range(30):
+            rules = parse_rules("".join(f"se {random_condition(rng)} entao ligar a.\n" for _ in range(10)))
+            dag = ConditionDAG(rules)
+            interpreter = Interpreter(RecordingBackend())
+            interpreter.variables = {'t': 0, 'u': 0, 'm': False}
+            for _ in range(50):
+                name = rng.choice(['t', 'u', 'm'])
+                value = rng.choice([True, False]) if name == 'm' else rng.randint(0, 5)
+                interpreter.variables[name] = value
+                dag.invalidate(name)
+                for index, rule in enumerate(rules):
+                    self.assertEqual(dag.evaluate(index, interpreter.variables),
+                                     interpreter.evaluate(rule.condition))
+            # Cada comparação é calculada no máximo uma vez por mudança de valor
+            self.assertLessEqual(dag.evaluations, dag.lookups)
+
+    def test_every_assignment(self):
+        rules = parse_rules("se t > 2 || u <= 1 && m == true || t == 0 entao ligar a.\n")
+        dag = ConditionDAG(rules)
+        interpreter = Interpreter(RecordingBackend())
+        for t, u, m in itertools.product(range(4), range(3), (True, False)):
+            interpreter.variables = {'t': t, 'u': u, 'm': m}
+            dag.reset()
+            self.assertEqual(dag.evaluate(0, interpreter.variables), interpreter.evaluate(rules[0].condition))
+
+
+if __name__ == "__main__":
+    unittest.main()
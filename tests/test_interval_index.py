@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ast_nodes import ObservationAction
+from interpreter import OPERATOR_FUNCTIONS
+from interval_index import ThresholdIndex, threshold_of
+from main import DeviceLanguageProcessor
+
+OPERATORS = list(OPERATOR_FUNCTIONS)
+
+
+def brute_force(rules, observation, value):
+    """Regras satisfeitas calculadas comparando uma a uma"""
+    return {rule_id for rule_id, (name, op, threshold) in rules.items()
+            if name == observation and OPERATOR_FUNCTIONS[op](value, threshold)}
+
+
+def random_rules(rng, count=60):
+    rules = {}
+    for rule_id in range(count):
+        # Limiares repetidos exercitam as fronteiras de bisect
+        rules[rule_id] = (rng.choice(['t', 'u']), rng.choice(OPERATORS), rng.randint(0, 10))
+    return rules
+
+
+def random_value(rng):
+    return rng.choice([rng.randint(-1, 11), rng.randint(0, 10) + rng.choice([0.0, 0.5, -0.5])])
+
+
+class ThresholdIndexTest(unittest.TestCase):
+
+    def build(self, rules):
+        index = ThresholdIndex()
+        for rule_id, (name, op, threshold) in rules.items():
+            index.add(rule_id, name, op, threshold)
+        return index
+
+    def test_satisfied_matches_brute_force(self):
+        rng = random.Random(6)
+        for _ in range(20):
+            rules = random_rules(rng)
+            index = self.build(rules)
+            for _ in range(50):
+                name, value = rng.choice(['t', 'u']), random_value(rng)
+                self.assertEqual(index.satisfied(name, value), brute_force(rules, name, value))
+
+    def test_changed_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            rules = random_rules(rng)
+            index = self.build(rules)
+            for _ in range(50):
+                name, old, new = rng.choice(['t', 'u']), random_value(rng), random_value(rng)
+                before, after = brute_force(rules, name, old), brute_force(rules, name, new)
+                self.assertEqual(index.changed(name, old, new), (after - before, before - after))
+
+    def test_changed_from_unset(self):
+        index = self.build({0: ('t', '>', 3), 1: ('t', '<', 3), 2: ('t', '!=', 3)})
+        self.assertEqual(index.changed('t', None, 5), ({0, 2}, set()))
+
+    def test_add_and_remove(self):
+        rng = random.Random(8)
+        rules = random_rules(rng)
+        index = self.build(rules)
+        for rule_id in rng.sample(sorted(rules), 30):
+            index.remove(rule_id)
+            del rules[rule_id]
+            self.assertNotIn(rule_id, index)
+        self.assertEqual(len(index), len(rules))
+        for value in range(-1, 12):
+            self.assertEqual(index.satisfied('t', value), brute_force(rules, 't', value))
+        with self.assertRaises(Exception):
+            index.add(next(iter(rules)), 't', '>', 1)
+
+    def test_unknown_observation(self):
+        index = self.build({0: ('t', '>', 3)})
+        self.assertEqual(index.satisfied('u', 5), set())
+        self.assertEqual(index.changed('u', 1, 5), (set(), set()))
+
+    def test_threshold_of(self):
+        source = """dispositivo : {sensor, t}
+dispositivo : {presenca, m}
+dispositivo : {a}
+se t >= 30 entao ligar a.
+se t > 1 && t < 5 entao ligar a.
+se m == true entao ligar a.
+"""
+        result = DeviceLanguageProcessor().analyze(source, show_tokens=False, show_ast=False)
+        rules = [command for command in result['ast'].commands if isinstance(command, ObservationAction)]
+        self.assertEqual([threshold_of(rule) for rule in rules], [('t', '>=', 30), None, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
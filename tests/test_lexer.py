@@ -0,0 +1,53 @@
+import glob
+import os
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from dfa_lexer import DFADeviceLexer
+from lexer import DeviceLexer
+
+# Mensagens e comentários com aspas, barras e quebras de linha nas fronteiras dos pedaços
+TRICKY = ('dispositivo : {a}\n'
+          '// comentário com "aspas\n'
+          'se x > 1 entao enviar alerta ("a//b\nc") a. // fim/\n'
+          '/ /\n'
+          'ligar a.')
+
+
+def tokens(stream):
+    return [(tok.type, tok.value, tok.lineno, tok.index, tok.end) for tok in stream]
+
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+class TokenizeStreamTest(unittest.TestCase):
+
+    def test_chunks_match_tokenize(self):
+        texts = [TRICKY]
+        for path in sorted(glob.glob(os.path.join(current_dir, '*.obs'))):
+            with open(path) as f:
+                texts.append(f.read())
+        for lexer_class in (DeviceLexer, DFADeviceLexer):
+            for text in texts:
+                expected = tokens(lexer_class().tokenize(text))
+                for size in (1, 2, 3, 5, 7, 64):
+                    self.assertEqual(tokens(lexer_class().tokenize_stream(chunked(text, size))), expected,
+                                     (lexer_class.__name__, size))
+
+    def test_unterminated_message(self):
+        chunks = ['ligar a.\nenviar alerta ("sem fim'] + ['x' * 100] * 20
+        with self.assertRaisesRegex(Exception, "linha 2"):
+            list(DeviceLexer().tokenize_stream(iter(chunks), max_message=1000))
+        # Abaixo do limite, a mensagem aberta só é analisada no fim da entrada
+        list(DeviceLexer().tokenize_stream(iter(chunks), max_message=10000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from ast_nodes import ObservationAction
+from interpreter import Interpreter, RecordingBackend
+from main import DeviceLanguageProcessor
+from rule_engine import RuleEngine
+
+DEVICES = """dispositivo : {sensor, t}
+dispositivo : {higrometro, u}
+dispositivo : {presenca, m}
+dispositivo : {a}
+dispositivo : {b}
+"""
+
+
+def parse(source):
+    result = DeviceLanguageProcessor().analyze(source, show_tokens=False, show_ast=False)
+    if not result['success']:
+        raise Exception(result['errors'])
+    return result['ast']
+
+
+def random_comparison(rng):
+    name = rng.choice(['t', 'u', 'm'])
+    if name == 'm':
+        return f"m {rng.choice(['==', '!='])} {rng.choice(['true', 'false'])}"
+    return f"{name} {rng.choice(['>', '>=', '<', '<=', '==', '!='])} {rng.randint(0, 20)}"
+
+
+def random_program(rng, rules=12):
+    """Programa com regras de limiar, regras compostas e sets entre as regras"""
+    lines = [DEVICES, "set t = 5.", "set u = 5.", "set m = false."]
+    for _ in range(rules):
+        if rng.random() < 0.2:
+            name = rng.choice(['t', 'u'])
+            lines.append(f"set {name} = {rng.randint(0, 20)}.")
+        comparisons = [random_comparison(rng) for _ in range(rng.choice([1, 1, 2, 3]))]
+        condition = comparisons[0]
+        for comparison in comparisons[1:]:
+            condition += f" {rng.choice(['&&', '||'])} {comparison}"
+        action = f"{rng.choice(['ligar', 'desligar'])} {rng.choice(['a', 'b'])}"
+        if rng.random() < 0.5:
+            action += f" senao {rng.choice(['ligar', 'desligar'])} {rng.choice(['a', 'b'])}"
+        lines.append(f"se {condition} entao {action}.")
+    return parse("\n".join(lines))
+
+
+def random_updates(rng, count=200):
+    updates = []
+    for _ in range(count):
+        name = rng.choice(['t', 'u', 'm'])
+        value = rng.choice([True, False]) if name == 'm' else rng.randint(0, 20)
+        updates.append((name, value))
+    return updates
+
+
+def rules_reading(program, name):
+    rules = []
+    for command in program.commands:
+        if isinstance(command, ObservationAction):
+            obs = command.condition
+            while obs is not None:
+                if obs.observation == name:
+                    rules.append(command)
+                    break
+                obs = obs.next_obs
+    return rules
+
+
+class RuleEngineLevelTest(unittest.TestCase):
+    """Modo padrão: cada atualização executa as ações das regras dependentes"""
+
+    def test_start_matches_interpreter(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            program = random_program(rng)
+            expected = RecordingBackend()
+            variables = Interpreter(expected).run(program)
+            backend = RecordingBackend()
+            engine = RuleEngine(program, backend)
+            self.assertEqual(engine.start(), variables)
+            self.assertEqual(backend.events, expected.events)
+
+    def test_updates_match_interpreter(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            program = random_program(rng)
+            backend = RecordingBackend()
+            engine = RuleEngine(program, backend)
+            engine.start()
+            reference = Interpreter(RecordingBackend())
+            reference.run(program)
+            for name, value in random_updates(rng):
+                before = len(backend.events)
+                engine.update(name, value)
+                previous = reference.variables[name]
+                if type(previous) is type(value) and previous == value:
+                    self.assertEqual(len(backend.events), before)
+                    continue
+                reference.variables[name] = value
+                reference.backend.events = []
+                for rule in rules_reading(program, name):
+                    reference.execute(rule)
+                self.assertEqual(backend.events[before:], reference.backend.events)
+            self.assertEqual(engine.variables, reference.variables)
+
+
+class RuleEngineApiTest(unittest.TestCase):
+    """Contagens retornadas, dependências e regras adicionadas em execução"""
+
+    RULES = ("se t > 10 entao ligar a senao desligar a.\n"
+             "se t > 5 && u < 3 entao ligar b.\n"
+             "se m == true entao desligar b.\n")
+
+    def setUp(self):
+        self.program = parse(DEVICES + self.RULES)
+        self.backend = RecordingBackend()
+        self.engine = RuleEngine(self.program, self.backend)
+        self.engine.start({'t': 0, 'u': 0, 'm': False})
+
+    def test_update_counts(self):
+        self.assertEqual(self.engine.update('t', 12), 2)
+        self.assertEqual(self.engine.update('t', 12), 0)
+        self.assertEqual(self.engine.update('m', True), 1)
+        # 1 e True são valores diferentes para as comparações
+        self.assertEqual(self.engine.update('m', 1), 1)
+        self.assertEqual(self.engine.update_many({'t': 12, 'u': 5}), 1)
+        self.assertEqual(self.engine.update_many({'t': 1, 'u': 1}), 2)
+
+    def test_dependents_and_thresholds(self):
+        rules = self.program.commands
+        self.assertEqual(self.engine.dependents('t'), [rules[0], rules[1]])
+        self.assertEqual(self.engine.dependents('porta'), [])
+        self.engine.update('t', 12)
+        self.assertEqual(self.engine.satisfied_thresholds('t'), [rules[0]])
+        self.engine.update('t', 3)
+        self.assertEqual(self.engine.satisfied_thresholds('t'), [])
+
+    def test_add_and_remove_rule(self):
+        extra = parse(DEVICES + "se t > 20 entao ligar b.\nse u < 1 || t == 2 entao desligar a.").commands
+        first = self.engine.add_rule(extra[0])
+        second = self.engine.add_rule(extra[1])
+        self.assertEqual((first, second), (3, 4))
+        self.backend.events = []
+        self.assertEqual(self.engine.update('t', 25), 4)
+        self.assertEqual(self.backend.events, [('ligar', 'a'), ('ligar', 'b'), ('ligar', 'b'), ('desligar', 'a')])
+
+        self.engine.remove_rule(0)
+        self.engine.remove_rule(first)
+        self.assertEqual(self.engine.dependents('t'), [self.program.commands[1], extra[1]])
+        self.backend.events = []
+        self.assertEqual(self.engine.update('t', 2), 2)
+        self.assertEqual(self.backend.events, [('desligar', 'a')])
+        self.assertEqual(self.engine.cycle(), 3)
+        with self.assertRaises(Exception):
+            self.engine.remove_rule(0)
+
+
+class RuleEngineEdgeTest(unittest.TestCase):
+    """Modo por transição: update() e update_many() devem concordar"""
+
+    def test_set_after_rule_in_start(self):
+        program = parse(DEVICES + "se t > 10 entao ligar a senao desligar a.\nset t = 20.")
+        for method in ('update', 'update_many'):
+            backend = RecordingBackend()
+            engine = RuleEngine(program, backend, edge_triggered=True)
+            engine.start({'t': 5})
+            if method == 'update':
+                engine.update('t', 15)
+            else:
+                engine.update_many({'t': 15})
+            self.assertEqual(backend.events, [('desligar', 'a'), ('ligar', 'a')], method)
+
+    def test_update_matches_update_many_and_cycle(self):
+        rng = random.Random(3)
+        for _ in range(30):
+            program = random_program(rng)
+            single, many, cycled = RecordingBackend(), RecordingBackend(), RecordingBackend()
+            engine = RuleEngine(program, single, edge_triggered=True)
+            batched = RuleEngine(program, many, edge_triggered=True)
+            synced = RuleEngine(program, cycled, edge_triggered=True)
+            initial = {'t': rng.randint(0, 20), 'u': rng.randint(0, 20)}
+            engine.start(initial)
+            batched.start(initial)
+            synced.start(initial)
+            synced.cycle()
+            for name, value in random_updates(rng):
+                engine.update(name, value)
+                batched.update_many({name: value})
+                self.assertEqual(single.events, many.events)
+                # Depois de um cycle(), os resultados guardados correspondem
+                # aos valores atuais: reavaliar tudo não produz transições
+                synced.update(name, value)
+                before = len(cycled.events)
+                synced.cycle()
+                self.assertEqual(len(cycled.events), before)
+            self.assertEqual(engine.outcomes, batched.outcomes)
+
+    def test_transitions_match_interpreter(self):
+        rng = random.Random(4)
+        for _ in range(20):
+            program = random_program(rng)
+            backend = RecordingBackend()
+            engine = RuleEngine(program, backend, edge_triggered=True)
+            engine.start()
+            engine.cycle()
+            reference = Interpreter(RecordingBackend())
+            reference.run(program)
+            outcomes = {id(rule): reference.evaluate(rule.condition) for rule in rules_reading(program, 't')
+                        + rules_reading(program, 'u') + rules_reading(program, 'm')}
+            for name, value in random_updates(rng):
+                before = len(backend.events)
+                engine.update(name, value)
+                reference.variables[name] = value
+                reference.backend.events = []
+                for rule in rules_reading(program, name):
+                    condition = reference.evaluate(rule.condition)
+                    if condition != outcomes[id(rule)]:
+                        outcomes[id(rule)] = condition
+                        if condition:
+                            reference.perform(rule.then_action)
+                        elif rule.else_action:
+                            reference.perform(rule.else_action)
+                self.assertEqual(backend.events[before:], reference.backend.events)
+
+    def test_hysteresis(self):
+        program = parse(DEVICES + "se t > 10 entao ligar a senao desligar a.")
+        backend = RecordingBackend()
+        engine = RuleEngine(program, backend, edge_triggered=True, hysteresis={'t': 2})
+        engine.start({'t': 0})
+        for value in (11, 10, 9, 8, 12):
+            engine.update('t', value)
+        self.assertEqual(backend.events, [('desligar', 'a'), ('ligar', 'a'), ('desligar', 'a'), ('ligar', 'a')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from stream_queue import BLOCK, DROP_NEWEST, DROP_OLDEST, MicroBatchRunner, ReadingQueue
+
+
+class RecordingEngine:
+    """Motor falso: registra cada update_many"""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.variables = {}
+        self.delay = delay
+
+    def update_many(self, values):
+        self.calls.append(dict(values))
+        self.variables.update(values)
+        if self.delay:
+            time.sleep(self.delay)
+        return len(values)
+
+
+class FailingEngine:
+    def __init__(self, error):
+        self.error = error
+
+    def update_many(self, values):
+        raise self.error
+
+
+def names(queue):
+    return [item[0] for item in queue.items]
+
+
+class ReadingQueueTest(unittest.TestCase):
+
+    def test_drop_newest(self):
+        queue = ReadingQueue(3, DROP_NEWEST)
+        self.assertEqual(queue.put_many([('a', 1), ('b', 2)]), 2)
+        self.assertEqual(queue.put_many([('c', 3), ('d', 4), ('e', 5)]), 1)
+        self.assertFalse(queue.put('f', 6))
+        self.assertEqual(names(queue), ['a', 'b', 'c'])
+        stats = queue.metrics.snapshot(len(queue))
+        self.assertEqual((stats['received'], stats['accepted'], stats['dropped'], stats['depth']), (6, 3, 3, 3))
+
+    def test_drop_oldest(self):
+        queue = ReadingQueue(3, DROP_OLDEST)
+        self.assertEqual(queue.put_many([('a', 1), ('b', 2)]), 2)
+        self.assertEqual(queue.put_many([('c', 3), ('d', 4)]), 2)
+        self.assertEqual(names(queue), ['b', 'c', 'd'])
+        self.assertEqual(queue.metrics.dropped, 1)
+
+    def test_drop_oldest_more_than_capacity(self):
+        queue = ReadingQueue(3, DROP_OLDEST)
+        queue.put('antiga', 0)
+        accepted = queue.put_many([(f'x{i}', i) for i in range(10)])
+        self.assertEqual(accepted, 3)
+        self.assertEqual(names(queue), ['x7', 'x8', 'x9'])
+        stats = queue.metrics.snapshot(len(queue))
+        # 7 leituras novas e 1 antiga descartadas
+        self.assertEqual((stats['received'], stats['accepted'], stats['dropped']), (11, 4, 8))
+
+    def test_block_with_timeout(self):
+        queue = ReadingQueue(2, BLOCK)
+        self.assertEqual(queue.put_many([('a', 1), ('b', 2), ('c', 3)], timeout=0.05), 2)
+        stats = queue.metrics.snapshot(len(queue))
+        self.assertEqual((stats['accepted'], stats['dropped'], stats['blocked']), (2, 1, 1))
+
+    def test_block_waits_for_consumer(self):
+        queue = ReadingQueue(2, BLOCK)
+        queue.put_many([('a', 1), ('b', 2)])
+        taken = []
+        consumer = threading.Timer(0.05, lambda: taken.extend(queue.take(0, 10)))
+        consumer.start()
+        self.assertEqual(queue.put_many([('c', 3)]), 1)
+        consumer.join()
+        self.assertEqual([item[0] for item in taken], ['a', 'b'])
+        self.assertEqual(names(queue), ['c'])
+
+    def test_take_respects_max_batch(self):
+        queue = ReadingQueue(10)
+        queue.put_many([(f'x{i}', i) for i in range(5)])
+        self.assertEqual(len(queue.take(0, 2)), 2)
+        self.assertEqual(len(queue.take(0, 10)), 3)
+
+    def test_closed_queue(self):
+        queue = ReadingQueue(10)
+        queue.put('a', 1)
+        queue.close()
+        self.assertEqual(len(queue.take(1.0, 10)), 1)
+        self.assertEqual(queue.take(1.0, 10), [])
+        with self.assertRaises(Exception):
+            queue.put('b', 2)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ReadingQueue(0)
+        with self.assertRaises(ValueError):
+            ReadingQueue(10, 'descartar-tudo')
+
+
+class MicroBatchRunnerTest(unittest.TestCase):
+
+    def test_burst_is_coalesced(self):
+        engine = RecordingEngine(delay=0.001)
+        with MicroBatchRunner(engine, max_size=200000, window=0.05) as runner:
+            for value in range(100000):
+                runner.update('temperatura', value)
+        stats = runner.stats()
+        self.assertEqual(engine.variables, {'temperatura': 99999})
+        self.assertLess(len(engine.calls), 1000)
+        self.assertEqual(stats['applied'], 100000)
+        self.assertEqual(stats['coalesced'], 100000 - len(engine.calls))
+        self.assertEqual(stats['depth'], 0)
+        self.assertGreater(stats['max_lag'], 0.0)
+
+    def test_block_policy_keeps_every_latest_value(self):
+        engine = RecordingEngine(delay=0.005)
+        with MicroBatchRunner(engine, max_size=50, window=0.0) as runner:
+            for value in range(2000):
+                runner.update(f'x{value % 7}', value)
+        expected = {f'x{value % 7}': value for value in range(2000)}
+        self.assertEqual(engine.variables, expected)
+        self.assertEqual(runner.stats()['dropped'], 0)
+        self.assertLessEqual(runner.stats()['max_depth'], 50)
+
+    def test_engine_error_reaches_blocked_producer(self):
+        runner = MicroBatchRunner(FailingEngine(ValueError("valor inválido")), max_size=2, window=0.0)
+        runner.start()
+        with self.assertRaises(ValueError):
+            for value in range(1000):
+                runner.update('temperatura', value)
+        with self.assertRaises(ValueError):
+            runner.stop()
+
+    def test_engine_error_reported_by_stop(self):
+        runner = MicroBatchRunner(FailingEngine(TypeError("comparação inválida")), window=0.0)
+        runner.start()
+        runner.update('temperatura', 1)
+        with self.assertRaises(TypeError):
+            runner.stop()
+
+    def test_stop_without_drain(self):
+        engine = RecordingEngine(delay=0.2)
+        runner = MicroBatchRunner(engine, window=0.0)
+        runner.start()
+        runner.update('a', 1)
+        time.sleep(0.05)
+        for value in range(10):
+            runner.update('b', value)
+        stats = runner.stop(drain=False)
+        self.assertEqual(stats['dropped'], 10)
+        self.assertEqual(engine.variables, {'a': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
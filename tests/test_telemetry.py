@@ -0,0 +1,160 @@
+import io
+import os
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from interpreter import RecordingBackend
+from main import DeviceLanguageProcessor
+from rule_engine import RuleEngine
+from stream_queue import MicroBatchRunner
+from telemetry import TelemetryPipeline, parse_csv_value
+
+PROGRAM = """dispositivo : {tempSensor, temperatura}
+dispositivo : {dehumidifier, umidade}
+dispositivo : {smartLights, movimento}
+dispositivo : {heater}
+se temperatura > 30 entao ligar heater senao desligar heater.
+se movimento == true entao ligar smartLights.
+"""
+
+
+class ChunkedStream:
+    """Stream que devolve poucos caracteres por leitura, como um pipe"""
+
+    def __init__(self, text, size):
+        self.text = text
+        self.size = size
+
+    def read(self, size):
+        chunk, self.text = self.text[:self.size], self.text[self.size:]
+        return chunk
+
+
+class TelemetryTest(unittest.TestCase):
+
+    def setUp(self):
+        result = DeviceLanguageProcessor().analyze(PROGRAM, show_tokens=False, show_ast=False)
+        self.program = result['ast']
+        self.backend = RecordingBackend()
+        self.engine = RuleEngine(self.program, self.backend, defer_unset=True)
+        self.engine.start()
+
+    def pipeline(self, **options):
+        return TelemetryPipeline(self.engine, self.program, **options)
+
+    def test_parse_csv_value(self):
+        self.assertEqual(parse_csv_value("28"), 28)
+        self.assertEqual(parse_csv_value("28.5"), 28.5)
+        self.assertIs(parse_csv_value("true"), True)
+        self.assertIs(parse_csv_value("False"), False)
+        with self.assertRaises(ValueError):
+            parse_csv_value("quente")
+
+    def test_ndjson_formats(self):
+        pipeline = self.pipeline()
+        stats = pipeline.run(io.StringIO('{"device": "tempSensor", "value": 31}\n'
+                                         '{"observation": "umidade", "value": 70}\n'
+                                         '{"movimento": true, "porta": 1}\n'), 'ndjson')
+        self.assertEqual((stats['readings'], stats['unknown'], stats['malformed']), (4, 1, 0))
+        self.assertEqual(self.engine.variables, {'temperatura': 31, 'umidade': 70, 'movimento': True})
+        self.assertEqual(self.backend.events, [('ligar', 'heater'), ('ligar', 'smartLights')])
+
+    def test_ndjson_malformed(self):
+        pipeline = self.pipeline()
+        stats = pipeline.run(io.StringIO('{"device": "tempSensor", "value": "28"}\n'
+                                         '{"device": ["x"], "value": 1}\n'
+                                         '{"observation": null, "value": 1}\n'
+                                         '{"umidade": {"a": 1}}\n'
+                                         '{"device": "tempSensor"}\n'
+                                         '1,2\n'
+                                         '[1]\n'
+                                         '{quebrado\n'
+                                         '\n'
+                                         '{"device": "tempSensor", "value": 33}\n'), 'ndjson')
+        self.assertEqual(stats['malformed'], 8)
+        self.assertEqual(stats['readings'], 1)
+        self.assertEqual(len(pipeline.errors), 8)
+        self.assertEqual(self.engine.variables['temperatura'], 33)
+        self.assertIsNone(self.engine.variables['umidade'])
+
+    def test_csv_malformed(self):
+        pipeline = self.pipeline()
+        stats = pipeline.run(io.StringIO('nome,valor\n'
+                                         'temperatura,31\n'
+                                         '"umidade",80.5\n'
+                                         'sem-valor\n'
+                                         'umidade,muito\n'
+                                         '\n'
+                                         'movimento,true\n'), 'csv', header=True)
+        self.assertEqual((stats['readings'], stats['malformed']), (3, 2))
+        self.assertEqual(self.engine.variables, {'temperatura': 31, 'umidade': 80.5, 'movimento': True})
+
+    def test_csv_columns(self):
+        pipeline = self.pipeline()
+        pipeline.run(io.StringIO('2024-01-01,31,temperatura\n'), 'csv', name_column=2, value_column=1)
+        self.assertEqual(self.engine.variables['temperatura'], 31)
+
+    def test_csv_uneven_rows(self):
+        # Linhas com números de campos diferentes não podem ser fatiadas por
+        # passo: o lote vai para o csv.reader
+        pipeline = self.pipeline()
+        stats = pipeline.run(io.StringIO('temperatura,31,extra\n'
+                                         'umidade,40\n'
+                                         'movimento,true,a,b\n'), 'csv')
+        self.assertEqual((stats['readings'], stats['malformed']), (3, 0))
+        self.assertEqual(self.engine.variables, {'temperatura': 31, 'umidade': 40, 'movimento': True})
+
+    def test_chunked_stream(self):
+        # Linhas partidas entre leituras do stream são remontadas
+        lines = "".join(f"temperatura,{value}\r\n" for value in range(20, 40))
+        stats = self.pipeline(batch_size=3).run(ChunkedStream(lines, 7), 'csv')
+        self.assertEqual((stats['readings'], stats['malformed']), (20, 0))
+        self.assertEqual(self.engine.variables['temperatura'], 39)
+
+    def test_per_reading_matches_updates(self):
+        values = [25, 31, 29, 35, 35, 10]
+        text = "".join(f'{{"device": "tempSensor", "value": {value}}}\n' for value in values)
+        self.pipeline(per_reading=True).run(io.StringIO(text), 'ndjson')
+
+        backend = RecordingBackend()
+        engine = RuleEngine(self.program, backend, defer_unset=True)
+        engine.start()
+        for value in values:
+            engine.update('temperatura', value)
+        self.assertEqual(self.backend.events, backend.events)
+
+    def test_micro_batch_keeps_latest_value(self):
+        text = "".join(f"temperatura,{value}\n" for value in (31, 10, 40, 5))
+        stats = self.pipeline().run(io.StringIO(text), 'csv')
+        self.assertEqual(stats['batches'], 1)
+        # Uma única reavaliação, com o último valor
+        self.assertEqual(self.backend.events, [('desligar', 'heater')])
+
+    def test_pass_through_queues_each_reading(self):
+        text = "".join(f"temperatura,{value}\n" for value in (31, 10, 40, 5)) + "porta,1\nmovimento,true\n"
+        with MicroBatchRunner(self.engine, max_size=100, window=0.0) as runner:
+            pipeline = TelemetryPipeline(runner, self.program, pass_through=True)
+            stats = pipeline.run(io.StringIO(text), 'csv')
+        queue_stats = runner.stats()
+        self.assertEqual((stats['readings'], stats['unknown']), (6, 1))
+        # A fila recebe as leituras individuais, não uma por observação
+        self.assertEqual((queue_stats['accepted'], queue_stats['applied']), (5, 5))
+        self.assertEqual(self.engine.variables['temperatura'], 5)
+        self.assertIs(self.engine.variables['movimento'], True)
+        with self.assertRaises(ValueError):
+            TelemetryPipeline(runner, self.program, pass_through=True, per_reading=True)
+
+    def test_on_batch(self):
+        calls = []
+        self.pipeline(batch_size=2, on_batch=lambda: calls.append(1)).run(
+            io.StringIO("temperatura,1\ntemperatura,2\ntemperatura,3\n"), 'csv')
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
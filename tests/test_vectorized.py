@@ -0,0 +1,141 @@
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório pai ao path para importar os módulos do compilador
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from interpreter import Interpreter, RecordingBackend
+from main import DeviceLanguageProcessor
+
+try:
+    import numpy as np
+    from vectorized import VectorizedProgram, dispatch
+except ImportError:
+    np = None
+
+DEVICES = """dispositivo : {sensor, t}
+dispositivo : {higrometro, u}
+dispositivo : {presenca, m}
+dispositivo : {a}
+dispositivo : {b}
+"""
+
+
+def parse(source):
+    result = DeviceLanguageProcessor().analyze(source, show_tokens=False, show_ast=False)
+    if not result['success']:
+        raise Exception(result['errors'])
+    return result['ast']
+
+
+def random_comparison(rng):
+    name = rng.choice(['t', 'u', 'm'])
+    if name == 'm':
+        return f"m {rng.choice(['==', '!='])} {rng.choice(['true', 'false'])}"
+    return f"{name} {rng.choice(['>', '>=', '<', '<=', '==', '!='])} {rng.randint(0, 10)}"
+
+
+def random_action(rng):
+    device = rng.choice(['a', 'b'])
+    kind = rng.random()
+    if kind < 0.2:
+        return f'enviar alerta ("valor", {rng.choice(["t", "u", "m"])}) {device}'
+    if kind < 0.3:
+        return f'enviar alerta ("aviso") {device}'
+    return f"{rng.choice(['ligar', 'desligar'])} {device}"
+
+
+def random_program(rng, rules=8):
+    """Programa com sets opcionais: observações sem valor exercitam o curto-circuito"""
+    lines = [DEVICES]
+    for _ in range(rules):
+        if rng.random() < 0.15:
+            lines.append(f"set {rng.choice(['t', 'u'])} = {rng.randint(0, 10)}.")
+        comparisons = [random_comparison(rng) for _ in range(rng.choice([1, 2, 3]))]
+        condition = comparisons[0]
+        for comparison in comparisons[1:]:
+            condition += f" {rng.choice(['&&', '||'])} {comparison}"
+        action = f"se {condition} entao {random_action(rng)}"
+        if rng.random() < 0.5:
+            action += f" senao {random_action(rng)}"
+        lines.append(action + ".")
+    return parse("\n".join(lines))
+
+
+def random_columns(rng, sites):
+    """Colunas por local; algumas observações ficam sem valor (None)"""
+    columns = {}
+    for name in ('t', 'u', 'm'):
+        choice = rng.random()
+        if choice < 0.3:
+            continue
+        if name == 'm':
+            columns[name] = [rng.choice([True, False]) for _ in range(sites)]
+        elif choice < 0.4:
+            columns[name] = rng.randint(0, 10)
+        else:
+            columns[name] = [rng.randint(0, 10) for _ in range(sites)]
+    return columns
+
+
+def site_values(columns, site):
+    return {name: column[site] if isinstance(column, list) else column for name, column in columns.items()}
+
+
+@unittest.skipIf(np is None, "numpy não instalado")
+class VectorizedTest(unittest.TestCase):
+
+    def test_matches_interpreter(self):
+        rng = random.Random(9)
+        sites = 16
+        checked = 0
+        for _ in range(300):
+            program = random_program(rng)
+            columns = random_columns(rng, sites)
+            expected = []
+            failed = False
+            for site in range(sites):
+                backend = RecordingBackend()
+                try:
+                    Interpreter(backend).run(program, site_values(columns, site))
+                except TypeError:
+                    failed = True
+                    break
+                expected.append(backend.events)
+
+            vectorized = VectorizedProgram(program)
+            if failed:
+                # Algum local compara uma observação sem valor: o main() gerado
+                # também falharia
+                with self.assertRaises(TypeError):
+                    vectorized.run(columns, sites=sites)
+                continue
+            results = vectorized.run(columns, sites=sites)
+            for site in range(sites):
+                backend = RecordingBackend()
+                dispatch(results, site, backend)
+                self.assertEqual(backend.events, expected[site])
+            checked += 1
+        self.assertGreater(checked, 100)
+
+    def test_short_circuit_skips_unset(self):
+        program = parse(DEVICES + "se m == true && t > 5 entao ligar a senao desligar a.\n"
+                                  "se t < 3 || u > 1 entao ligar b.\n")
+        results = VectorizedProgram(program).run({'m': [False, False], 't': [1, 2]})
+        self.assertEqual([result.mask.tolist() for result in results],
+                         [[False, False], [True, True], [True, True]])
+        with self.assertRaises(TypeError):
+            VectorizedProgram(program).run({'m': [True, False], 't': [1, 5]})
+
+    def test_unset_equality(self):
+        program = parse(DEVICES + "se t == 3 entao ligar a.\nse t != 3 entao ligar b.\n")
+        results = VectorizedProgram(program).run({}, sites=3)
+        self.assertEqual([result.count() for result in results], [0, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
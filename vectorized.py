@@ -0,0 +1,192 @@
+from typing import Dict, List, Optional
+from ast_nodes import (Program, Attribution, ObservationAction, Observation,
+                       Action, AlertAction)
+
+# NumPy é uma dependência opcional, usada apenas por este módulo
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ============================================================================
+# Execução vetorizada: o mesmo programa ObsAct avaliado para muitos locais
+# (sites) de uma vez. Cada observação é uma coluna com um valor por local e
+# cada cadeia de condições vira uma expressão sobre arrays NumPy.
+# ============================================================================
+
+# Operadores relacionais do ObsAct e os ufuncs correspondentes
+OPERATOR_UFUNCS = {
+    '==': 'equal',
+    '!=': 'not_equal',
+    '<=': 'less_equal',
+    '>=': 'greater_equal',
+    '<': 'less',
+    '>': 'greater',
+}
+
+
+class ActionMask:
+    """Uma ação do programa e a máscara dos locais em que ela é executada
+
+    Para alertas com variável, values guarda a coluna da observação no
+    momento da ação (o alertavar de cada local recebe str(values[site])).
+    """
+
+    __slots__ = ('action', 'mask', 'values', 'line_number')
+
+    def __init__(self, action: Action, mask, values=None, line_number: int = 0):
+        self.action = action
+        self.mask = mask
+        self.values = values
+        self.line_number = line_number
+
+    def sites(self):
+        """Índices dos locais em que a ação é executada"""
+        return np.flatnonzero(self.mask)
+
+    def count(self) -> int:
+        """Número de locais em que a ação é executada"""
+        return int(np.count_nonzero(self.mask))
+
+    def __str__(self) -> str:
+        return f"ActionMask({self.action}, locais={self.count()})"
+
+
+class VectorizedProgram:
+    """Programa compilado para avaliação vetorizada sobre vários locais
+
+    run() percorre os comandos uma única vez, como o main() gerado, mas
+    cada atribuição preenche a coluna inteira e cada condição produz uma
+    máscara booleana com um elemento por local. O resultado é a lista de
+    ações com suas máscaras, na ordem de execução do programa.
+    """
+
+    def __init__(self, program: Program):
+        if np is None:
+            raise Exception("A execução vetorizada requer o pacote numpy (pip install numpy)")
+        self.program = program
+        self.observations = [device.observation for device in program.devices if device.observation]
+        # Cada condição é compilada uma vez em grupos de comparações (or de ands)
+        self.conditions = {}
+        for command in program.commands:
+            if isinstance(command, ObservationAction):
+                self.conditions[id(command)] = self.compile_condition(command.condition)
+
+    @staticmethod
+    def compile_condition(obs: Observation) -> List[List[tuple]]:
+        """Converte a cadeia em grupos de (observação, ufunc, valor)
+
+        Os grupos são ligados por or e as comparações de cada grupo por and,
+        a mesma precedência do código gerado.
+        """
+        groups = [[]]
+        while obs is not None:
+            groups[-1].append((obs.observation, getattr(np, OPERATOR_UFUNCS[obs.operator]), obs.value))
+            if obs.next_obs is not None and obs.logical_op == '||':
+                groups.append([])
+            obs = obs.next_obs
+        return groups
+
+    def run(self, observations: Dict[str, object], sites: Optional[int] = None) -> List[ActionMask]:
+        """Executa o programa para todos os locais
+
+        observations mapeia cada observação a uma coluna (sequência com um
+        valor por local) ou a um escalar comum a todos. O número de locais
+        é o tamanho das colunas, ou sites quando só há escalares.
+        """
+        columns = {}
+        for name, column in observations.items():
+            column = np.asarray(column)
+            if column.ndim > 0:
+                if sites is None:
+                    sites = len(column)
+                elif len(column) != sites:
+                    raise Exception(f"Coluna '{name}' tem {len(column)} valores, esperado {sites}")
+            columns[name] = column
+        if sites is None:
+            raise Exception("Número de locais indeterminado: informe sites ou ao menos uma coluna")
+
+        # Observações declaradas e não informadas começam sem valor (None)
+        for name in self.observations:
+            columns.setdefault(name, None)
+
+        shape = (sites,)
+        everywhere = np.ones(shape, dtype=bool)
+        results = []
+        for command in self.program.commands:
+            if isinstance(command, Attribution):
+                columns[command.observation] = np.full(shape, command.value)
+            elif isinstance(command, ObservationAction):
+                mask = self.evaluate(self.conditions[id(command)], columns, shape)
+                self._add_action(results, command.then_action, mask, columns)
+                if command.else_action:
+                    self._add_action(results, command.else_action, ~mask, columns)
+            elif isinstance(command, Action):
+                self._add_action(results, command, everywhere, columns)
+            else:
+                raise TypeError(f"Tipo de comando desconhecido: {type(command)}")
+        return results
+
+    def evaluate(self, groups: List[List[tuple]], columns: dict, shape: tuple):
+        """Máscara booleana da condição para todos os locais
+
+        Cada comparação só é calculada nos locais em que o curto-circuito do
+        código gerado a alcança: um grupo só onde os grupos anteriores foram
+        falsos e cada comparação só onde as anteriores do grupo foram
+        verdadeiras. Assim uma observação sem valor só é um erro nos locais
+        em que o main() gerado também a compararia.
+        """
+        result = np.zeros(shape, dtype=bool)
+        for group in groups:
+            term = ~result
+            for name, ufunc, value in group:
+                if not term.any():
+                    break
+                term = self._compare(columns, name, ufunc, value, term)
+            result |= term
+        return result
+
+    @staticmethod
+    def _compare(columns: dict, name: str, ufunc, value, active):
+        """Comparação da coluna com o valor, calculada só nos locais ativos"""
+        try:
+            column = columns[name]
+        except KeyError:
+            raise NameError(f"Observação não definida: {name}") from None
+        if column is None:
+            # Observação sem valor: None == v e None != v são válidos em Python
+            if ufunc is np.equal:
+                return np.zeros(active.shape, dtype=bool)
+            if ufunc is np.not_equal:
+                return active.copy()
+            raise TypeError(f"Observação sem valor: {name}")
+        return ufunc(column, value, where=active, out=np.zeros(active.shape, dtype=bool))
+
+    def _add_action(self, results: list, action: Action, mask, columns: dict):
+        values = None
+        if isinstance(action, AlertAction) and action.observation:
+            try:
+                values = columns[action.observation]
+            except KeyError:
+                raise NameError(f"Observação não definida: {action.observation}") from None
+            if values is None:
+                # O alertavar de uma observação sem valor recebe str(None)
+                values = np.array(None, dtype=object)
+        results.append(ActionMask(action, mask, values, action.line_number))
+
+
+def dispatch(results: List[ActionMask], site: int, backend):
+    """Executa no backend as ações de um único local (ex.: para conferência)"""
+    from interpreter import Interpreter
+
+    interpreter = Interpreter(backend)
+    for result in results:
+        if not result.mask[site]:
+            continue
+        if result.values is not None:
+            value = np.broadcast_to(result.values, result.mask.shape)[site]
+            # Colunas de objetos (ex.: sem valor) já guardam o objeto Python
+            if isinstance(value, np.generic):
+                value = value.item()
+            interpreter.variables = {result.action.observation: value}
+        interpreter.perform(result.action)